@@ -5,12 +5,23 @@ MIT Licence
 """
 from BattleshAPy.battleshapy import BattleshAPy                                         # noqa
 from BattleshAPy.game import Game                                                       # noqa
+from BattleshAPy.transport import Transport                                             # noqa
+from BattleshAPy.async_battleshapy import AsyncBattleshAPy                              # noqa
+from BattleshAPy.async_game import AsyncGame                                            # noqa
+from BattleshAPy.async_transport import AsyncTransport                                  # noqa
+from BattleshAPy.supervisor import GameSupervisor                                      # noqa
 from BattleshAPy.store_object.ship_store_object import ShipStore                        # noqa
+from BattleshAPy.store_object.store_catalog import StoreCatalog                         # noqa
 from BattleshAPy.game_object_collection.ship_collection import ShipCollection           # noqa
 from BattleshAPy.game_object_collection.player_collection import PlayerCollection       # noqa
 from BattleshAPy.game_object_collection.island_collection import IslandCollection       # noqa
 from BattleshAPy.game_object.ship_game_object import Ship                               # noqa
 from BattleshAPy.game_object.player_game_object import Player                           # noqa
 from BattleshAPy.game_object.island_game_object import Island                           # noqa
+from BattleshAPy.local_data.local_data_store import LocalDataStore, MemoryLocalDataStore, JSONLocalDataStore, SQLiteLocalDataStore  # noqa
+from BattleshAPy.metrics import Metrics, TurnRecord                                     # noqa
+from BattleshAPy.response_cache import ResponseCache                                    # noqa
+from BattleshAPy.turn_snapshot import TurnSnapshot, TurnHistory                         # noqa
+from BattleshAPy.turn_notifier import TurnNotifier, AdaptivePollingNotifier, LongPollNotifier  # noqa
 from BattleshAPy.ship_ids import *                                                      # noqa
 from BattleshAPy.exceptions import *                                                    # noqa
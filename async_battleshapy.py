@@ -0,0 +1,156 @@
+"""
+This module contains the asyncio counterpart of the object which represents a single bot
+From here, the bot can attach to any game given the proper credentials
+"""
+import asyncio
+import traceback
+import typing
+
+import BattleshAPy.battleshapy as battleshapy
+import BattleshAPy.async_game as async_game
+import BattleshAPy.async_transport as async_transport
+import BattleshAPy.local_data.local_data_store as local_data_storage
+
+
+class AsyncBattleshAPy(battleshapy.BattleshAPy):
+    """
+    This object manages a single bot's credentials on an asyncio event loop
+    Every game it creates shares its transport, so hundreds of games can run concurrently on one loop
+    Please be sure you do not have 2 instances of an application running
+    which control the same bot in the same game at the same time
+    """
+    def __init__(
+            self, client_id: str, client_secret: str, transport: async_transport.AsyncTransport = None,
+            local_data_store: local_data_storage.LocalDataStore = None, local_data_flush_interval: float = None
+    ):
+        """
+        :param client_id:
+        :param client_secret:
+        :param transport: the transport shared by every game this bot plays.
+        If not specified, a new one is created with the default pool, timeout and retry settings
+        :param local_data_store: see BattleshAPy
+        :param local_data_flush_interval: see BattleshAPy
+        """
+        super().__init__(
+            client_id, client_secret, transport if transport is not None else async_transport.AsyncTransport(),
+            local_data_store, local_data_flush_interval
+        )
+
+    def _auth(self) -> 'async_transport.aiohttp.BasicAuth':
+        return async_transport.aiohttp.BasicAuth(self.client_id, self.client_secret)
+
+    async def create_game(
+            self, game_class_ref: async_game.AsyncGame.__class__, length: int = 50, width: int = 50,
+            money_per_turn: int = 100, initial_hp: int = 1000, turn_length: int = 5
+    ) -> async_game.AsyncGame:
+        """
+        This coroutine creates a new game which your bot is automatically added to
+        Be sure to share the game_id attribute with the people you wish to play with,
+        or use it to spectate the game on the website
+        :param game_class_ref: The reference to the class you wish to use as the game
+        Note that the AsyncGame object is abstract and can not be directly instantiated
+        :param length:
+        :param width:
+        :param money_per_turn:
+        :param initial_hp:
+        :param turn_length:
+        """
+        r = await self.transport.post(
+            "/game", json=dict(
+                length=length,
+                width=width,
+                money_per_turn=money_per_turn,
+                initial_hp=initial_hp,
+                turn_length=turn_length
+            ), auth=self._auth()
+        )
+
+        self._handle_error(r)
+
+        if r.status_code == 200:
+            response = r.json()
+            return await self.connect_game(game_class_ref, response["game_id"], response["token"])
+
+    async def join_game(self, game_class_ref: async_game.AsyncGame.__class__, game_id: str) -> async_game.AsyncGame:
+        """
+        This coroutine causes your bot to join a game you have not previously joined by game ID
+        :param game_class_ref: The reference to the class you wish to use as the game
+        Note that the AsyncGame object is abstract and can not be directly instantiated
+        :param game_id:
+        :return:
+        """
+        r = await self.transport.post(
+            "/game", json=dict(
+                game_id=game_id
+            ), auth=self._auth()
+        )
+
+        self._handle_error(r)
+
+        if r.status_code == 200:
+            response = r.json()
+            return await self.connect_game(game_class_ref, response["game_id"], response["token"])
+
+    async def connect_game(
+            self, game_class_ref: async_game.AsyncGame.__class__, game_id: str, token: str
+    ) -> async_game.AsyncGame:
+        """
+        This coroutine attaches you to an existing game where your bot has already joined
+        :param game_class_ref: The reference to the class you wish to use as the game
+        Note that the AsyncGame object is abstract and can not be directly instantiated
+        :param game_id:
+        :param token:
+        :return:
+        """
+        g = self._create_game_object(game_class_ref, game_id, token)
+
+        # test credentials
+        await g._poll_game_status()
+        return g
+
+    async def run_games(
+            self, games: typing.List[async_game.AsyncGame], poll_every: float = 0.5, max_restarts: int = 3,
+            restart_delay: float = 1.0
+    ) -> typing.List[typing.Optional[Exception]]:
+        """
+        This coroutine plays many games at once on the current event loop, returning once they have all ended
+        A game which fails is restarted without affecting the others
+        :param games: the games to play. They must have already started
+        :param poll_every: see AsyncGame.play
+        :param max_restarts: the number of times in a row a failing game is restarted before it is given up on.
+        Each turn played to the end resets the count
+        :param restart_delay: the number of seconds to wait before restarting a failed game
+        :return: the last exception raised by each game, or None if it ended normally
+        """
+        return await asyncio.gather(*[
+            self._run_game(g, poll_every, max_restarts, restart_delay) for g in games
+        ])
+
+    @staticmethod
+    async def _run_game(
+            g: async_game.AsyncGame, poll_every: float, max_restarts: int, restart_delay: float
+    ) -> typing.Optional[Exception]:
+        restarts = 0
+        while True:
+            completed_turns = g.metrics.completed_turns
+            try:
+                await g.play(poll_every)
+                return None
+
+            except Exception as e:
+                traceback.print_exc()
+                if g.metrics.completed_turns > completed_turns:
+                    # the game played on since its last restart, so this is not the same failure repeating
+                    restarts = 0
+
+                if restarts >= max_restarts:
+                    return e
+
+                restarts += 1
+                await asyncio.sleep(restart_delay)
+
+    async def close(self):
+        """
+        Closes the connections shared by all the games of this bot
+        """
+        await self.transport.close()
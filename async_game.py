@@ -0,0 +1,455 @@
+"""
+This module contains the asyncio counterpart of the game class
+Every action which talks to the server is a coroutine, so many games can share a single event loop
+"""
+import abc
+import asyncio
+import time
+import traceback
+import typing
+
+import BattleshAPy.game as game
+import BattleshAPy.metrics as game_metrics
+import BattleshAPy.json_codec as json_codec
+import BattleshAPy.turn_snapshot as turn_snapshot
+import BattleshAPy.turn_notifier as turn_notifier
+import BattleshAPy.async_transport as async_transport
+import BattleshAPy.game_object.player_game_object as player_game_object
+import BattleshAPy.game_object.ship_game_object as ship_game_object
+import BattleshAPy.store_object.ship_store_object as ship_store_object
+import BattleshAPy.store_object.store_catalog as store_catalog
+import BattleshAPy.exceptions as exceptions
+import BattleshAPy.local_data.local_data_store as local_data_storage
+
+
+class AsyncGame(game.Game):
+    """
+    The asyncio counterpart of the Game class.
+    Every method which sends a request to the server is a coroutine and must be awaited,
+    as must the ship's move_ship, shoot_ship and set_target helpers, the store object's purchase method
+    and flush_local_player_ship_data, which writes on a worker thread
+
+    Mandatory methods to override:
+    - on_turn_start -- A coroutine called each time it becomes my turn. The turn is automatically ended after it returns
+
+    Optional methods to override:
+    - on_create -- Called once after the object has been initialized. Unlike the other events, this is not a coroutine
+    - on_game_start -- A coroutine called once before the first turn
+    - on_ship_arrive -- A coroutine called when a ship on autopilot arrives at its target
+    - on_turn_metrics -- A coroutine called at the end of each of my turns with the metrics of that turn
+    """
+    def __init__(
+            self, game_id: str, token: str, transport: async_transport.AsyncTransport = None,
+            local_data_store: local_data_storage.LocalDataStore = None, local_data_flush_interval: float = None
+    ):
+        """
+        :param game_id:
+        :param token:
+        :param transport: the transport used to talk to the API.
+        If not specified, a new one is created for this game only
+        :param local_data_store: see Game
+        :param local_data_flush_interval: see Game
+        """
+        super().__init__(game_id, token, transport, local_data_store, local_data_flush_interval)
+
+    @staticmethod
+    def _create_transport() -> async_transport.AsyncTransport:
+        return async_transport.AsyncTransport()
+
+    def _test_credentials(self):
+        # requests can not be sent from the constructor. AsyncBattleshAPy tests the credentials after creating the game
+        pass
+
+    def _no_op(self, value=None):
+        return self._completed(value)
+
+    @staticmethod
+    async def _completed(value=None):
+        return value
+
+    async def _poll_game_status(self) -> dict:
+        r = await self.transport.get("/game", headers=self._headers())
+        self._handle_error(r)
+        return r.json()
+
+    async def get_player_count(self) -> int:
+        """
+        Returns the number of players still in the game
+        """
+        status = await self._poll_game_status()
+        if "players" in status:
+            return len(status["players"])
+
+        return len(status["opponents"]) + 1
+
+    async def is_game_started(self) -> bool:
+        """
+        Returns if the game has started
+        """
+        status = await self._poll_game_status()
+        return status.get("status", "running").lower() != "waiting"
+
+    async def wait_for_game_start(self, poll_every: float = 0.5) -> 'AsyncGame':
+        """
+        Waits until the game has started
+        :param poll_every: the interval to poll the server at. Minimum is 0.3s
+        :return: this object so chaining is possible
+        """
+        while True:
+            start = time.time()
+            if await self.is_game_started():
+                return self
+
+            await asyncio.sleep(max([0.3, poll_every - (time.time() - start)]))
+
+    async def wait_for_player_count(self, count: int, poll_every: float = 0.5) -> 'AsyncGame':
+        """
+        Waits until the game has a defined number of players joined
+        :param count: number of players
+        :param poll_every: the interval to poll the server at. Minimum is 0.3s
+        :return: this object so chaining is possible
+        """
+        while True:
+            start = time.time()
+            player_count = await self.get_player_count()
+            if player_count >= count:
+                break
+
+            await asyncio.sleep(max([0.3, poll_every - (time.time() - start)]))
+
+        return self
+
+    async def wait_for_time(self, delay: float) -> 'AsyncGame':
+        """
+        Waits for a defined amount of time. This is a wrapper for asyncio.sleep()
+        :return: this object so chaining is possible
+        """
+        await asyncio.sleep(delay)
+        return self
+
+    async def start_game(self) -> 'AsyncGame':
+        """
+        Sends the command to start the game
+        """
+        r = await self.transport.put("/game", headers=self._headers())
+        self._handle_error(r)
+        return self
+
+    async def _get_turn(self, **kwargs) -> dict:
+        r = await self.transport.get("/turn", headers=self._headers(), **kwargs)
+        self._handle_error(r)
+        return r.json()
+
+    async def is_my_turn(self) -> bool:
+        """
+        Determines if it is my turn or not
+        """
+        return (await self._get_turn())["is_me"]
+
+    async def get_current_turn(self) -> player_game_object.Player:
+        """
+        Returns the player whose turn it currently is
+        """
+        return self.players.get_by_id((await self._get_turn())["turn"])
+
+    async def _end_turn(self):
+        r = await self.transport.post("/turn", headers=self._headers())
+        try:
+            self._handle_error(r)
+        except exceptions.NotYourTurnException:
+            # the turn ran out before it was ended
+            self.overrun_turns += 1
+
+    @abc.abstractmethod
+    async def on_turn_start(self):
+        """
+        This abstract coroutine is called at the start of each turn
+        The turn is automatically ended after it returns
+        """
+
+    async def on_game_start(self):
+        """
+        This event is triggered before the game starts
+        It is run once and only once
+        """
+
+    async def on_ship_arrive(self, ship: ship_game_object.Ship):
+        pass
+
+    async def on_turn_metrics(self, record: game_metrics.TurnRecord):
+        """
+        This overridable coroutine is called at the end of each of my turns with the metrics of that turn
+        The metrics of every turn so far are also available in the metrics attribute
+        :param record:
+        """
+
+    async def _update_islands(self):
+        r = await self.transport.get("/island", headers=self._headers())
+        self._handle_error(r)
+        self._process_islands_response(r)
+
+    async def _update_ships(self):
+        sent_at = time.time()
+        r = await self.transport.get("/ship", headers=self._headers())
+        self._record_rtt(time.time() - sent_at)
+        self._handle_error(r)
+        self._process_ships(json_codec.decode_response(r))
+
+    async def _timed_get(self, endpoint: str) -> typing.Tuple[async_transport.AsyncResponse, float]:
+        sent_at = time.time()
+        r = await self.transport.get(endpoint, headers=self._headers())
+        return r, time.time() - sent_at
+
+    async def fetch_snapshot(self, turn: dict = None) -> turn_snapshot.TurnSnapshot:
+        """
+        Fetches whose turn it is, the ships, the islands and the game status concurrently rather than one after another,
+        updates the game objects from them, and returns them as an immutable TurnSnapshot
+        The snapshot is also kept in the snapshot attribute. This is called automatically at the start of each of my turns
+        :param turn: the response of GET /turn, if it is already known
+        """
+        taken_at = time.time()
+        endpoints = self._get_snapshot_endpoints(turn)
+        results = await asyncio.gather(*[self._timed_get(e) for e in endpoints])
+        return self._process_snapshot(dict(zip(endpoints, results)), turn, taken_at)
+
+    async def _run_autopilot_cycle(self):
+        ships = self._get_autopiloted_ships()
+        async with self.batch() as batch:
+            for move in self.fleet_planner.plan(ships):
+                batch.move_ship_relative(move.ship, move.dx, move.dy)
+
+        for ship in self._get_arrived_ships(ships, batch):
+            await self.on_ship_arrive(ship)
+
+    async def play(self, poll_every: float = 0.5, notifier: turn_notifier.TurnNotifier = None):
+        """
+        This coroutine runs the main loop of the game
+        This should only be awaited AFTER the game has started
+        :param poll_every: the interval to poll the server at while the current turn is not about to end. Minimum is 0.3s
+        :param notifier: the strategy used to wait for my turn. Default is the turn_notifier attribute,
+        or if that is not set, an AdaptivePollingNotifier which polls at most every poll_every seconds
+        """
+        notifier = await self._prepare_play(poll_every, notifier)
+
+        while self.running:
+            try:
+                if await self._poll_turn(notifier):
+                    await self._play_turn(notifier)
+
+                await asyncio.sleep(notifier.get_delay())
+
+            except exceptions.GameEndedException:
+                await self.flush_local_player_ship_data()
+                break
+
+    async def _prepare_play(
+            self, poll_every: float, notifier: turn_notifier.TurnNotifier = None
+    ) -> turn_notifier.TurnNotifier:
+        await self._update_islands()
+        self._process_game_status(await self._poll_game_status())
+        return self._get_turn_notifier(poll_every, notifier)
+
+    async def _poll_turn(self, notifier: turn_notifier.TurnNotifier) -> bool:
+        sent_at = time.time()
+        turn = await self._get_turn(**notifier.get_request_kwargs())
+        notifier.on_turn_status(turn, sent_at, time.time())
+        self._polled_turn = turn
+        return turn["is_me"]
+
+    async def _play_turn(self, notifier: turn_notifier.TurnNotifier):
+        self.metrics.start_turn()
+        try:
+            turn = self._begin_turn(notifier)
+            with self.metrics.time("fetch_snapshot"):
+                await self.fetch_snapshot(turn)
+
+            with self.metrics.time("autopilot"):
+                await self._run_autopilot_cycle()
+
+            if not self._ran_game_start_event:
+                await self.on_game_start()
+                self._ran_game_start_event = True
+
+            with self.metrics.time("on_turn_start"):
+                await self.on_turn_start()
+        except exceptions.GameEndedException:
+            raise
+
+        except exceptions.TurnDeadlineExceededException:
+            # the rest of the turn was given up so it could be ended in time
+            pass
+
+        except Exception:
+            traceback.print_exc()
+
+        deadline_remaining = self._stop_turn_deadline()
+        await self._end_turn()
+        notifier.on_turn_end(time.time())
+        await self.flush_local_player_ship_data()
+
+        try:
+            await self.on_turn_metrics(self.metrics.end_turn(deadline_remaining))
+        except Exception:
+            traceback.print_exc()
+
+    async def flush_local_player_ship_data(self):
+        """
+        Writes the changes to the local player ship data which have not been written yet
+        The file or database is written on a worker thread, so the event loop is not blocked meanwhile
+        This is called automatically at the end of each turn
+        """
+        if self.local_data_writer.is_dirty():
+            await asyncio.get_running_loop().run_in_executor(None, self.local_data_writer.flush)
+
+    async def buy_ship(self, ship_id: str, auto_move: bool = True) -> ship_game_object.Ship:
+        """
+        Purchase a ship by its ID
+        Note that named constants are available with all the default ship IDs
+        :param ship_id: the ID of the ship you wish to purchase
+        :param auto_move: in the event a ship is in the way, do we automatically reposition that ship?
+        :return: the newly purchased ship
+        """
+        self._check_turn_deadline()
+        r = await self.transport.post("/store", headers=self._headers(), json={
+            "ship": ship_id
+        })
+        try:
+            self._handle_error(r)
+        except exceptions.ShipInTheWayException as e:
+            if auto_move:
+                ship = self._get_ship_in_the_way(r)
+                await ship.move_ship(*self.get_free_position_in_radius(
+                    self.me.x, self.me.y, ship.units_left
+                ))
+                return await self.buy_ship(ship_id, auto_move=False)
+
+            else:
+                raise e
+
+        await self._update_ships()
+        return self.me.ships.get_by_id(r.json()["id"])
+
+    async def get_store_catalog(self, refresh: bool = False) -> store_catalog.StoreCatalog:
+        """
+        Returns the store inventory as a StoreCatalog object
+        The catalog is fetched from the server the first time, and then cached for store_cache_ttl seconds
+        :param refresh: if the catalog should be fetched from the server even if the cached one has not expired
+        """
+        if refresh or not self._is_store_cache_valid():
+            if refresh:
+                self.response_cache.invalidate("/store", self.token)
+
+            r = await self.transport.get("/store", headers=self._headers())
+            self._handle_error(r)
+            self._process_store_response(r)
+
+        return self._store_catalog
+
+    async def get_store_inventory(self, refresh: bool = False) -> typing.List[ship_store_object.ShipStore]:
+        """
+        Returns the entire game inventory as a list of ShipStore objects
+        The ShipStore object has a coroutine 'purchase' to buy it, OR
+        you can pass its ID into the 'buy_ship' coroutine of this object
+        :param refresh: if the inventory should be fetched from the server even if the cached one has not expired
+        """
+        return list((await self.get_store_catalog(refresh)).items)
+
+    async def get_min_attribute_from_store(self, attribute: str) -> ship_store_object.ShipStore:
+        return (await self.get_store_catalog()).get_min(attribute)
+
+    async def get_max_attribute_from_store(self, attribute: str) -> ship_store_object.ShipStore:
+        return (await self.get_store_catalog()).get_max(attribute)
+
+    async def get_n_min_attribute_from_store(self, attribute: str, n: int) -> typing.List[ship_store_object.ShipStore]:
+        return (await self.get_store_catalog()).get_n_min(attribute, n)
+
+    async def get_n_max_attribute_from_store(self, attribute: str, n: int) -> typing.List[ship_store_object.ShipStore]:
+        return (await self.get_store_catalog()).get_n_max(attribute, n)
+
+    async def move_ship(self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int) -> typing.Tuple[int, int]:
+        """
+        Moves the provided ship object to the specified coordinates
+        :param ship: either the id of the ship you wish to move, OR the ship object
+        :param x:
+        :param y:
+        """
+        if isinstance(ship, ship_game_object.Ship):
+            ship = ship.id
+
+        self._check_turn_deadline()
+        r = await self.transport.post(
+            "/ship", headers=self._headers(), json={
+                "action": "move",
+                "position": [x, y],
+                "ship": ship
+            }
+        )
+
+        self._handle_error(r)
+        return self._process_move(ship, r.json())
+
+    async def move_ship_relative(self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int) -> typing.Tuple[int, int]:
+        """
+        Moves the provided ship object relative to its current position
+        :param ship: either the id of the ship you wish to move, OR the ship object
+        :param x:
+        :param y:
+        """
+        if isinstance(ship, ship_game_object.Ship):
+            ship = ship.id
+
+        self._check_turn_deadline()
+        r = await self.transport.post(
+            "/ship", headers=self._headers(), json={
+                "action": "move",
+                "relative": [x, y],
+                "ship": ship
+            }
+        )
+
+        self._handle_error(r)
+        return self._process_move(ship, r.json())
+
+    async def shoot_ship(self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int, repeat: int = 1):
+        """
+        Fires the gun of the provided ship to the specified position
+        :param ship: either the id of the ship you wish to move, OR the ship object
+        :param x:
+        :param y:
+        :param repeat: The number of times to fire the gun
+        """
+        if isinstance(ship, ship_game_object.Ship):
+            ship = ship.id
+
+        self._check_turn_deadline()
+        r = await self.transport.post(
+            "/ship", headers=self._headers(), json={
+                "action": "shoot",
+                "position": [x, y],
+                "ship": ship,
+                "repeat": repeat
+            }
+        )
+        self._handle_error(r)
+
+    async def shoot_ship_relative(self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int, repeat: int = 1):
+        """
+        Fires the gun of the provided ship relative to the current position of the ship
+        :param ship: either the id of the ship you wish to move, OR the ship object
+        :param x:
+        :param y:
+        :param repeat: The number of times to fire the gun
+        """
+        if isinstance(ship, ship_game_object.Ship):
+            ship = ship.id
+
+        self._check_turn_deadline()
+        r = await self.transport.post(
+            "/ship", headers=self._headers(), json={
+                "action": "shoot",
+                "relative": [x, y],
+                "ship": ship,
+                "repeat": repeat
+            }
+        )
+        self._handle_error(r)
@@ -0,0 +1,136 @@
+"""
+This module contains the asyncio counterpart of the transport
+It requires the optional aiohttp package to be installed
+"""
+import asyncio
+import json
+import typing
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+import BattleshAPy.utils as utils
+
+
+class AsyncResponse:
+    """
+    This object represents a fully read response from the API
+    It exposes the subset of the requests.Response interface which the library uses
+    """
+    def __init__(self, status_code: int, headers: typing.Mapping[str, str], content: bytes):
+        """
+        :param status_code:
+        :param headers:
+        :param content:
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        # the number of times the request was retried before this response was received
+        self.retries = 0
+
+    def json(self):
+        return json.loads(self.content.decode("utf-8"))
+
+    def __repr__(self):
+        return "<AsyncResponse [{}]>".format(self.status_code)
+
+
+class AsyncTransport:
+    """
+    This object owns a pooled, keep-alive aiohttp session to the API
+    The AsyncBattleshAPy object creates one of these and hands it to every game it creates,
+    so all the games controlled by one bot on one event loop reuse the same warm connections
+    """
+    def __init__(
+            self, url_base: str = None, pool_maxsize: int = 10,
+            timeout: typing.Union[float, typing.Tuple[float, float]] = (3.05, 10), max_retries: int = 3,
+            backoff_factor: float = 0.1, status_forcelist: typing.Iterable[int] = (502, 503, 504)
+    ):
+        """
+        :param url_base: the base URL of the API. Defaults to the value of utils.get_url_base()
+        :param pool_maxsize: the maximum number of connections kept alive per host
+        :param timeout: the request timeout in seconds, either a single number or a (connect, read) tuple
+        :param max_retries: the number of times an idempotent request is retried on connection errors
+        or on one of the statuses in status_forcelist
+        :param backoff_factor: the delay before the nth retry is backoff_factor * 2 ** (n - 1) seconds
+        :param status_forcelist: the statuses which cause an idempotent request to be retried
+        """
+        if aiohttp is None:
+            raise ImportError("The aiohttp package is required to use the asyncio client. Install it with 'pip install aiohttp'")
+
+        self.url_base = url_base if url_base is not None else utils.get_url_base()
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = frozenset(status_forcelist)
+
+        if isinstance(timeout, tuple):
+            self.timeout = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        else:
+            self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+        self.session = None         # type: aiohttp.ClientSession
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        # the session is created lazily as it must be created from within the running event loop
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.pool_maxsize), timeout=self.timeout
+            )
+
+        return self.session
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> AsyncResponse:
+        """
+        Sends a request to the specified endpoint of the API
+        GET and PUT requests are retried on connection errors, POST requests are not as they are not idempotent
+        :param method: the HTTP method
+        :param endpoint: the endpoint relative to the base URL (ex. "/ship")
+        :param kwargs: any additional arguments accepted by aiohttp
+        """
+        retries = self.max_retries if method in ("GET", "PUT") else 0
+        if "timeout" in kwargs and not isinstance(kwargs["timeout"], aiohttp.ClientTimeout):
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=kwargs["timeout"])
+
+        attempt = 0
+
+        while True:
+            try:
+                async with self._get_session().request(method, self.url_base + endpoint, **kwargs) as r:
+                    response = AsyncResponse(r.status, r.headers, await r.read())
+
+                if response.status_code not in self.status_forcelist or attempt >= retries:
+                    response.retries = attempt
+                    return response
+
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+
+            attempt += 1
+            await asyncio.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+
+    async def get(self, endpoint: str, **kwargs) -> AsyncResponse:
+        return await self.request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> AsyncResponse:
+        return await self.request("POST", endpoint, **kwargs)
+
+    async def put(self, endpoint: str, **kwargs) -> AsyncResponse:
+        return await self.request("PUT", endpoint, **kwargs)
+
+    async def close(self):
+        """
+        Closes all the pooled connections
+        """
+        if self.session is not None:
+            await self.session.close()
+
+    async def __aenter__(self) -> 'AsyncTransport':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
@@ -5,9 +5,13 @@ From here, the bot can attach to any game given the proper credentials
 import requests
 import requests.auth as auth
 
+import typing
+
 import BattleshAPy.game as game
-import BattleshAPy.utils as utils
+import BattleshAPy.supervisor as supervisor
+import BattleshAPy.transport as transport_layer
 import BattleshAPy.exceptions as exceptions
+import BattleshAPy.local_data.local_data_store as local_data_storage
 
 
 class BattleshAPy:
@@ -17,15 +21,26 @@ class BattleshAPy:
     which control the same bot in the same game at the same time
     This causes weird things to happen
     """
-    def __init__(self, client_id: str, client_secret: str):
+    def __init__(
+            self, client_id: str, client_secret: str, transport: transport_layer.Transport = None,
+            local_data_store: local_data_storage.LocalDataStore = None, local_data_flush_interval: float = None
+    ):
         """
         :param client_id:
         :param client_secret:
+        :param transport: the transport shared by every game this bot plays.
+        If not specified, a new one is created with the default pool, timeout and retry settings
+        :param local_data_store: the backend the local player ship data of every game this bot plays is kept in.
+        If not specified, each game keeps it in a 'local_data_<game_id>_<player>.json' file in the working directory
+        :param local_data_flush_interval: see Game
         """
         self.client_id = client_id
         self.client_secret = client_secret
 
-        self.url_base = utils.get_url_base()
+        self.transport = transport if transport is not None else transport_layer.Transport()
+        self.url_base = self.transport.url_base
+        self.local_data_store = local_data_store
+        self.local_data_flush_interval = local_data_flush_interval
 
     def create_game(
             self, game_class_ref: game.Game.__class__, length: int = 50, width: int = 50, money_per_turn: int = 100,
@@ -44,8 +59,8 @@ class BattleshAPy:
         :param turn_length:
         """
 
-        r = requests.post(
-            self.url_base + "/game", json=dict(
+        r = self.transport.post(
+            "/game", json=dict(
                 length=length,
                 width=width,
                 money_per_turn=money_per_turn,
@@ -58,7 +73,7 @@ class BattleshAPy:
 
         if r.status_code == 200:
             response = r.json()
-            return game_class_ref(response["game_id"], response["token"])
+            return self._create_game_object(game_class_ref, response["game_id"], response["token"])
 
     def join_game(self, game_class_ref: game.Game.__class__, game_id: str) -> game.Game:
         """
@@ -68,8 +83,8 @@ class BattleshAPy:
         :param game_id:
         :return:
         """
-        r = requests.post(
-            self.url_base + "/game", json=dict(
+        r = self.transport.post(
+            "/game", json=dict(
                 game_id=game_id
             ), auth=auth.HTTPBasicAuth(self.client_id, self.client_secret)
         )
@@ -78,7 +93,7 @@ class BattleshAPy:
 
         if r.status_code == 200:
             response = r.json()
-            return game_class_ref(response["game_id"], response["token"])
+            return self._create_game_object(game_class_ref, response["game_id"], response["token"])
 
     def connect_game(self, game_class_ref: game.Game.__class__, game_id: str, token: str) -> game.Game:
         """
@@ -89,7 +104,35 @@ class BattleshAPy:
         :param token:
         :return:
         """
-        return game_class_ref(game_id, token)
+        return self._create_game_object(game_class_ref, game_id, token)
+
+    def _create_game_object(self, game_class_ref: game.Game.__class__, game_id: str, token: str) -> game.Game:
+        # only the game ID and token are passed, as subclasses may override __init__ with just those.
+        # The transport and local data store reach the game through its defaults instead
+        with game.game_defaults(
+                transport=self.transport, local_data_store=self.local_data_store,
+                local_data_flush_interval=self.local_data_flush_interval
+        ):
+            return game_class_ref(game_id, token)
+
+    def run_games(
+            self, games: typing.List[game.Game], max_workers: int = 32, poll_every: float = 0.5, max_restarts: int = 3
+    ) -> typing.List[supervisor.SupervisedGame]:
+        """
+        Plays many games at once over a shared pool of worker threads, blocking until they have all ended
+        A game which fails is restarted without affecting the others. See the GameSupervisor object
+        For every worker to reuse a warm connection, the pool_maxsize of the transport should be at least max_workers
+        :param games: the games to play. They must have already started
+        :param max_workers: the number of worker threads shared by all the games
+        :param poll_every: see Game.play
+        :param max_restarts: the number of times in a row a failing game is restarted before it is given up on
+        :return: the supervised games, whose 'error' attribute holds the last exception raised by the game, if any
+        """
+        game_supervisor = supervisor.GameSupervisor(max_workers, poll_every, max_restarts)
+        for g in games:
+            game_supervisor.add_game(g)
+
+        return game_supervisor.run()
 
     def _handle_error(self, r: requests.Response):
         if r.status_code == 409:
@@ -0,0 +1,34 @@
+"""
+Runs the benchmarks and reports the time and memory each operation takes
+
+python -m BattleshAPy.benchmarks [--filter NAME] [--repeat N] [--json PATH]
+"""
+import argparse
+import sys
+
+import BattleshAPy.benchmarks.harness as harness
+import BattleshAPy.benchmarks.suite  # noqa: F401  registers the benchmarks
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m BattleshAPy.benchmarks", description="Benchmarks the hot paths of BattleshAPy")
+    parser.add_argument("--filter", default=None, help="only run the benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="the number of times each benchmark is timed")
+    parser.add_argument("--json", default=None, help="also write the results to this file as JSON")
+    args = parser.parse_args(argv)
+
+    print(harness.format_header())
+    results = harness.run_benchmarks(
+        harness.BENCHMARKS, args.repeat, args.filter,
+        lambda r: (print(harness.format_result(r)), sys.stdout.flush())
+    )
+
+    if args.json is not None:
+        with open(args.json, "w") as f:
+            f.write(harness.to_json(results))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
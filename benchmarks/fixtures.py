@@ -0,0 +1,101 @@
+"""
+This module builds the games the benchmarks run against, on an in-process simulated server
+"""
+import random
+import typing
+
+import BattleshAPy.battleshapy as battleshapy
+import BattleshAPy.game as game
+import BattleshAPy.turn_notifier as turn_notifier
+import BattleshAPy.local_data.local_data_store as local_data_storage
+import BattleshAPy.simulator.game_server as game_server
+import BattleshAPy.simulator.simulator_transport as simulator_transport
+
+
+class BenchmarkGame(game.Game):
+    """
+    This game does nothing on its turn, so only the library itself is measured
+    """
+    def on_turn_start(self):
+        pass
+
+
+class ImmediateNotifier(turn_notifier.TurnNotifier):
+    """
+    This notifier long polls the simulated server and never sleeps, so a turn loop runs as fast as the server allows
+    """
+    def __init__(self, wait: float = 5.0):
+        """
+        :param wait: the number of seconds the server is asked to hold each request for
+        """
+        super().__init__()
+        self.wait = wait
+
+    def get_request_kwargs(self) -> dict:
+        return dict(params=dict(wait=self.wait))
+
+    def get_delay(self, now: float = None) -> float:
+        return 0.0
+
+
+def populate(simulated_game: game_server.SimulatedGame, ships: int, rng: random.Random):
+    """
+    Places ships for every player on free positions of a started simulated game, without going through the store
+    :param simulated_game:
+    :param ships: the number of ships each player is given
+    :param rng:
+    """
+    taken = {p.base for p in simulated_game.players}
+    taken.update((s.x, s.y) for p in simulated_game.players for s in p.ships.values())
+
+    for player in simulated_game.players:
+        for _ in range(ships):
+            position = None
+            while position is None or position in taken:
+                position = (rng.randint(0, simulated_game.width), rng.randint(0, simulated_game.length))
+
+            taken.add(position)
+            ship = game_server.SimulatedShip(
+                simulated_game._new_id(), rng.choice(simulated_game.store), player, position[0], position[1]
+            )
+            player.ships[ship.id] = ship
+
+
+def create_game(
+        ships: int = 0, size: int = 50, players: int = 2, seed: int = 0, turn_length: int = 0,
+        local_data_store: local_data_storage.LocalDataStore = None,
+        game_class_ref: game.Game.__class__ = BenchmarkGame
+) -> typing.Tuple[typing.List[game.Game], game_server.SimulatedGame]:
+    """
+    Creates and starts a game on a new simulated server, with its islands, game status and ships already loaded
+    :param ships: the number of ships each player starts with
+    :param size: the width and length of the board
+    :param players:
+    :param seed: the seed of the server and of the ship placement, so every run plays the same game
+    :param turn_length:
+    :param local_data_store: the store of the first player. The others keep theirs in memory
+    :param game_class_ref:
+    :return: the game of each player, the first being the one whose turn it is, and the server side game
+    """
+    transport = simulator_transport.SimulatorTransport(game_server.GameServer(seed=seed))
+    bots = [
+        battleshapy.BattleshAPy(
+            "bench{}".format(i), "", transport,
+            local_data_store if i == 0 and local_data_store is not None else local_data_storage.MemoryLocalDataStore()
+        )
+        for i in range(players)
+    ]
+
+    games = [bots[0].create_game(game_class_ref, size, size, 0, 1000, turn_length)]
+    for bot in bots[1:]:
+        games.append(bot.join_game(game_class_ref, games[0].game_id))
+
+    games[0].start_game()
+    simulated_game = transport.server.games[games[0].game_id]
+    populate(simulated_game, ships, random.Random(seed))
+
+    for g in games:
+        g._prepare_play(0.3, turn_notifier.TurnNotifier())
+        g._update_ships()
+
+    return games, simulated_game
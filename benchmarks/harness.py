@@ -0,0 +1,177 @@
+"""
+This module contains the harness which times the benchmarks, measures their memory and reports the results
+"""
+import json
+import statistics
+import time
+import tracemalloc
+import typing
+
+
+class BenchmarkResult:
+    """
+    This object represents the measurements of a single benchmark with a single set of parameters
+    """
+    def __init__(self, name: str, params: dict, timings: typing.List[float], operations: int, peak_memory: int):
+        """
+        :param name:
+        :param params:
+        :param timings: the time each repeat took in seconds
+        :param operations: the number of operations each repeat performed
+        :param peak_memory: the largest amount of memory allocated during a single repeat in bytes
+        """
+        self.name = name
+        self.params = params
+        self.timings = timings
+        self.operations = operations
+        self.peak_memory = peak_memory
+
+    @property
+    def label(self) -> str:
+        return "{}[{}]".format(self.name, ",".join("{}={}".format(k, v) for k, v in self.params.items()))
+
+    @property
+    def best(self) -> float:
+        """
+        The time the fastest repeat took per operation, which is the least disturbed by the rest of the system
+        """
+        return min(self.timings) / self.operations
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings) / self.operations
+
+    @property
+    def p95(self) -> float:
+        timings = sorted(self.timings)
+        return timings[min(len(timings) - 1, int(round(0.95 * (len(timings) - 1))))] / self.operations
+
+    @property
+    def throughput(self) -> float:
+        """
+        The number of operations per second of the median repeat
+        """
+        return 1 / self.median if self.median > 0 else float("inf")
+
+    def to_dict(self) -> dict:
+        return dict(
+            name=self.name, params=self.params, operations=self.operations, repeats=len(self.timings),
+            best=self.best, median=self.median, p95=self.p95, throughput=self.throughput,
+            peak_memory=self.peak_memory
+        )
+
+    def __repr__(self):
+        return "<BenchmarkResult {} median={:.3g}s>".format(self.label, self.median)
+
+
+class Benchmark:
+    """
+    This object represents a registered benchmark
+    Its function is called once per repeat with the parameters, and returns the operation to time
+    and the number of operations it performs. Anything done before returning is setup and is not timed
+    """
+    def __init__(
+            self, name: str, function: typing.Callable[..., typing.Tuple[typing.Callable[[], typing.Any], int]],
+            params: typing.List[dict]
+    ):
+        """
+        :param name:
+        :param function:
+        :param params: the sets of parameters to run the benchmark with
+        """
+        self.name = name
+        self.function = function
+        self.params = params
+
+    def run(self, params: dict, repeat: int = 5) -> BenchmarkResult:
+        """
+        Runs the benchmark with a set of parameters
+        :param params:
+        :param repeat: the number of times the operation is timed. A further untimed repeat measures the memory
+        """
+        timings = []
+        operations = 1
+
+        for _ in range(repeat):
+            operation, operations = self.function(**params)
+            started_at = time.perf_counter()
+            operation()
+            timings.append(time.perf_counter() - started_at)
+
+        # tracing slows every allocation down, so the memory is measured separately from the timings
+        operation, _ = self.function(**params)
+        tracemalloc.start()
+        try:
+            operation()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return BenchmarkResult(self.name, params, timings, operations, peak_memory)
+
+    def __repr__(self):
+        return "<Benchmark {}>".format(self.name)
+
+
+BENCHMARKS = []         # type: typing.List[Benchmark]
+
+
+def benchmark(name: str, params: typing.List[dict] = None):
+    """
+    A decorator which registers a benchmark
+    :param name:
+    :param params: the sets of parameters to run the benchmark with. Default is a single run without parameters
+    """
+    def decorator(function):
+        BENCHMARKS.append(Benchmark(name, function, params if params is not None else [{}]))
+        return function
+
+    return decorator
+
+
+def run_benchmarks(
+        benchmarks: typing.List[Benchmark], repeat: int = 5, name_filter: str = None,
+        on_result: typing.Callable[[BenchmarkResult], None] = None
+) -> typing.List[BenchmarkResult]:
+    """
+    Runs every benchmark with each of its sets of parameters
+    :param benchmarks:
+    :param repeat: see Benchmark.run
+    :param name_filter: only the benchmarks whose name contains this are run
+    :param on_result: called with each result as soon as it is measured
+    """
+    results = []
+    for b in benchmarks:
+        if name_filter is not None and name_filter not in b.name:
+            continue
+
+        for params in b.params:
+            result = b.run(params, repeat)
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    return results
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return "{:.3g}{}".format(seconds / scale, unit)
+
+    return "{:.3g}ns".format(seconds / 1e-9)
+
+
+def format_header() -> str:
+    return "{:<76} {:>10} {:>10} {:>10} {:>14} {:>10}".format("benchmark", "best", "median", "p95", "ops/s", "peak mem")
+
+
+def format_result(result: BenchmarkResult) -> str:
+    return "{:<76} {:>10} {:>10} {:>10} {:>14,.0f} {:>9.0f}K".format(
+        result.label, _format_time(result.best), _format_time(result.median), _format_time(result.p95),
+        result.throughput, result.peak_memory / 1024
+    )
+
+
+def to_json(results: typing.List[BenchmarkResult]) -> str:
+    return json.dumps([r.to_dict() for r in results], indent=2)
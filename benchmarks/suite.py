@@ -0,0 +1,262 @@
+"""
+This module contains the benchmarks of the hot paths of the library
+"""
+import functools
+import json
+import random
+import tempfile
+import threading
+
+import BattleshAPy.json_codec as json_codec
+import BattleshAPy.game_object_collection.ship_collection as ship_collection
+import BattleshAPy.local_data.player_ship as local_player_ship
+import BattleshAPy.local_data.local_data_store as local_data_storage
+import BattleshAPy.benchmarks.fixtures as fixtures
+from BattleshAPy.benchmarks.harness import benchmark
+
+
+@functools.lru_cache(maxsize=None)
+def _get_shared_game(ships: int, size: int):
+    # the games of the benchmarks which do not change them are built once and reused by every repeat
+    games, simulated_game = fixtures.create_game(ships, size)
+    return games[0], simulated_game
+
+
+_directory = None       # type: tempfile.TemporaryDirectory
+
+
+def _get_directory() -> str:
+    # every store gets a directory of its own, so no run loads the data of a previous one
+    global _directory
+    if _directory is None:
+        _directory = tempfile.TemporaryDirectory(prefix="battleshapy-bench-")
+
+    return tempfile.mkdtemp(dir=_directory.name)
+
+
+@benchmark("collection.from_json", [dict(ships=10), dict(ships=100), dict(ships=1000)])
+def bench_from_json(ships: int):
+    g, simulated_game = _get_shared_game(ships, 100)
+    data = [p for p in simulated_game.get_ships(simulated_game.players[0]) if p["me"]][0]["ships"]
+    local_player_ships = {s["id"]: local_player_ship.PlayerShip(s["id"]) for s in data}
+
+    def operation():
+        for _ in range(20):
+            ship_collection.ShipCollection([]).from_json(data, local_player_ships=local_player_ships)
+
+    return operation, 20
+
+
+@benchmark("decode.ships", [
+    dict(ships=ships, backend=backend) for ships in (100, 1000) for backend in json_codec.BACKENDS
+])
+def bench_decode_ships(ships: int, backend: str):
+    # parsing the /ship payload and building every ship of every player from it, as the first update of a game does
+    g, simulated_game = _get_shared_game(ships, 100)
+    content = json.dumps(simulated_game.get_ships(simulated_game.players[0])).encode("utf-8")
+    loads = json_codec.BACKENDS[backend]
+
+    def operation():
+        for _ in range(10):
+            for p in loads(content):
+                ship_collection.ShipCollection([]).from_json(
+                    p["ships"], local_player_ships=g.local_player_ship_data if p["me"] else None
+                )
+
+    return operation, 10
+
+
+@benchmark("decode.store", [dict(backend=backend) for backend in json_codec.BACKENDS])
+def bench_decode_store(backend: str):
+    g, simulated_game = _get_shared_game(0, 50)
+    content = json.dumps(simulated_game.store).encode("utf-8")
+    loads = json_codec.BACKENDS[backend]
+
+    def operation():
+        for _ in range(1000):
+            g._process_store_inventory(loads(content))
+
+    return operation, 1000
+
+
+@benchmark("game._update_ships", [dict(ships=10), dict(ships=100), dict(ships=1000)])
+def bench_update_ships(ships: int):
+    g, _ = _get_shared_game(ships, 100)
+
+    def operation():
+        for _ in range(10):
+            g._update_ships()
+
+    return operation, 10
+
+
+@benchmark("game._update_ships.moved", [dict(ships=100), dict(ships=1000)])
+def bench_update_ships_moved(ships: int):
+    # every ship of every player has moved since the previous update, so each one is reconciled and re-indexed
+    games, simulated_game = fixtures.create_game(ships, 100)
+    g = games[0]
+    moved = []
+    for _ in range(10):
+        for p in simulated_game.players:
+            for s in p.ships.values():
+                s.x, s.y = s.y, s.x
+
+        moved.append([p for p in simulated_game.get_ships(simulated_game.players[0])])
+
+    def operation():
+        for data in moved:
+            g._process_ships(data)
+
+    return operation, len(moved)
+
+
+@benchmark("game.fetch_snapshot", [
+    dict(ships=ships, endpoint=endpoint) for ships in (10, 100) for endpoint in ("/state", None)
+])
+def bench_fetch_snapshot(ships: int, endpoint: str):
+    # the state at the start of a turn, fetched with the combined endpoint or with concurrent requests
+    g, _ = _get_shared_game(ships, 100)
+    g.snapshot_endpoint = endpoint
+
+    def operation():
+        for _ in range(10):
+            g.fetch_snapshot()
+
+    return operation, 10
+
+
+def _get_queries(size: int, count: int = 10000):
+    rng = random.Random(1)
+    return [(rng.randint(0, size), rng.randint(0, size)) for _ in range(count)]
+
+
+@benchmark("game.is_position_occupied", [dict(ships=100, size=100), dict(ships=1000, size=200)])
+def bench_is_position_occupied(ships: int, size: int):
+    g, _ = _get_shared_game(ships, size)
+    queries = _get_queries(size)
+
+    def operation():
+        for x, y in queries:
+            g.is_position_occupied(x, y)
+
+    return operation, len(queries)
+
+
+@benchmark("game.is_position_occupied_or_targeted", [dict(ships=100, size=100), dict(ships=1000, size=200)])
+def bench_is_position_occupied_or_targeted(ships: int, size: int):
+    g, _ = _get_shared_game(ships, size)
+    rng = random.Random(2)
+    for ship in g.me.ships.objects[::2]:
+        ship.local_player_ship.target_x, ship.local_player_ship.target_y = rng.randint(0, size), rng.randint(0, size)
+        g.occupancy.update_target(ship)
+
+    queries = _get_queries(size)
+
+    def operation():
+        for x, y in queries:
+            g.is_position_occupied_or_targeted(x, y)
+
+    return operation, len(queries)
+
+
+@benchmark("game.get_free_position_in_radius", [
+    dict(ships=500, size=100, r=10), dict(ships=2000, size=100, r=10), dict(ships=2000, size=500, r=25)
+])
+def bench_get_free_position_in_radius(ships: int, size: int, r: int):
+    g, _ = _get_shared_game(ships, size)
+    queries = _get_queries(size, 1000)
+
+    def operation():
+        for x, y in queries:
+            try:
+                g.get_free_position_in_radius(x, y, r)
+            except ValueError:
+                pass
+
+    return operation, len(queries)
+
+
+@benchmark("game.get_all_free_positions_in_radius", [dict(ships=2000, size=100, r=10)])
+def bench_get_all_free_positions_in_radius(ships: int, size: int, r: int):
+    g, _ = _get_shared_game(ships, size)
+    queries = _get_queries(size, 200)
+
+    def operation():
+        for x, y in queries:
+            g.get_all_free_positions_in_radius(x, y, r)
+
+    return operation, len(queries)
+
+
+def _create_store(store: str) -> local_data_storage.LocalDataStore:
+    if store == "memory":
+        return local_data_storage.MemoryLocalDataStore()
+
+    if store == "json":
+        return local_data_storage.JSONLocalDataStore(_get_directory())
+
+    if store == "journal":
+        return local_data_storage.JSONLocalDataStore(_get_directory(), journal=True)
+
+    return local_data_storage.SQLiteLocalDataStore(_get_directory() + "/local_data.sqlite3")
+
+
+@benchmark("game.flush_local_player_ship_data", [
+    dict(store=store, ships=ships, changed=changed)
+    for store in ("memory", "json", "journal", "sqlite") for ships, changed in ((500, 500), (500, 10))
+])
+def bench_flush_local_player_ship_data(store: str, ships: int, changed: int):
+    games, _ = fixtures.create_game(ships, 60, local_data_store=_create_store(store))
+    g = games[0]
+    for ship in g.me.ships.objects:
+        ship.set_attribute("role", "scout")
+
+    g.flush_local_player_ship_data()
+    ship_ids = [ship.id for ship in g.me.ships.objects[:changed]]
+
+    def operation():
+        for i in range(10):
+            for ship_id in ship_ids:
+                g.local_player_ship_data[ship_id].metadata["turn"] = i
+                g.mark_local_player_ship_data_dirty(ship_id)
+
+            g.flush_local_player_ship_data()
+
+    return operation, 10
+
+
+class TurnLimitedGame(fixtures.BenchmarkGame):
+    """
+    This game sends its ships to random positions, and stops playing after a number of turns
+    """
+    turns_left = 0
+
+    def on_create(self):
+        self.rng = random.Random(self.token)
+
+    def on_turn_start(self):
+        for ship in self.me.ships.objects:
+            if ship.local_player_ship.target_x is None:
+                ship.set_target(self.rng.randint(0, self.game_size[0]), self.rng.randint(0, self.game_size[1]))
+
+        self.turns_left -= 1
+        if self.turns_left <= 0:
+            self.running = False
+
+
+@benchmark("game.play", [dict(ships=0, turns=50), dict(ships=20, turns=50), dict(ships=100, turns=20)])
+def bench_play(ships: int, turns: int):
+    # both bots play their turns on threads of their own, waiting for each other through the long polling server
+    games, _ = fixtures.create_game(ships, 50, game_class_ref=TurnLimitedGame)
+    for g in games:
+        g.turns_left = turns
+
+    def operation():
+        threads = [threading.Thread(target=g.play, kwargs=dict(notifier=fixtures.ImmediateNotifier())) for g in games]
+        for t in threads:
+            t.start()
+
+        for t in threads:
+            t.join()
+
+    return operation, turns * len(games)
@@ -0,0 +1,151 @@
+"""
+This module contains the board view, which exposes the state of the game as NumPy arrays
+It requires the optional numpy package to be installed
+"""
+import typing
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if typing.TYPE_CHECKING:
+    import BattleshAPy.game as game_object
+    import BattleshAPy.game_object.player_game_object as player_game_object
+
+
+class BoardView:
+    """
+    This object represents the state of the game as arrays with one element per tile, indexed as array[x, y]
+    Each array is computed once when the view is created, so whole-board features can be queried without looping over tiles
+
+    - owner -- the index in 'players' of the player owning the ship on the tile, or -1 if there is none
+    - hp -- the hp of the ship on the tile
+    - shot_range -- the shot range of the ship on the tile
+    - shot_damage -- the damage per shot of the ship on the tile
+    - island_value -- the money per turn of the island on the tile
+    - base_owner -- the index in 'players' of the player whose base is on the tile, or -1 if there is none
+
+    WARNING: Do not instantiate this object directly. Use the 'get_board_view' method of the game
+    """
+    def __init__(self, game: 'game_object.Game'):
+        """
+        :param game:
+        """
+        if numpy is None:
+            raise ImportError("The numpy package is required to use the board view. Install it with 'pip install numpy'")
+
+        self.game = game
+        self.players = list(game.players.objects)           # type: typing.List[player_game_object.Player]
+        self.shape = (game.game_size[0] + 1, game.game_size[1] + 1)
+
+        self.xs, self.ys = numpy.indices(self.shape)
+
+        self.owner = numpy.full(self.shape, -1, dtype=numpy.int32)
+        self.base_owner = numpy.full(self.shape, -1, dtype=numpy.int32)
+        self.hp = numpy.zeros(self.shape, dtype=numpy.int64)
+        self.shot_range = numpy.zeros(self.shape, dtype=numpy.int64)
+        self.shot_damage = numpy.zeros(self.shape, dtype=numpy.int64)
+        self.island_value = numpy.zeros(self.shape, dtype=numpy.int64)
+
+        # one row per ship: x, y, owner, hp, shot range, shot damage, shots per turn
+        rows = []
+        for i, player in enumerate(self.players):
+            if self._in_bounds(player.x, player.y):
+                self.base_owner[player.x, player.y] = i
+
+            for ship in player.ships.objects:
+                if self._in_bounds(ship.x, ship.y):
+                    rows.append((ship.x, ship.y, i, ship.hp, ship.shot_range, ship.shot_damage, ship.shots_per_turn))
+
+        self._ships = numpy.array(rows, dtype=numpy.int64).reshape(-1, 7)
+        ship_x, ship_y = self._ships[:, 0], self._ships[:, 1]
+        self.owner[ship_x, ship_y] = self._ships[:, 2]
+        self.hp[ship_x, ship_y] = self._ships[:, 3]
+        self.shot_range[ship_x, ship_y] = self._ships[:, 4]
+        self.shot_damage[ship_x, ship_y] = self._ships[:, 5]
+
+        for island in game.islands.objects:
+            if self._in_bounds(island.x, island.y):
+                self.island_value[island.x, island.y] = island.money_per_turn
+
+    def _in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.shape[0] and 0 <= y < self.shape[1]
+
+    def _get_player_mask(self, players: typing.Iterable['player_game_object.Player'] = None) -> 'numpy.ndarray':
+        if players is None:
+            return numpy.ones(len(self._ships), dtype=bool)
+
+        players = list(players)
+        indexes = [i for i, p in enumerate(self.players) if p in players]
+        return numpy.isin(self._ships[:, 2], indexes)
+
+    def distance_from(self, x: int, y: int) -> 'numpy.ndarray':
+        """
+        Returns the distance from every tile to the specified point
+        :param x:
+        :param y:
+        """
+        return numpy.abs(self.xs - x) + numpy.abs(self.ys - y)
+
+    def _sum_in_range(self, ships: 'numpy.ndarray', weights: 'numpy.ndarray') -> 'numpy.ndarray':
+        # The tiles within a distance r of a point form a diamond, which is a square in the coordinates
+        # u = x + y and v = x - y. Summing the weights of the ships in range of every tile is therefore
+        # a box sum over a summed-area table of the rotated board, done once per distinct shot range
+        result = numpy.zeros(self.shape, dtype=numpy.float64)
+        size = self.shape[0] + self.shape[1] - 1
+        offset = self.shape[1] - 1
+
+        u = self.xs + self.ys
+        v = self.xs - self.ys + offset
+
+        for r in numpy.unique(ships[:, 4]):
+            selected = ships[:, 4] == r
+
+            rotated = numpy.zeros((size + 1, size + 1), dtype=numpy.float64)
+            numpy.add.at(
+                rotated,
+                (ships[selected, 0] + ships[selected, 1] + 1, ships[selected, 0] - ships[selected, 1] + offset + 1),
+                weights[selected]
+            )
+            table = rotated.cumsum(axis=0).cumsum(axis=1)
+
+            u_min = numpy.clip(u - r, 0, size)
+            u_max = numpy.clip(u + r + 1, 0, size)
+            v_min = numpy.clip(v - r, 0, size)
+            v_max = numpy.clip(v + r + 1, 0, size)
+
+            result += table[u_max, v_max] - table[u_min, v_max] - table[u_max, v_min] + table[u_min, v_min]
+
+        return result
+
+    def coverage(self, players: typing.Iterable['player_game_object.Player'] = None) -> 'numpy.ndarray':
+        """
+        Returns the number of ships which can shoot each tile
+        :param players: the players whose ships are counted. Default is every player
+        """
+        ships = self._ships[self._get_player_mask(players)]
+        return self._sum_in_range(ships, numpy.ones(len(ships))).astype(numpy.int64)
+
+    def threat(self, players: typing.Iterable['player_game_object.Player'] = None) -> 'numpy.ndarray':
+        """
+        Returns the total damage per turn which could be dealt to each tile (shot damage * shots per turn)
+        :param players: the players whose ships are counted. Default is every player
+        """
+        ships = self._ships[self._get_player_mask(players)]
+        return self._sum_in_range(ships, (ships[:, 5] * ships[:, 6]).astype(numpy.float64)).astype(numpy.int64)
+
+    def enemy_coverage(self) -> 'numpy.ndarray':
+        """
+        Returns the number of enemy ships which can shoot each tile
+        """
+        return self.coverage(self.game.get_other_players().objects)
+
+    def enemy_threat(self) -> 'numpy.ndarray':
+        """
+        Returns the total damage per turn which enemy ships could deal to each tile
+        """
+        return self.threat(self.game.get_other_players().objects)
+
+    def __repr__(self):
+        return "<BoardView shape={} ships={}>".format(self.shape, len(self._ships))
@@ -54,6 +54,10 @@ class GameEndedException(BattleshAPIException):
     pass
 
 
+class TurnDeadlineExceededException(BattleshAPIException):
+    pass
+
+
 CODE_EXCEPTION_LOOKUP = {
     1: NotYourTurnException,
     2: AlreadyRegisteredException,
@@ -0,0 +1,97 @@
+"""
+This module contains the fleet planner, which decides the autopilot moves of all my ships together
+"""
+import typing
+
+if typing.TYPE_CHECKING:
+    import BattleshAPy.game as game_object
+    import BattleshAPy.game_object.ship_game_object as ship_game_object
+
+
+Position = typing.Tuple[int, int]
+
+
+class PlannedMove:
+    """
+    This object represents the move the planner has chosen for a single ship
+    """
+    def __init__(self, ship: 'ship_game_object.Ship', dx: int, dy: int):
+        """
+        :param ship:
+        :param dx:
+        :param dy:
+        """
+        self.ship = ship
+        self.dx = dx
+        self.dy = dy
+
+    @property
+    def destination(self) -> Position:
+        return self.ship.x + self.dx, self.ship.y + self.dy
+
+    def __repr__(self):
+        return "<PlannedMove ship={} dx={} dy={}>".format(self.ship.id, self.dx, self.dy)
+
+
+class FleetPlanner:
+    """
+    This object plans a conflict free set of autopilot moves for the whole fleet in one pass
+    Ships are planned one at a time in priority order against a reservation table of the positions
+    every ship will be at once the moves before it have been made
+    A ship may only move into a position vacated by a ship planned before it, so sending the moves in the planned order
+    never moves a ship onto another, and no move fails because of the fleet itself
+    WARNING: Do not instantiate this object directly. The library will handle this
+    """
+    def __init__(self, game: 'game_object.Game'):
+        """
+        :param game:
+        """
+        self.game = game
+
+    def get_priority(self, ship: 'ship_game_object.Ship', goal: Position) -> tuple:
+        """
+        Returns the priority of a ship. Ships with smaller priorities are planned first
+        By default, the ships nearest to their target go first, so the ships at the front of a column clear the way
+        for the ships behind them. Override this method to change the order
+        :param ship:
+        :param goal: the position the autopilot is moving the ship to
+        """
+        return ship.distance(*goal), ship.id
+
+    def plan(self, ships: typing.List['ship_game_object.Ship']) -> typing.List[PlannedMove]:
+        """
+        Plans the moves of the specified ships
+        Ships which have reached their target have it cleared and are left out
+        :param ships:
+        :return: the moves to make, in the order they must be sent
+        """
+        goals = []
+        for ship in ships:
+            goal = ship.get_autopilot_goal()
+            if goal is not None:
+                goals.append((self.get_priority(ship, goal), ship))
+
+        goals.sort(key=lambda g: g[0])
+
+        # the positions ships will be at. It starts as where they are now, and follows each planned move
+        reserved = set(self.game.occupancy.ships.keys())
+        moves = []
+
+        for _, ship in goals:
+            dx, dy = ship.get_next_move(reserved)
+            if dx == 0 and dy == 0:
+                continue
+
+            move = PlannedMove(ship, dx, dy)
+            if move.destination in reserved or self.game.occupancy.get_base(*move.destination) is not None:
+                # the ship fell back to the straight line move, which would run into a ship or a base
+                continue
+
+            reserved.discard((ship.x, ship.y))
+            reserved.add(move.destination)
+            moves.append(move)
+
+        return moves
+
+    def __repr__(self):
+        return "<FleetPlanner>"
@@ -2,13 +2,17 @@
 This module contains the game class which represents a single bot playing a single game
 """
 import abc
+import concurrent.futures
+import contextlib
+import contextvars
 import datetime
-import os.path
+import hashlib
+import itertools
 import random
+import threading
 import time
 import traceback
 import typing
-import json
 
 import requests
 
@@ -17,11 +21,42 @@ import BattleshAPy.game_object.player_game_object as player_game_object
 import BattleshAPy.game_object.ship_game_object as ship_game_object
 import BattleshAPy.game_object_collection.island_collection as island_collection
 import BattleshAPy.game_object_collection.player_collection as player_collection
-import BattleshAPy.game_object_collection.ship_collection as ship_collection
 import BattleshAPy.store_object.ship_store_object as ship_store_object
-import BattleshAPy.utils as utils
+import BattleshAPy.store_object.store_catalog as store_catalog
+import BattleshAPy.transport as transport_layer
+import BattleshAPy.order_batch as order_batch
+import BattleshAPy.state_diff as state_diff
+import BattleshAPy.occupancy_index as occupancy_index
+import BattleshAPy.pathfinding as pathfinding
+import BattleshAPy.fleet_planner as fleet_planner
+import BattleshAPy.board_view as board_view
+import BattleshAPy.turn_notifier as turn_notifier
+import BattleshAPy.turn_deadline as turn_deadline
+import BattleshAPy.metrics as game_metrics
+import BattleshAPy.json_codec as json_codec
+import BattleshAPy.response_cache as response_cache
+import BattleshAPy.turn_snapshot as turn_snapshot
 import BattleshAPy.exceptions as exceptions
-import BattleshAPy.local_data.player_ship as local_player_ship
+import BattleshAPy.local_data.local_data_writer as local_data_writer
+import BattleshAPy.local_data.local_data_store as local_data_storage
+
+
+# the arguments the BattleshAPy object gives the games it creates, for the ones the game was not constructed with.
+# Subclasses which override __init__ with only a game ID and token still receive them this way
+_game_defaults = contextvars.ContextVar("game_defaults", default={})
+
+
+@contextlib.contextmanager
+def game_defaults(**kwargs):
+    """
+    Games constructed inside this block use these arguments for any of transport, local_data_store
+    and local_data_flush_interval they are not given
+    """
+    token = _game_defaults.set(kwargs)
+    try:
+        yield
+    finally:
+        _game_defaults.reset(token)
 
 
 class Game(abc.ABC):
@@ -34,31 +69,94 @@ class Game(abc.ABC):
 
     Optional methods to override:
     - on_create -- Called once after the object has been initialized.
+    - on_turn_metrics -- Called at the end of each of my turns with the metrics of that turn
     """
-    def __init__(self, game_id: str, token: str):
+    def __init__(
+            self, game_id: str, token: str, transport: transport_layer.Transport = None,
+            local_data_store: local_data_storage.LocalDataStore = None, local_data_flush_interval: float = None
+    ):
         """
         :param game_id:
         :param token:
+        :param transport: the transport used to talk to the API.
+        If not specified, a new one is created for this game only
+        :param local_data_store: the backend the local player ship data is kept in.
+        If not specified, it is kept in a 'local_data_<game_id>_<player>.json' file in the working directory
+        :param local_data_flush_interval: the number of seconds after a change to the local player ship data
+        at which it is written, in addition to the end of each turn. If not specified, it is only written at the end of each turn
         """
+        defaults = _game_defaults.get()
+        if transport is None:
+            transport = defaults.get("transport") or self._create_transport()
+
+        if local_data_store is None:
+            local_data_store = defaults.get("local_data_store")
+
+        if local_data_flush_interval is None:
+            local_data_flush_interval = defaults.get("local_data_flush_interval")
+
         self.running = True
         self.game_id = game_id
         self.token = token
 
-        self.url_base = utils.get_url_base()
+        # the request latencies, phase timings and errors of this game, and a record of each of my turns
+        self.metrics = game_metrics.Metrics()
+        # the responses of the endpoints whose data rarely changes. Only the requests it can not answer reach the metrics
+        self.response_cache = response_cache.ResponseCache()
+        self.transport = response_cache.CachingTransport(
+            game_metrics.InstrumentedTransport(transport, self.metrics),
+            self.response_cache
+        )
+        self.url_base = self.transport.url_base
 
         self.game_size = None           # type: typing.Tuple[int, int]
         self.turn_length = None         # type: datetime.time
 
+        # the strategy the main loop uses to wait for my turn. None uses an AdaptivePollingNotifier
+        self.turn_notifier = None       # type: turn_notifier.TurnNotifier
+        self._ran_game_start_event = False
+
+        # the time left in my current turn, and the measured round trip time of a request in seconds
+        self.turn_deadline = None       # type: turn_deadline.TurnDeadline
+        self.rtt = None                 # type: float
+        # the number of seconds of each turn kept in reserve, and the number of turns which were ended by the server
+        self.turn_deadline_margin = 0.1
+        self.overrun_turns = 0
+
         self.players = player_collection.PlayerCollection([])      # type: player_collection.PlayerCollection[player_game_object.Player]
         self.islands = island_collection.IslandCollection([])      # type: island_collection.IslandCollection[island_game_object.Island]
 
         self.me = None              # type: player_game_object.Player
+        self.turn_diff = state_diff.StateDiff()
+        # the state of the game at the start of my current turn, and at the start of my previous turns
+        self.snapshot = None            # type: turn_snapshot.TurnSnapshot
+        self.history = turn_snapshot.TurnHistory()
+        # an endpoint which answers with the turn, game status, ships and islands at once. None fetches them concurrently
+        self.snapshot_endpoint = getattr(self.transport, "snapshot_endpoint", None)     # type: str
+        self._polled_turn = None        # type: dict
+        self.occupancy = occupancy_index.OccupancyIndex()
+        # the lanes of an order batch send their requests on worker threads,
+        # so the indexes the results are applied to are only changed while holding this
+        self._state_lock = threading.RLock()
+        self.pathfinder = pathfinding.Pathfinder(self)
+        self.fleet_planner = fleet_planner.FleetPlanner(self)
+        self._board_view = None      # type: board_view.BoardView
+
+        # the number of seconds the store inventory is cached for. None caches it until invalidate_store_cache is called
+        self.store_cache_ttl = 60.0
+        self._store_catalog = None      # type: store_catalog.StoreCatalog
 
         self.base_locations = {}
 
         # test credentials
-        self._poll_game_status()
+        self._test_credentials()
 
+        # persists the local player ship data. Changes are written at the end of each turn rather than as they happen
+        # the records are kept per player as well as per game, as several bots may play the same game from one directory.
+        # The token is hashed so it is never written to disk
+        self.local_data_writer = local_data_writer.LocalDataWriter(
+            game_id, local_data_store, local_data_flush_interval, hashlib.sha1(token.encode("utf-8")).hexdigest()[:12]
+        )
         self.local_player_ship_data = {}
         self._load_local_player_ship_data()
 
@@ -69,11 +167,22 @@ class Game(abc.ABC):
         This overridable method is called on object creation
         """
 
+    @staticmethod
+    def _create_transport() -> transport_layer.Transport:
+        return transport_layer.Transport()
+
     def _headers(self) -> dict:
         return dict(token=self.token)
 
+    def _test_credentials(self):
+        self._poll_game_status()
+
+    def _no_op(self, value=None):
+        # lets helpers which can skip a request return something the caller can treat like the result of one
+        return value
+
     def _poll_game_status(self) -> dict:
-        r = requests.get(self.url_base + "/game", headers=self._headers())
+        r = self.transport.get("/game", headers=self._headers())
         self._handle_error(r)
         return r.json()
 
@@ -137,32 +246,34 @@ class Game(abc.ABC):
         """
         Sends the command to start the game
         """
-        r = requests.put(self.url_base + "/game", headers=self._headers())
+        r = self.transport.put("/game", headers=self._headers())
         self._handle_error(r)
         return self
 
+    def _get_turn(self, **kwargs) -> dict:
+        r = self.transport.get("/turn", headers=self._headers(), **kwargs)
+        self._handle_error(r)
+        return r.json()
+
     def is_my_turn(self) -> bool:
         """
         Determines if it is my turn or not
         """
-        r = requests.get(self.url_base + "/turn", headers=self._headers())
-        self._handle_error(r)
-        return r.json()["is_me"]
+        return self._get_turn()["is_me"]
 
     def get_current_turn(self) -> player_game_object.Player:
         """
         Returns the player whose turn it currently is
         """
-        r = requests.get(self.url_base + "/turn", headers=self._headers())
-        self._handle_error(r)
-        return self.players.get_by_id(r.json()["turn"])
+        return self.players.get_by_id(self._get_turn()["turn"])
 
     def _end_turn(self):
-        r = requests.post(self.url_base + "/turn", headers=self._headers())
+        r = self.transport.post("/turn", headers=self._headers())
         try:
             self._handle_error(r)
         except exceptions.NotYourTurnException:
-            pass
+            # the turn ran out before it was ended
+            self.overrun_turns += 1
 
     @abc.abstractmethod
     def on_turn_start(self):
@@ -172,76 +283,203 @@ class Game(abc.ABC):
         """
 
     def _update_islands(self):
-        r = requests.get(self.url_base + "/island", headers=self._headers())
+        r = self.transport.get("/island", headers=self._headers())
         self._handle_error(r)
-        self.islands.from_json(r.json())
-
-    def flush_local_player_ship_data(self):
-        with open("local_data.json", 'w') as f:
-            data = {k: v.to_dict() for k, v in self.local_player_ship_data.items()}
-            f.write(json.dumps(data))
+        self._process_islands_response(r)
 
-    def _load_local_player_ship_data(self):
-        if not os.path.isfile("local_data.json"):
-            self.local_player_ship_data = {}
+    def _process_islands_response(self, r: requests.Response):
+        # a response from the cache holds the islands which are already loaded
+        if getattr(r, "from_cache", False) and len(self.islands.objects) > 0:
             return
 
-        with open("local_data.json", 'r') as f:
-            try:
-                for ship_id, data in json.loads(f.read()).items():
-                    self.local_player_ship_data[ship_id] = local_player_ship.PlayerShip.from_dict(data)
+        self._process_islands(json_codec.decode_response(r))
 
-            except json.JSONDecodeError:
-                self.local_player_ship_data = {}
+    def _process_islands(self, data: list):
+        self.islands.sync_json(data)
+        self.occupancy.rebuild_islands(self.islands)
+        self._board_view = None
+
+    def flush_local_player_ship_data(self):
+        """
+        Writes the changes to the local player ship data which have not been written yet
+        This is called automatically at the end of each turn
+        """
+        self.local_data_writer.flush()
+
+    def mark_local_player_ship_data_dirty(self, ship_id: str):
+        """
+        Marks the local data of a ship as changed, so it is written by the next flush
+        :param ship_id:
+        """
+        self.local_data_writer.mark_dirty(ship_id)
+
+    def _load_local_player_ship_data(self):
+        self.local_player_ship_data = self.local_data_writer.load()
 
     def _update_ships(self):
-        r = requests.get(self.url_base + "/ship", headers=self._headers())
+        sent_at = time.time()
+        r = self.transport.get("/ship", headers=self._headers())
+        self._record_rtt(time.time() - sent_at)
         self._handle_error(r)
+        self._process_ships(json_codec.decode_response(r))
+
+    def _get_snapshot_endpoints(self, turn: dict = None) -> typing.List[str]:
+        if self.snapshot_endpoint is not None:
+            return [self.snapshot_endpoint]
+
+        endpoints = ["/ship", "/island", "/game"]
+        if turn is None:
+            endpoints.append("/turn")
+
+        return endpoints
+
+    def _timed_get(self, endpoint: str) -> typing.Tuple[requests.Response, float]:
+        sent_at = time.time()
+        r = self.transport.get(endpoint, headers=self._headers())
+        return r, time.time() - sent_at
+
+    def fetch_snapshot(self, turn: dict = None) -> turn_snapshot.TurnSnapshot:
+        """
+        Fetches whose turn it is, the ships, the islands and the game status concurrently rather than one after another,
+        updates the game objects from them, and returns them as an immutable TurnSnapshot
+        The snapshot is also kept in the snapshot attribute. This is called automatically at the start of each of my turns
+        :param turn: the response of GET /turn, if it is already known
+        """
+        taken_at = time.time()
+        endpoints = self._get_snapshot_endpoints(turn)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+            futures = {e: pool.submit(self._timed_get, e) for e in endpoints}
+
+        return self._process_snapshot({e: f.result() for e, f in futures.items()}, turn, taken_at)
+
+    def _process_snapshot(
+            self, responses: typing.Dict[str, typing.Tuple[requests.Response, float]], turn: typing.Optional[dict],
+            taken_at: float
+    ) -> turn_snapshot.TurnSnapshot:
+        for r, _ in responses.values():
+            self._handle_error(r)
+
+        # nobody else can act during my turn, so the responses agree with each other however they were interleaved
+        if self.snapshot_endpoint is not None:
+            r, rtt = responses[self.snapshot_endpoint]
+            data = json_codec.decode_response(r)
+            turn, status = data["turn"], data["game"]
+            self._process_game_status(status)
+            self._process_islands(data["islands"])
+            self._process_ships(data["ships"])
+
+        else:
+            r, rtt = responses["/ship"]
+            if turn is None:
+                turn = json_codec.decode_response(responses["/turn"][0])
+
+            status = json_codec.decode_response(responses["/game"][0])
+            self._process_game_status(status)
+            self._process_islands_response(responses["/island"][0])
+            self._process_ships(json_codec.decode_response(r))
+
+        self._record_rtt(rtt)
+        self.snapshot = turn_snapshot.TurnSnapshot.from_game(self, turn, status, taken_at, self.history.latest)
+        self.history.append(self.snapshot)
+        return self.snapshot
+
+    def _record_rtt(self, rtt: float):
+        # an exponentially weighted average, so a single slow request does not throw off the turn deadline
+        self.rtt = rtt if self.rtt is None else 0.8 * self.rtt + 0.2 * rtt
+
+    def _start_turn_deadline(self, notifier: turn_notifier.TurnNotifier):
+        rtt = self.rtt or 0.0
+        started_at = notifier.get_my_turn_started_at(rtt)
+        self.turn_deadline = turn_deadline.TurnDeadline(
+            started_at if started_at is not None else time.time(), self.get_turn_length_seconds(), rtt,
+            self.turn_deadline_margin
+        )
+
+    def _check_turn_deadline(self):
+        if self.turn_deadline is not None:
+            self.turn_deadline.check()
+
+    def _process_ships(self, player_data: list):
+        # the payload is read as it is, so the objects are built without copying or changing it
+        _, _, removed = self.players.sync_json(player_data, game=self)
 
-        player_data = r.json()
         for p in player_data:
+            local_player_ships = None
             if p["me"] is True:
+                local_player_ships = self.local_player_ship_data
                 for s in p["ships"]:
-                    if s["id"] not in self.local_player_ship_data:
-                        self.local_player_ship_data[s["id"]] = local_player_ship.PlayerShip(s["id"])
+                    if s["id"] not in local_player_ships:
+                        self.local_data_writer.add(s["id"])
 
-                    s["player_ship"] = self.local_player_ship_data[s["id"]]
+            # ships are reconciled into the existing collection so references to them stay valid
+            ships = self.players.get_by_id(p["id"]).ships
+            self.turn_diff.record(*ships.sync_json(p["ships"], local_player_ships=local_player_ships))
 
-            else:
-                for s in p["ships"]:
-                    s["player_ship"] = None
-
-            p["ships"] = ship_collection.ShipCollection([]).from_json(p["ships"])
-            p["game"] = self
-            p["x"], p["y"] = self.base_locations[p["id"]]
+        for p in removed:
+            for ship in p.ships.objects:
+                ship.removed = True
+                self.turn_diff.destroyed.append(ship)
 
-        self.players.from_json(player_data)
         self.me = self.players.get_by_attribute("me", True)
         self.me.is_me = True
 
         for p in self.players.objects:
             p.post_process_ships()
 
+        for ship in self.turn_diff.destroyed:
+            self.pathfinder.forget(ship.id)
+
+        self.occupancy.rebuild(self.players)
+        self._board_view = None
+
+    def _get_autopiloted_ships(self) -> typing.List[ship_game_object.Ship]:
+        return [
+            ship for ship in self.me.ships
+            if ship.local_player_ship.target_x is not None or ship.local_player_ship.target_y is not None
+        ]
+
+    def _get_arrived_ships(
+            self, ships: typing.List[ship_game_object.Ship], batch: order_batch.OrderBatch
+    ) -> typing.List[ship_game_object.Ship]:
+        return [
+            ship for ship in ships
+            if ship.id not in batch.errors
+            and ship.local_player_ship.target_x is None and ship.local_player_ship.target_y is None
+        ]
+
     def _run_autopilot_cycle(self):
-        retry = []
-        for ship in self.me.ships:
-            try:
-                if ship.local_player_ship.target_x is not None or ship.local_player_ship.target_y is not None:
-                    ship.move_ship_relative(*ship.get_next_move())
+        ships = self._get_autopiloted_ships()
+        with self.batch() as batch:
+            for move in self.fleet_planner.plan(ships):
+                batch.move_ship_relative(move.ship, move.dx, move.dy)
 
-                    if ship.local_player_ship.target_x is None and ship.local_player_ship.target_y is None:
-                        self.on_ship_arrive(ship)
+        for ship in self._get_arrived_ships(ships, batch):
+            self.on_ship_arrive(ship)
 
-            except exceptions.PositionOccupiedException:
-                retry.append(ship)
+    def batch(self, max_workers: int = 8) -> order_batch.OrderBatch:
+        """
+        Returns an order batch, which collects moves and shots and sends them to the server concurrently
+        Use it as a context manager and the orders are dispatched when the block exits:
 
-        retry.reverse()
+            with self.batch() as batch:
+                for ship in self.me.ships:
+                    batch.shoot_ship(ship, x, y)
 
-        for ship in retry:
-            try:
-                ship.move_ship_relative(*ship.get_next_move())
-            except exceptions.PositionOccupiedException:
-                pass
+        Errors raised by individual orders are collected in batch.errors by ship ID
+        :param max_workers: the maximum number of requests in flight at once
+        """
+        return order_batch.OrderBatch(self, max_workers)
+
+    def get_board_view(self) -> board_view.BoardView:
+        """
+        Returns the state of the game as NumPy arrays (see the BoardView object)
+        The view is cached until the state changes, so it can be called freely within a turn
+        This requires the optional numpy package to be installed
+        """
+        if self._board_view is None:
+            self._board_view = board_view.BoardView(self)
+
+        return self._board_view
 
     def get_free_islands(self) -> island_collection.IslandCollection:
         result = []
@@ -260,33 +498,130 @@ class Game(abc.ABC):
         return island_collection.IslandCollection(result)
 
     def is_position_occupied(self, x: int, y: int) -> ship_game_object.Ship:
-        for p in self.players.objects:
-            for ship in p.ships.objects:
-                if ship.x == x and ship.y == y:
-                    return ship
+        return self.occupancy.get_ship(x, y)
 
     def is_position_occupied_or_targeted(self, x: int, y: int) -> ship_game_object.Ship:
-        for p in self.players.objects:
-            for ship in p.ships.objects:
-                if (
-                        ship.x == x and ship.y == y
-                ) or (
-                        ship.local_player_ship.target_x == x and ship.local_player_ship.target_y == y
-                ) or (
-                        ship.local_player_ship.target_y == y and ship.local_player_ship.target_x is None and ship.x == x
-                ):
-                    return ship
+        ship = self.occupancy.get_ship(x, y)
+        if ship is None:
+            ship = self.occupancy.get_targeting_ship(x, y)
+
+        return ship
+
+    def get_turn_length_seconds(self) -> typing.Optional[int]:
+        """
+        Returns the length of a turn in seconds, or None if the game has not been played yet
+        """
+        if self.turn_length is None:
+            return None
+
+        return self.turn_length.hour * 3600 + self.turn_length.minute * 60 + self.turn_length.second
+
+    def _get_turn_notifier(self, poll_every: float, notifier: turn_notifier.TurnNotifier = None) -> turn_notifier.TurnNotifier:
+        if notifier is None:
+            notifier = self.turn_notifier
+
+        if notifier is None:
+            notifier = turn_notifier.AdaptivePollingNotifier(max_interval=max(0.3, poll_every))
+
+        notifier.set_turn_length(self.get_turn_length_seconds())
+        return notifier
 
-    def play(self, poll_every: float = 0.5):
+    def play(self, poll_every: float = 0.5, notifier: turn_notifier.TurnNotifier = None):
         """
         This method begins the main loop of the game
         This should only be called AFTER the game has started
-        :param poll_every: the interval to poll the server at. Minimum is 0.3s
+        :param poll_every: the interval to poll the server at while the current turn is not about to end. Minimum is 0.3s
+        :param notifier: the strategy used to wait for my turn. Default is the turn_notifier attribute,
+        or if that is not set, an AdaptivePollingNotifier which polls at most every poll_every seconds
         """
+        notifier = self._prepare_play(poll_every, notifier)
+
+        while self.running:
+            try:
+                if self._poll_turn(notifier):
+                    self._play_turn(notifier)
+
+                time.sleep(notifier.get_delay())
+
+            except exceptions.GameEndedException:
+                self.flush_local_player_ship_data()
+                break
+
+    def _prepare_play(self, poll_every: float, notifier: turn_notifier.TurnNotifier = None) -> turn_notifier.TurnNotifier:
         self._update_islands()
+        self._process_game_status(self._poll_game_status())
+        return self._get_turn_notifier(poll_every, notifier)
+
+    def _poll_turn(self, notifier: turn_notifier.TurnNotifier) -> bool:
+        sent_at = time.time()
+        turn = self._get_turn(**notifier.get_request_kwargs())
+        notifier.on_turn_status(turn, sent_at, time.time())
+        # kept so the snapshot at the start of my turn does not fetch it again
+        self._polled_turn = turn
+        return turn["is_me"]
+
+    def _begin_turn(self, notifier: turn_notifier.TurnNotifier) -> typing.Optional[dict]:
+        # the steps at the start of my turn which do not talk to the server, shared with the AsyncGame
+        self._start_turn_deadline(notifier)
+        self.turn_diff = state_diff.StateDiff()
+        turn, self._polled_turn = self._polled_turn, None
+        return turn
+
+    def _stop_turn_deadline(self) -> typing.Optional[float]:
+        deadline_remaining = self._get_deadline_remaining()
+        self.turn_deadline = None
+        return deadline_remaining
+
+    def _play_turn(self, notifier: turn_notifier.TurnNotifier):
+        self.metrics.start_turn()
+        try:
+            turn = self._begin_turn(notifier)
+            with self.metrics.time("fetch_snapshot"):
+                self.fetch_snapshot(turn)
 
-        status = self._poll_game_status()
+            with self.metrics.time("autopilot"):
+                self._run_autopilot_cycle()
 
+            if not self._ran_game_start_event:
+                self.on_game_start()
+                self._ran_game_start_event = True
+
+            with self.metrics.time("on_turn_start"):
+                self.on_turn_start()
+        except exceptions.GameEndedException:
+            raise
+
+        except exceptions.TurnDeadlineExceededException:
+            # the rest of the turn was given up so it could be ended in time
+            pass
+
+        except Exception:
+            traceback.print_exc()
+
+        deadline_remaining = self._stop_turn_deadline()
+        self._end_turn()
+        notifier.on_turn_end(time.time())
+        self.flush_local_player_ship_data()
+
+        try:
+            self.on_turn_metrics(self.metrics.end_turn(deadline_remaining))
+        except Exception:
+            traceback.print_exc()
+
+    def _get_deadline_remaining(self) -> typing.Optional[float]:
+        if self.turn_deadline is None or self.turn_deadline.ends_at is None:
+            return None
+
+        return self.turn_deadline.remaining()
+
+    def on_turn_metrics(self, record: game_metrics.TurnRecord):
+        """
+        This overridable method is called at the end of each of my turns with the metrics of that turn
+        The metrics of every turn so far are also available in the metrics attribute
+        :param record:
+        """
+
+    def _process_game_status(self, status: dict):
         self.base_locations.clear()
         try:
             self.base_locations[status["me"]["id"]] = status["me"]["base"]["x"], status["me"]["base"]["y"]
@@ -303,35 +638,6 @@ class Game(abc.ABC):
         self.game_size = status["board_size"]
         self.turn_length = datetime.datetime.strptime(status["turn_length"], '%H:%M:%S').time()
 
-        ran_game_start_event = False
-
-        while self.running:
-            start = time.time()
-
-            try:
-                if self.is_my_turn():
-                    try:
-                        self._update_ships()
-                        self._run_autopilot_cycle()
-
-                        if not ran_game_start_event:
-                            self.on_game_start()
-                            ran_game_start_event = True
-
-                        self.on_turn_start()
-                    except exceptions.GameEndedException:
-                        break
-
-                    except Exception:
-                        traceback.print_exc()
-
-                    self._end_turn()
-
-                time.sleep(max([0.3, poll_every - (time.time() - start)]))
-
-            except exceptions.GameEndedException:
-                break
-
     def buy_ship(self, ship_id: str, auto_move: bool = True) -> ship_game_object.Ship:
         """
         Purchase a ship by its ID
@@ -340,14 +646,15 @@ class Game(abc.ABC):
         :param auto_move: in the event a ship is in the way, do we automatically reposition that ship?
         :return: the newly purchased ship
         """
-        r = requests.post(self.url_base + "/store", headers=self._headers(), json={
+        self._check_turn_deadline()
+        r = self.transport.post("/store", headers=self._headers(), json={
             "ship": ship_id
         })
         try:
             self._handle_error(r)
         except exceptions.ShipInTheWayException as e:
             if auto_move:
-                ship = self.me.ships.get_by_id(r.json()["ship"])
+                ship = self._get_ship_in_the_way(r)
                 ship.move_ship(*self.get_free_position_in_radius(
                     self.me.x, self.me.y, ship.units_left
                 ))
@@ -359,9 +666,13 @@ class Game(abc.ABC):
         self._update_ships()
         return self.me.ships.get_by_id(r.json()["id"])
 
+    def _get_ship_in_the_way(self, r) -> ship_game_object.Ship:
+        return self.me.ships.get_by_id(r.json()["ship"])
+
     def _handle_error(self, r: requests.Response):
         if r.status_code == 409:
             response = r.json()
+            self.metrics.record_exception(response.get("code"))
             try:
                 raise exceptions.CODE_EXCEPTION_LOOKUP[response["code"]](response["message"])
             except KeyError:
@@ -371,42 +682,63 @@ class Game(abc.ABC):
             self.running = False
             raise exceptions.GameEndedException("The game has ended. Please terminate this script.")
 
-    def get_store_inventory(self) -> typing.List[ship_store_object.ShipStore]:
+    def get_store_catalog(self, refresh: bool = False) -> store_catalog.StoreCatalog:
+        """
+        Returns the store inventory as a StoreCatalog object
+        The catalog is fetched from the server the first time, and then cached for store_cache_ttl seconds
+        :param refresh: if the catalog should be fetched from the server even if the cached one has not expired
+        """
+        if refresh or not self._is_store_cache_valid():
+            if refresh:
+                self.response_cache.invalidate("/store", self.token)
+
+            r = self.transport.get("/store", headers=self._headers())
+            self._handle_error(r)
+            self._process_store_response(r)
+
+        return self._store_catalog
+
+    def _process_store_response(self, r: requests.Response):
+        # a response from the cache holds the inventory which is already loaded, so only its age is reset
+        if getattr(r, "from_cache", False) and self._store_catalog is not None:
+            self._store_catalog.fetched_at = time.time()
+            return
+
+        self._store_catalog = self._process_store_inventory(json_codec.decode_response(r))
+
+    def _is_store_cache_valid(self) -> bool:
+        return self._store_catalog is not None and not self._store_catalog.is_expired(self.store_cache_ttl)
+
+    def invalidate_store_cache(self):
+        """
+        Discards the cached store inventory, so the next store query fetches it from the server
+        """
+        self._store_catalog = None
+        self.response_cache.invalidate("/store", self.token)
+
+    def get_store_inventory(self, refresh: bool = False) -> typing.List[ship_store_object.ShipStore]:
         """
         Returns the entire game inventory as a list of ShipStore objects
         The ShipStore object has a method 'purchase' to buy it, OR
         you can pass its ID into the 'buy_ship' method of this object
+        :param refresh: if the inventory should be fetched from the server even if the cached one has not expired
         """
-        result = []
-        r = requests.get(self.url_base + "/store", headers=self._headers())
-        self._handle_error(r)
-        for item in r.json():
-            item["game"] = self
-            result.append(ship_store_object.ShipStore(**item))
+        return list(self.get_store_catalog(refresh).items)
 
-        return result
+    def _process_store_inventory(self, data: list) -> store_catalog.StoreCatalog:
+        return store_catalog.StoreCatalog([ship_store_object.ShipStore.from_json(item, self) for item in data])
 
     def get_min_attribute_from_store(self, attribute: str) -> ship_store_object.ShipStore:
-        smallest = None
-        for ship in self.get_store_inventory():
-            if smallest is None:
-                smallest = ship
-            else:
-                if getattr(ship, attribute) < getattr(smallest, attribute):
-                    smallest = ship
-
-        return smallest
+        return self.get_store_catalog().get_min(attribute)
 
     def get_max_attribute_from_store(self, attribute: str) -> ship_store_object.ShipStore:
-        largest = None
-        for ship in self.get_store_inventory():
-            if largest is None:
-                largest = ship
-            else:
-                if getattr(ship, attribute) > getattr(largest, attribute):
-                    largest = ship
+        return self.get_store_catalog().get_max(attribute)
 
-        return largest
+    def get_n_min_attribute_from_store(self, attribute: str, n: int) -> typing.List[ship_store_object.ShipStore]:
+        return self.get_store_catalog().get_n_min(attribute, n)
+
+    def get_n_max_attribute_from_store(self, attribute: str, n: int) -> typing.List[ship_store_object.ShipStore]:
+        return self.get_store_catalog().get_n_max(attribute, n)
 
     def get_cheapest_ship(self) -> ship_store_object.ShipStore:
         return self.get_min_attribute_from_store("price")
@@ -454,8 +786,9 @@ class Game(abc.ABC):
         if isinstance(ship, ship_game_object.Ship):
             ship = ship.id
 
-        r = requests.post(
-            self.url_base + "/ship", headers=self._headers(), json={
+        self._check_turn_deadline()
+        r = self.transport.post(
+            "/ship", headers=self._headers(), json={
                 "action": "move",
                 "position": [x, y],
                 "ship": ship
@@ -463,14 +796,7 @@ class Game(abc.ABC):
         )
 
         self._handle_error(r)
-
-        position = r.json()["position"]
-        try:
-            ship = self.me.ships.get_by_id(ship)
-            ship.x, ship.y = position
-        except ValueError:
-            pass
-        return position
+        return self._process_move(ship, r.json())
 
     def move_ship_relative(self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int) -> typing.Tuple[int, int]:
         """
@@ -482,8 +808,9 @@ class Game(abc.ABC):
         if isinstance(ship, ship_game_object.Ship):
             ship = ship.id
 
-        r = requests.post(
-            self.url_base + "/ship", headers=self._headers(), json={
+        self._check_turn_deadline()
+        r = self.transport.post(
+            "/ship", headers=self._headers(), json={
                 "action": "move",
                 "relative": [x, y],
                 "ship": ship
@@ -491,13 +818,19 @@ class Game(abc.ABC):
         )
 
         self._handle_error(r)
+        return self._process_move(ship, r.json())
 
-        position = r.json()["position"]
-        try:
-            ship = self.me.ships.get_by_id(ship)
-            ship.x, ship.y = position
-        except ValueError:
-            pass
+    def _process_move(self, ship_id: str, response: dict) -> typing.Tuple[int, int]:
+        position = response["position"]
+        with self._state_lock:
+            try:
+                ship = self.me.ships.get_by_id(ship_id)
+                previous = ship.x, ship.y
+                ship.x, ship.y = position
+                self.occupancy.move_ship(ship, previous)
+                self._board_view = None
+            except ValueError:
+                pass
         return position
 
     def shoot_ship(self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int, repeat: int = 1):
@@ -511,8 +844,9 @@ class Game(abc.ABC):
         if isinstance(ship, ship_game_object.Ship):
             ship = ship.id
 
-        r = requests.post(
-            self.url_base + "/ship", headers=self._headers(), json={
+        self._check_turn_deadline()
+        r = self.transport.post(
+            "/ship", headers=self._headers(), json={
                 "action": "shoot",
                 "position": [x, y],
                 "ship": ship,
@@ -532,8 +866,9 @@ class Game(abc.ABC):
         if isinstance(ship, ship_game_object.Ship):
             ship = ship.id
 
-        r = requests.post(
-            self.url_base + "/ship", headers=self._headers(), json={
+        self._check_turn_deadline()
+        r = self.transport.post(
+            "/ship", headers=self._headers(), json={
                 "action": "shoot",
                 "relative": [x, y],
                 "ship": ship,
@@ -555,76 +890,59 @@ class Game(abc.ABC):
         """
         return abs(x2 - x1) + abs(y2 - y1)
 
-    def get_free_position_in_radius(self, x: int, y: int, r: int) -> typing.Tuple[int, int]:
-        min_pos = (x - r, y - r)
-        max_pos = (x + r, y + r)
-
-        center_x = x
-        center_y = y
-
-        player_positions = [(p.x, p.y) for p in self.players.objects]
-
-        for x in range(min_pos[0], max_pos[0] + 1):
-            for y in range(min_pos[1], max_pos[1] + 1):
-                if not (0 <= x <= self.game_size[0] and 0 <= y <= self.game_size[1]):
-                    continue
-
-                if self.distance(x, y, center_x, center_y) > r:
-                    continue
-
-                if (x, y) in player_positions:
-                    continue
+    def iter_free_positions(self, x: int, y: int, r: int = None) -> typing.Iterator[typing.Tuple[int, int]]:
+        """
+        Yields the positions on the board a ship could be moved to (there is neither a ship nor a base on them),
+        nearest to the specified point first
+        The search expands one ring of positions at a time, so taking only the first few results is fast
+        :param x:
+        :param y:
+        :param r: if specified, only positions at most this distance away are yielded
+        """
+        width, length = self.game_size
+        furthest = max(x, width - x, 0) + max(y, length - y, 0)
+        r = furthest if r is None else min(r, furthest)
 
-                for player in self.players.objects:
-                    try:
-                        player.ships.get_at_position(x, y)
-                        break
+        for d in range(0, r + 1):
+            # the positions at distance d, clipped to the columns of the board
+            for dx in range(max(-d, -x), min(d, width - x) + 1):
+                dy = d - abs(dx)
+                for py in ((y - dy, y + dy) if dy != 0 else (y,)):
+                    if 0 <= py <= length and self.occupancy.is_free(x + dx, py):
+                        yield x + dx, py
 
-                    except ValueError:
-                        pass
-                else:
-                    return x, y
+    def get_free_position_in_radius(self, x: int, y: int, r: int) -> typing.Tuple[int, int]:
+        """
+        Returns the free position nearest to the specified point, at most r away
+        :param x:
+        :param y:
+        :param r:
+        """
+        for position in self.iter_free_positions(x, y, r):
+            return position
 
         raise ValueError("There are no free spaces available in a {} unit radius from {}".format(
-            r, (center_x, center_y)
+            r, (x, y)
         ))
 
     def get_all_free_positions_in_radius(self, x: int, y: int, r: int) -> typing.List[typing.Tuple[int, int]]:
-        min_pos = (x - r, y - r)
-        max_pos = (x + r, y + r)
-
-        center_x = x
-        center_y = y
-
-        result = []
-
-        player_positions = [(p.x, p.y) for p in self.players.objects]
-
-        for x in range(min_pos[0], max_pos[0] + 1):
-            for y in range(min_pos[1], max_pos[1] + 1):
-                if not (0 <= x <= self.game_size[0] and 0 <= y <= self.game_size[1]):
-                    continue
-
-                if self.distance(x, y, center_x, center_y) > r:
-                    continue
-
-                if (x, y) in player_positions:
-                    continue
-
-                for player in self.players.objects:
-                    try:
-                        player.ships.get_at_position(x, y)
-                        break
-
-                    except ValueError:
-                        pass
-                else:
-                    result.append((x, y))
-
-        return result
+        """
+        Returns all the free positions at most r away from the specified point, nearest first
+        :param x:
+        :param y:
+        :param r:
+        """
+        return list(self.iter_free_positions(x, y, r))
 
     def get_n_free_positions_in_radius(self, x: int, y: int, r: int, n: int) -> typing.List[typing.Tuple[int, int]]:
-        return self.get_all_free_positions_in_radius(x, y, r)[:n]
+        """
+        Returns the n free positions nearest to the specified point, at most r away
+        :param x:
+        :param y:
+        :param r:
+        :param n:
+        """
+        return list(itertools.islice(self.iter_free_positions(x, y, r), n))
 
     def order_positions_by_distance(self, positions: typing.List[typing.Tuple[int, int]], x: int, y: int) -> typing.List[typing.Tuple[int, int]]:
         positions.sort(key=lambda o: self.distance(*o, x, y), reverse=False)
@@ -633,11 +951,9 @@ class Game(abc.ABC):
     def get_captured_islands(self) -> island_collection.IslandCollection:
         islands = []
         for island in self.islands.objects:
-            try:
-                self.me.ships.get_at_position(island.x, island.y)
+            ship = self.occupancy.get_ship(island.x, island.y)
+            if ship is not None and ship.player is self.me:
                 islands.append(island)
-            except ValueError:
-                pass
 
         return island_collection.IslandCollection(islands)
 
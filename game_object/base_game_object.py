@@ -2,21 +2,148 @@
 This module contains the base game object
 """
 import abc
+import typing
+import weakref
+
+
+def build_from_json(cls: type, data: dict, **attributes) -> typing.Any:
+    """
+    Creates an object of the provided class straight from its API payload, without calling its constructor
+    The keys in the json_fields of the class are stored as attributes of the same name,
+    and those in its json_optional_fields are stored as None when they are missing
+    :param cls:
+    :param data: the payload, which is not changed
+    :param attributes: the attributes which are set before the payload
+    """
+    obj = object.__new__(cls)
+    for attribute, value in attributes.items():
+        setattr(obj, attribute, value)
+
+    for field in cls.json_fields:
+        setattr(obj, field, data[field])
+
+    for field in getattr(cls, "json_optional_fields", ()):
+        setattr(obj, field, data.get(field))
+
+    position_field = getattr(cls, "json_position_field", None)
+    if position_field is not None:
+        obj.x, obj.y = data[position_field]
+
+    return obj
 
 
 class BaseGameObject(abc.ABC):
     """
     This is the object which all game objects inherit from
+    Game objects are slotted, as one is kept for every ship, player and island of every game being played.
+    Attributes which are not declared in the __slots__ of the class can not be set on them. Use set_attribute instead
     """
+    __slots__ = ("_observers", "id", "_x", "_y", "removed")
+
+    # the schema of the API payload: the keys which are stored as attributes of the same name,
+    # and the keys which may be missing from it, which are stored as None
+    json_fields = ("id", "x", "y")          # type: typing.Tuple[str, ...]
+    json_optional_fields = ()               # type: typing.Tuple[str, ...]
+    # the key of the position when it is sent as a [x, y] list rather than as x and y
+    json_position_field = None              # type: str
+
     def __init__(self, id: str, x: int, y: int):
         """
         :param id:
         :param x:
         :param y:
         """
+        # the collections whose indexes must be told when this object changes
+        self._observers = None          # type: weakref.WeakSet
+
         self.id = id
-        self.x = x
-        self.y = y
+        # nothing can be watching a new object yet, so the position is set without notifying
+        self._x = x
+        self._y = y
+
+        self.removed = False
+
+    @property
+    def x(self) -> int:
+        return self._x
+
+    @x.setter
+    def x(self, value: int):
+        self._x = value
+        self._notify("x")
+
+    @property
+    def y(self) -> int:
+        return self._y
+
+    @y.setter
+    def y(self, value: int):
+        self._y = value
+        self._notify("y")
+
+    def _watch(self, collection):
+        if self._observers is None:
+            self._observers = weakref.WeakSet()
+
+        self._observers.add(collection)
+
+    def _notify(self, attribute: str):
+        # tells the collections which index this object that one of its attributes changed
+        if self._observers:
+            for collection in list(self._observers):
+                collection._on_object_changed(self, attribute)
+
+    @classmethod
+    def from_json(cls, data: dict, **context) -> 'BaseGameObject':
+        """
+        Creates an object straight from its API payload, as described by json_fields,
+        without building the keyword arguments of its constructor
+        :param data: the payload, which is not changed
+        :param context: the attributes which are not part of the payload
+        """
+        obj = cls._build_from_json(data)
+        for attribute, value in context.items():
+            setattr(obj, attribute, value)
+
+        return obj
+
+    @classmethod
+    def _build_from_json(cls, data: dict) -> 'BaseGameObject':
+        # nothing can be watching a new object yet, so setting its position does not notify anything
+        return build_from_json(cls, data, _observers=None, removed=False)
+
+    def update_from_json(self, data: dict, **context) -> dict:
+        """
+        Updates this object in place from its API payload, as described by json_fields
+        :param data: the payload, which is not changed
+        :param context: the attributes which are not part of the payload
+        :return: a dictionary of the previous values of the attributes which changed
+        """
+        previous = {}
+        for field in self.json_fields:
+            self._update_attribute(field, data[field], previous)
+
+        for field in self.json_optional_fields:
+            self._update_attribute(field, data.get(field), previous)
+
+        if self.json_position_field is not None:
+            x, y = data[self.json_position_field]
+            self._update_attribute("x", x, previous)
+            self._update_attribute("y", y, previous)
+
+        for attribute, value in context.items():
+            self._update_attribute(attribute, value, previous)
+
+        return previous
+
+    def _update_attribute(self, attribute: str, value, previous: dict):
+        current = getattr(self, attribute)
+        if current != value:
+            previous[attribute] = current
+            setattr(self, attribute, value)
+
+            if attribute not in ("x", "y"):
+                self._notify(attribute)
 
     def distance(self, x: int, y: int) -> int:
         """
@@ -9,6 +9,10 @@ class Island(base_game_object.BaseGameObject):
     This object represents a single island in the game
     WARNING: Do not instantiate this object directly. The library will handle this
     """
+    __slots__ = ("money_per_turn", "name")
+
+    json_fields = ("id", "x", "y", "money_per_turn", "name")
+
     def __init__(self, id: str, x: int, y: int, money_per_turn: int, name: str):
         """
         :param id:
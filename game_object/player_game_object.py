@@ -15,6 +15,12 @@ class Player(base_game_object.BaseGameObject):
     This object represents a single player in the game
     WARNING: Do not instantiate this object directly. The library will handle this
     """
+    __slots__ = ("hp", "me", "name", "ships", "game", "money", "is_me")
+
+    # the position of a player is the position of its base, which is not part of the payload
+    json_fields = ("id", "hp", "me", "name")
+    json_optional_fields = ("money", )
+
     def __init__(
             self, hp: int, id: str, x: int, y: int, me: bool, name: str,
             ships: ship_collection.ShipCollection, game: 'game_object.Game', money: int = None
@@ -41,6 +47,29 @@ class Player(base_game_object.BaseGameObject):
 
         self.is_me = False
 
+    @classmethod
+    def from_json(cls, data: dict, game: 'game_object.Game' = None) -> 'Player':
+        """
+        Creates a player straight from its API payload, with an empty collection of ships
+        :param data: the payload, which is not changed. Its ships are not read
+        :param game:
+        """
+        player = cls._build_from_json(data)
+        player._x, player._y = game.base_locations[player.id]
+        player.game = game
+        player.ships = ship_collection.ShipCollection([])
+        player.is_me = False
+        return player
+
+    def update_from_json(self, data: dict, game: 'game_object.Game' = None) -> dict:
+        """
+        Updates this player in place from its API payload
+        :param data: the payload, which is not changed. Its ships are not read
+        :param game:
+        :return: a dictionary of the previous values of the attributes which changed
+        """
+        return super().update_from_json(data)
+
     def post_process_ships(self):
         """
         Additional functionality which is needed to update the ships which belong to the player
@@ -17,6 +17,17 @@ class Ship(base_game_object.BaseGameObject):
     This object represents a single ship in the game
     WARNING: Do not instantiate this object directly. The library will handle this
     """
+    __slots__ = (
+        "custom", "hp", "max_hp", "name", "price", "shot_damage", "shot_range", "shots_left", "shots_per_turn",
+        "units_left", "units_per_turn", "player", "local_player_ship"
+    )
+
+    json_fields = (
+        "id", "custom", "hp", "max_hp", "name", "price", "shot_damage", "shot_range", "shots_left", "shots_per_turn",
+        "units_left", "units_per_turn"
+    )
+    json_position_field = "position"
+
     def __init__(
             self, custom: bool, hp: int, id: str, max_hp: int, name: str, position: typing.Tuple[int, int], price: int,
             shot_damage: int, shot_range: int, shots_left: int, shots_per_turn: int, units_left: int,
@@ -54,6 +65,36 @@ class Ship(base_game_object.BaseGameObject):
 
         self.local_player_ship = player_ship
 
+    @classmethod
+    def from_json(
+            cls, data: dict, local_player_ships: typing.Mapping[str, local_player_ship.PlayerShip] = None
+    ) -> 'Ship':
+        """
+        Creates a ship straight from its API payload
+        :param data: the payload, which is not changed
+        :param local_player_ships: the local data of my ships by ID. Not specified for the ships of other players
+        """
+        ship = cls._build_from_json(data)
+        ship.player = None
+        ship.local_player_ship = local_player_ships.get(ship.id) if local_player_ships is not None else None
+        return ship
+
+    def update_from_json(
+            self, data: dict, local_player_ships: typing.Mapping[str, local_player_ship.PlayerShip] = None
+    ) -> dict:
+        """
+        Updates this ship in place from its API payload
+        :param data: the payload, which is not changed
+        :param local_player_ships: see from_json
+        :return: a dictionary of the previous values of the attributes which changed
+        """
+        previous = super().update_from_json(data)
+        self._update_attribute(
+            "local_player_ship", local_player_ships.get(self.id) if local_player_ships is not None else None, previous
+        )
+
+        return previous
+
     @property
     def game(self) -> 'game.Game':
         """
@@ -75,7 +116,7 @@ class Ship(base_game_object.BaseGameObject):
         :param y:
         :return:
         """
-        self.game.move_ship(self, x, y)
+        return self.game.move_ship(self, x, y)
 
     def move_ship_relative(self, x: int, y: int):
         """
@@ -85,9 +126,9 @@ class Ship(base_game_object.BaseGameObject):
         :return:
         """
         if x == 0 and y == 0:
-            return
+            return self.game._no_op()
 
-        self.game.move_ship_relative(self, x, y)
+        return self.game.move_ship_relative(self, x, y)
 
     def shoot_ship(self, x: int, y: int, repeat: int = 1):
         """
@@ -97,7 +138,7 @@ class Ship(base_game_object.BaseGameObject):
         :param repeat: the number of times to fire the gun
         :return:
         """
-        self.game.shoot_ship(self, x, y, repeat)
+        return self.game.shoot_ship(self, x, y, repeat)
 
     def shoot_ship_relative(self, x: int, y: int, repeat: int = 1):
         """
@@ -107,22 +148,54 @@ class Ship(base_game_object.BaseGameObject):
         :param repeat: the number of times to fire the gun
         :return:
         """
-        self.game.shoot_ship_relative(self, x, y, repeat)
+        return self.game.shoot_ship_relative(self, x, y, repeat)
 
-    def get_next_move(self) -> typing.Tuple[int, int]:
-        if self.local_player_ship.target_x == self.x or self.local_player_ship.target_x is None:
-            self.local_player_ship.target_x = None
-            dx = 0
+    def get_autopilot_goal(self) -> typing.Optional[typing.Tuple[int, int]]:
+        """
+        Returns the position the autopilot is moving this ship to, or None if it has no target
+        A target which has been reached is cleared
+        """
+        had_target = self.local_player_ship.target_x is not None or self.local_player_ship.target_y is not None
 
+        if self.local_player_ship.target_x == self.x or self.local_player_ship.target_x is None:
+            target_x = self.x
         else:
-            dx = self.local_player_ship.target_x - self.x
+            target_x = self.local_player_ship.target_x
 
         if self.local_player_ship.target_y == self.y or self.local_player_ship.target_y is None:
-            self.local_player_ship.target_y = None
-            dy = 0
-
+            target_y = self.y
         else:
-            dy = self.local_player_ship.target_y - self.y
+            target_y = self.local_player_ship.target_y
+
+        if target_x == self.x and target_y == self.y:
+            self.game.pathfinder.forget(self.id)
+
+            if had_target:
+                # the target was reached, so it must be dropped from the occupancy index
+                self.game.local_data_writer.set_target(self.local_player_ship, None, None)
+                self.game.occupancy.update_target(self)
+
+            return None
+
+        return target_x, target_y
+
+    def get_next_move(self, reserved: typing.Set[typing.Tuple[int, int]] = None) -> typing.Tuple[int, int]:
+        """
+        Returns the relative move the autopilot makes this turn towards the target of this ship
+        The move follows the shortest path around ships and bases, and is (0, 0) once the target is reached
+        :param reserved: the positions other ships will be at after their moves this turn. Default is where ships are now
+        """
+        goal = self.get_autopilot_goal()
+        if goal is None:
+            return 0, 0
+
+        position = self.game.pathfinder.get_next_position(self, goal, self.units_left, reserved)
+        if position is not None:
+            return position[0] - self.x, position[1] - self.y
+
+        # there is no known path, so head straight for the target along x and then y
+        dx = goal[0] - self.x
+        dy = goal[1] - self.y
 
         if abs(dx) >= self.units_left:
             return int(math.copysign(self.units_left, dx)), 0
@@ -132,16 +205,14 @@ class Ship(base_game_object.BaseGameObject):
         return dx, int(math.copysign(min([abs(dy), abs(remaining)]), dy))
 
     def set_target(self, x: int, y: int):
-        self.local_player_ship.target_x = x
-        self.local_player_ship.target_y = y
-
-        self.game.flush_local_player_ship_data()
+        self.game.local_data_writer.set_target(self.local_player_ship, x, y)
+        self.game.occupancy.update_target(self)
 
-        self.move_ship_relative(*self.get_next_move())
+        return self.move_ship_relative(*self.get_next_move())
 
     def set_attribute(self, attribute: str, value):
-        self.local_player_ship.set_attribute(attribute, value)
-        self.game.flush_local_player_ship_data()
+        self.game.local_data_writer.set_attribute(self.local_player_ship, attribute, value)
+        self._notify(attribute)
 
     def get_attribute(self, attribute: str, default=local_player_ship.NotSet):
         return self.local_player_ship.get_attribute(attribute, default)
@@ -1,17 +1,95 @@
 """
 This module contains a collection of generics
 """
+import heapq
+import itertools
 import typing
 
 
 T = typing.TypeVar('T')
 
+MISSING = object()
+
+
+def _get_attribute_value(obj, attribute: str):
+    # the value get_by_attribute compares against: the attribute of the object, or else the ship metadata of the same name
+    if hasattr(obj, attribute):
+        return getattr(obj, attribute)
+
+    local_player_ship = getattr(obj, "local_player_ship", None)
+    if local_player_ship is not None and attribute in local_player_ship.metadata:
+        return local_player_ship.metadata[attribute]
+
+    return MISSING
+
+
+class ObjectIndex:
+    """
+    This object maps a key computed from each object of a collection to the objects with that key, in collection order
+    WARNING: Do not instantiate this object directly. The collection will handle this
+    """
+    def __init__(self, key: typing.Callable[[typing.Any], typing.Hashable], attributes: typing.Iterable[str]):
+        """
+        :param key: the function computing the key of an object. Objects whose key is MISSING are left out
+        :param attributes: the attributes of an object which its key depends on
+        """
+        self.key = key
+        self.attributes = frozenset(attributes)
+
+        self.buckets = {}           # type: typing.Dict[typing.Hashable, list]
+        self._keys = {}             # type: typing.Dict[int, typing.Hashable]
+
+    def build(self, objects: list):
+        self.buckets.clear()
+        self._keys.clear()
+
+        for obj in objects:
+            key = self.key(obj)
+            self._keys[id(obj)] = key
+            if key is not MISSING:
+                self.buckets.setdefault(key, []).append(obj)
+
+    def update(self, obj, order: typing.Dict[int, int]):
+        """
+        Moves an object to the bucket of its current key
+        :param obj:
+        :param order: the position of each object in the collection by id()
+        """
+        previous = self._keys.get(id(obj), MISSING)
+        key = self.key(obj)
+        if key == previous:
+            return
+
+        if previous is not MISSING:
+            bucket = self.buckets[previous]
+            bucket.remove(obj)
+            if len(bucket) == 0:
+                del self.buckets[previous]
+
+        self._keys[id(obj)] = key
+        if key is not MISSING:
+            bucket = self.buckets.setdefault(key, [])
+            i = len(bucket)
+            while i > 0 and order[id(bucket[i - 1])] > order[id(obj)]:
+                i -= 1
+
+            bucket.insert(i, obj)
+
+    def get(self, key) -> list:
+        return self.buckets.get(key, [])
+
 
 class BaseObjectCollection(typing.Generic[T]):
     """
     This object represents a collection of generics
     WARNING: Do not instantiate this object directly. The library will handle this
     """
+    # the width and height of the grid cells the spatial index buckets positions into
+    cell_size = 8
+
+    # collections this small answer distance queries by sorting, which is faster than the spatial index
+    linear_scan_threshold = 16
+
     def __init__(self, object_type, objects: typing.List[T]):
         """
         :param object_type:
@@ -20,6 +98,94 @@ class BaseObjectCollection(typing.Generic[T]):
         self.objects = objects              # type: typing.List[T]
         self.object_type = object_type
 
+        # indexes are built on the first lookup, and rebuilt when the list of objects changes
+        # The attribute indexes answer get_by_attribute, and more are added with add_index
+        self._index_definitions = {
+            "id": (lambda o: o.id, ("id",)),
+        }
+        # the spatial indexes answer the position and distance queries. They are kept apart from the attribute indexes,
+        # so an attribute or ship metadata key named like one of them is neither answered by nor replaces it
+        self._spatial_index_definitions = {
+            "position": (lambda o: (int(o.x), int(o.y)), ("x", "y")),
+            "cell": (lambda o: (int(o.x) // self.cell_size, int(o.y) // self.cell_size), ("x", "y")),
+        }
+        self._indexes = {}                  # type: typing.Dict[str, ObjectIndex]
+        self._spatial_indexes = {}          # type: typing.Dict[str, ObjectIndex]
+        self._order = {}                    # type: typing.Dict[int, int]
+        self._indexed_objects = None        # type: typing.List[T]
+
+    def add_index(self, attribute: str) -> 'BaseObjectCollection':
+        """
+        Adds a hash index on an attribute, or on a ship metadata key, so get_by_attribute and get_all_by_attribute
+        do not scan the whole collection. The index is kept up to date as the objects change
+        Values must be hashable. Note that changes to mutable values, or to attributes which are assigned directly
+        rather than updated by the library, are not seen by the index
+        :param attribute:
+        :return: this object so it can be chained
+        """
+        self._index_definitions[attribute] = (lambda o: _get_attribute_value(o, attribute), (attribute, "local_player_ship"))
+        self._indexes.pop(attribute, None)
+        return self
+
+    def invalidate_indexes(self):
+        """
+        Causes all the indexes to be rebuilt on the next lookup
+        This is only needed if objects were replaced in the 'objects' list directly
+        """
+        self._indexes.clear()
+        self._spatial_indexes.clear()
+        self._indexed_objects = None
+
+    def _get_index(self, name: str) -> typing.Optional[ObjectIndex]:
+        return self._build_index(name, self._index_definitions, self._indexes)
+
+    def _get_spatial_index(self, name: str) -> ObjectIndex:
+        return self._build_index(name, self._spatial_index_definitions, self._spatial_indexes)
+
+    def _build_index(
+            self, name: str, definitions: typing.Dict[str, tuple], indexes: typing.Dict[str, ObjectIndex]
+    ) -> typing.Optional[ObjectIndex]:
+        if name not in definitions:
+            return None
+
+        # appending to or removing from the list directly is detected by its length
+        if self._indexed_objects is not self.objects or len(self._order) != len(self.objects):
+            self._indexes.clear()
+            self._spatial_indexes.clear()
+            self._indexed_objects = self.objects
+            self._order = {id(o): i for i, o in enumerate(self.objects)}
+
+        index = indexes.get(name)
+        if index is None:
+            key, attributes = definitions[name]
+            index = ObjectIndex(key, attributes)
+            try:
+                index.build(self.objects)
+            except TypeError:
+                # unhashable values can not be indexed
+                del definitions[name]
+                return None
+
+            for obj in self.objects:
+                obj._watch(self)
+
+            indexes[name] = index
+
+        return index
+
+    def _on_object_changed(self, obj: T, attribute: str):
+        if id(obj) not in self._order:
+            return
+
+        try:
+            for index in itertools.chain(self._indexes.values(), self._spatial_indexes.values()):
+                if attribute in index.attributes:
+                    index.update(obj, self._order)
+
+        except (TypeError, ValueError, KeyError):
+            # the object was replaced or its new value can not be indexed, so start over on the next lookup
+            self.invalidate_indexes()
+
     def get_all_by_distance(self, x: int, y: int) -> typing.List[typing.Tuple[T, int]]:
         """
         Returns all the objects in this collection sorted by their distance from the specified point
@@ -32,8 +198,78 @@ class BaseObjectCollection(typing.Generic[T]):
 
         return objects
 
+    def iter_by_distance(self, x: int, y: int, r: int = None) -> typing.Iterator[typing.Tuple[T, int]]:
+        """
+        Yields the objects in this collection by increasing distance from the specified point, in the format (object, distance)
+        Objects at the same distance are yielded in the order of the collection
+        The objects are found lazily by expanding rings of grid cells around the point,
+        so taking only the first few results does not look at the whole collection
+        Objects must not be added, removed or moved while iterating
+        :param x:
+        :param y:
+        :param r: if specified, only objects at most this distance away are yielded
+        """
+        index = self._get_spatial_index("cell")
+        cx, cy = int(x) // self.cell_size, int(y) // self.cell_size
+
+        candidates = []
+        remaining = len(self.objects)
+
+        for k in itertools.count():
+            if remaining > 0:
+                for cell in self._get_ring_cells(index, cx, cy, k):
+                    for obj in index.get(cell):
+                        heapq.heappush(candidates, (obj.distance(x, y), self._order[id(obj)], obj))
+                        remaining -= 1
+
+                # every object in a cell outside the rings scanned so far is further away than this
+                bound = k * self.cell_size
+            else:
+                bound = None
+
+            while len(candidates) > 0 and (bound is None or candidates[0][0] <= bound):
+                distance, _, obj = heapq.heappop(candidates)
+                if r is not None and distance > r:
+                    return
+
+                yield obj, distance
+
+            if bound is None or (r is not None and bound >= r):
+                return
+
+    @staticmethod
+    def _get_ring_cells(index: ObjectIndex, cx: int, cy: int, k: int) -> typing.Iterable[typing.Tuple[int, int]]:
+        # the cells whose Chebyshev distance from (cx, cy) is exactly k
+        if k == 0:
+            return [(cx, cy)]
+
+        if 8 * k >= len(index.buckets):
+            # the ring is larger than the occupied cells, so only look at those
+            return [c for c in index.buckets if max(abs(c[0] - cx), abs(c[1] - cy)) == k]
+
+        cells = []
+        for i in range(-k, k + 1):
+            cells.append((cx + i, cy - k))
+            cells.append((cx + i, cy + k))
+
+        for j in range(-k + 1, k):
+            cells.append((cx - k, cy + j))
+            cells.append((cx + k, cy + j))
+
+        return cells
+
     def get_all_in_radius(self, x: int, y: int, r: int) -> typing.List[typing.Tuple[T, int]]:
-        return list(filter(lambda ship: ship[1] <= r, self.get_all_by_distance(x, y)))
+        """
+        Returns all the objects at most r away from the specified point, sorted by their distance
+        They are returned in a 2d array in the format [ [object 1, distance 1], [object 2, distance 2], ... ]
+        :param x:
+        :param y:
+        :param r:
+        """
+        if len(self.objects) <= self.linear_scan_threshold:
+            return list(filter(lambda ship: ship[1] <= r, self.get_all_by_distance(x, y)))
+
+        return list(self.iter_by_distance(x, y, r))
 
     def get_nearest(self, x: int, y: int) -> typing.Tuple[T, int]:
         """
@@ -41,7 +277,10 @@ class BaseObjectCollection(typing.Generic[T]):
         :param x:
         :param y:
         """
-        return self.get_all_by_distance(x, y)[0]
+        if len(self.objects) <= self.linear_scan_threshold:
+            return self.get_all_by_distance(x, y)[0]
+
+        return next(self.iter_by_distance(x, y))
 
     def get_n_nearest(self, x: int, y: int, n: int) -> typing.List[typing.Tuple[T, int]]:
         """
@@ -52,7 +291,10 @@ class BaseObjectCollection(typing.Generic[T]):
         :param n:
         :return:
         """
-        return self.get_all_by_distance(x, y)[:n]
+        if len(self.objects) <= self.linear_scan_threshold:
+            return self.get_all_by_distance(x, y)[:n]
+
+        return list(itertools.islice(self.iter_by_distance(x, y), n))
 
     def get_by_attribute(self, attribute: str, value) -> T:
         """
@@ -62,6 +304,13 @@ class BaseObjectCollection(typing.Generic[T]):
         :param attribute:
         :param value:
         """
+        index = self._get_index(attribute)
+        if index is not None:
+            try:
+                return index.get(value)[0]
+            except (IndexError, TypeError):
+                raise ValueError("Could not find object with {} {}".format(attribute, value))
+
         for obj in self.objects:
             if hasattr(obj, attribute):
                 if getattr(obj, attribute) == value:
@@ -82,6 +331,13 @@ class BaseObjectCollection(typing.Generic[T]):
         :param attribute:
         :param value:
         """
+        index = self._get_index(attribute)
+        if index is not None:
+            try:
+                return list(index.get(value))
+            except TypeError:
+                return []
+
         result = []
         for obj in self.objects:
             if hasattr(obj, attribute):
@@ -117,9 +373,9 @@ class BaseObjectCollection(typing.Generic[T]):
         :param x:
         :param y:
         """
-        for obj in self.objects:
-            if int(x) == int(obj.x) and int(y) == int(obj.y):
-                return obj
+        objects = self._get_spatial_index("position").get((int(x), int(y)))
+        if len(objects) > 0:
+            return objects[0]
 
         raise ValueError("Could not find object at {}, {}".format(x, y))
 
@@ -131,21 +387,60 @@ class BaseObjectCollection(typing.Generic[T]):
         """
         return self.get_by_attribute("id", id)
 
-    def from_json(self, data: list, clear_current: bool = True) -> 'BaseObjectCollection':
+    def from_json(self, data: list, clear_current: bool = True, **context) -> 'BaseObjectCollection':
         """
         This method flushes the current objects with a JSON object
-        :param data: the data to flush
+        :param data: the data to flush, as sent by the API
         :param clear_current: if existing objects should be purged first. Default is True
+        :param context: passed on to the from_json method of the object type
         :return: this object so it can be chained
         """
         if clear_current:
             self.objects.clear()
 
-        for d in data:
-            self.objects.append(self.object_type(**d))
+        from_json = self.object_type.from_json
+        self.objects.extend([from_json(d, **context) for d in data])
 
+        self.invalidate_indexes()
         return self
 
+    def sync_json(self, data: list, **context) -> typing.Tuple[typing.List[T], typing.List[typing.Tuple[T, dict]], typing.List[T]]:
+        """
+        This method reconciles the current objects with a JSON object by ID
+        Existing objects are updated in place, so references to them stay valid,
+        new objects are created, and objects missing from the data are marked as removed and dropped
+        :param data: the data to reconcile, as sent by the API
+        :param context: passed on to the from_json and update_from_json methods of the object type
+        :return: the added objects, the updated objects with the previous values of their changed attributes
+        (as returned by their 'update_from_json' method), and the removed objects
+        """
+        existing = {o.id: o for o in self.objects}
+        objects = []
+        added = []
+        changed = []
+        from_json = self.object_type.from_json
+
+        for d in data:
+            obj = existing.pop(d["id"], None)
+            if obj is None:
+                obj = from_json(d, **context)
+                added.append(obj)
+
+            else:
+                previous = obj.update_from_json(d, **context)
+                if len(previous) > 0:
+                    changed.append((obj, previous))
+
+            objects.append(obj)
+
+        removed = list(existing.values())
+        for obj in removed:
+            obj.removed = True
+
+        self.objects[:] = objects
+        self.invalidate_indexes()
+        return added, changed, removed
+
     def __repr__(self):
         return "<{} objects={}>".format(
             self.__class__.__name__, len(self.objects)
@@ -0,0 +1,48 @@
+"""
+This module contains the JSON decoder the payloads of the API are parsed with
+The optional orjson or msgspec packages are used when installed, as they parse several times faster than the json module
+"""
+import json
+import typing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+# every available decoder by name, from the fastest to the slowest
+BACKENDS = {}           # type: typing.Dict[str, typing.Callable[[typing.Union[bytes, str]], typing.Any]]
+
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+
+if msgspec is not None:
+    BACKENDS["msgspec"] = msgspec.json.decode
+
+BACKENDS["json"] = json.loads
+
+BACKEND = next(iter(BACKENDS))
+_loads = BACKENDS[BACKEND]
+
+
+def loads(content: typing.Union[bytes, str]):
+    """
+    Parses a JSON document with the fastest available decoder
+    :param content: the document, as UTF-8 bytes or a string
+    """
+    return _loads(content)
+
+
+def decode_response(r) -> typing.Any:
+    """
+    Parses the body of a response with the fastest available decoder
+    This skips the charset detection requests does in Response.json(), as the API always answers in UTF-8
+    :param r: the response, which may be a requests.Response or any of the library's own responses
+    """
+    return _loads(r.content)
@@ -0,0 +1,239 @@
+"""
+This module contains the storage backends of the local player ship data
+Every backend keeps the records of each bot in each game apart, keyed by game ID, player and ship ID,
+so games running side by side, or several bots playing the same game, never contend for or load each other's data
+"""
+import abc
+import json
+import os
+import sqlite3
+import threading
+import typing
+
+import BattleshAPy.local_data.player_ship as local_player_ship
+
+
+class LocalDataStore(abc.ABC):
+    """
+    This object is the base of all local data storage backends
+    A single store can be shared by every game a bot plays
+    """
+    @abc.abstractmethod
+    def load(self, game_id: str, player: str = None) -> typing.Dict[str, local_player_ship.PlayerShip]:
+        """
+        Returns the local player ship data of a bot in a game by ship ID
+        :param game_id:
+        :param player: identifies the bot within the game. The game passes a hash of its token
+        """
+
+    @abc.abstractmethod
+    def save(
+            self, game_id: str, data: typing.Dict[str, local_player_ship.PlayerShip], changed: typing.Iterable[str],
+            player: str = None
+    ):
+        """
+        Persists the changed records of a bot in a game
+        :param game_id:
+        :param data: all the local player ship data of the bot by ship ID
+        :param changed: the IDs of the ships whose records have changed since the last save
+        :param player: see load
+        """
+
+    def delete(self, game_id: str, player: str = None):
+        """
+        Removes all the records of a bot in a game
+        :param game_id:
+        :param player: see load
+        """
+
+    def close(self):
+        """
+        Releases any resources held by the store
+        """
+
+    def __repr__(self):
+        return "<{}>".format(self.__class__.__name__)
+
+
+class MemoryLocalDataStore(LocalDataStore):
+    """
+    This store keeps the records in memory only. Nothing survives the process
+    """
+    def __init__(self):
+        self.games = {}             # type: typing.Dict[typing.Tuple[str, str], typing.Dict[str, dict]]
+        self._lock = threading.Lock()
+
+    def load(self, game_id: str, player: str = None) -> typing.Dict[str, local_player_ship.PlayerShip]:
+        with self._lock:
+            records = dict(self.games.get((game_id, player), {}))
+
+        return {k: local_player_ship.PlayerShip.from_dict(v) for k, v in records.items()}
+
+    def save(
+            self, game_id: str, data: typing.Dict[str, local_player_ship.PlayerShip], changed: typing.Iterable[str],
+            player: str = None
+    ):
+        # records are stored as dictionaries so later changes to the ships are not seen until they are saved
+        records = {ship_id: json.loads(json.dumps(data[ship_id].to_dict())) for ship_id in changed if ship_id in data}
+        with self._lock:
+            self.games.setdefault((game_id, player), {}).update(records)
+
+    def delete(self, game_id: str, player: str = None):
+        with self._lock:
+            self.games.pop((game_id, player), None)
+
+
+class JSONLocalDataStore(LocalDataStore):
+    """
+    This store keeps the records of each bot in each game in their own JSON file, named 'local_data_<game_id>_<player>.json',
+    or 'local_data_<game_id>.json' when no player is given
+    The file is always replaced atomically, so a crash never leaves it half written
+    With 'journal' enabled, a save only appends the changed records to a journal file next to it,
+    which is folded back into the snapshot every 'compact_every' records
+    """
+    def __init__(self, directory: str = ".", journal: bool = False, compact_every: int = 1000):
+        """
+        :param directory: the directory the files are kept in
+        :param journal: whether to append the changed records to a journal instead of rewriting the file on each save
+        :param compact_every: the number of journal records after which the journal is folded into the snapshot
+        """
+        self.directory = directory
+        self.journal = journal
+        self.compact_every = compact_every
+
+        # the number of records in the journal of each file by path
+        self._journal_records = {}      # type: typing.Dict[str, int]
+
+    def get_path(self, game_id: str, player: str = None) -> str:
+        """
+        Returns the path of the snapshot file of a bot in a game. Its journal has the same path with a '.journal' suffix
+        :param game_id:
+        :param player:
+        """
+        if player is None:
+            return os.path.join(self.directory, "local_data_{}.json".format(game_id))
+
+        return os.path.join(self.directory, "local_data_{}_{}.json".format(game_id, player))
+
+    def load(self, game_id: str, player: str = None) -> typing.Dict[str, local_player_ship.PlayerShip]:
+        path = self.get_path(game_id, player)
+        data = {}
+        self._journal_records[path] = 0
+
+        if os.path.isfile(path):
+            with open(path, 'r') as f:
+                try:
+                    for ship_id, record in json.loads(f.read()).items():
+                        data[ship_id] = local_player_ship.PlayerShip.from_dict(record)
+
+                except json.JSONDecodeError:
+                    data = {}
+
+        if os.path.isfile(path + ".journal"):
+            with open(path + ".journal", 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # a torn write at the end of the journal. Everything before it is still valid
+                        break
+
+                    data[record["id"]] = local_player_ship.PlayerShip.from_dict(record)
+                    self._journal_records[path] += 1
+
+        return data
+
+    def save(
+            self, game_id: str, data: typing.Dict[str, local_player_ship.PlayerShip], changed: typing.Iterable[str],
+            player: str = None
+    ):
+        path = self.get_path(game_id, player)
+        changed = [ship_id for ship_id in changed if ship_id in data]
+        journal_records = self._journal_records.get(path, 0)
+
+        if self.journal and journal_records + len(changed) < self.compact_every:
+            with open(path + ".journal", 'a') as f:
+                f.write("".join(json.dumps(data[ship_id].to_dict()) + "\n" for ship_id in changed))
+
+            self._journal_records[path] = journal_records + len(changed)
+            return
+
+        with open(path + ".tmp", 'w') as f:
+            f.write(json.dumps({k: v.to_dict() for k, v in data.items()}))
+
+        os.replace(path + ".tmp", path)
+
+        # the snapshot now contains everything in the journal
+        if os.path.isfile(path + ".journal"):
+            os.remove(path + ".journal")
+
+        self._journal_records[path] = 0
+
+    def delete(self, game_id: str, player: str = None):
+        path = self.get_path(game_id, player)
+        for p in (path, path + ".journal"):
+            if os.path.isfile(p):
+                os.remove(p)
+
+        self._journal_records.pop(path, None)
+
+
+class SQLiteLocalDataStore(LocalDataStore):
+    """
+    This store keeps the records of every game in a single SQLite database in WAL mode,
+    with one row per ship keyed by (game_id, player, ship_id)
+    Saves only write the changed rows, and loads only read the rows of one bot in one game
+    """
+    def __init__(self, path: str = "local_data.sqlite3"):
+        """
+        :param path: the path of the database file
+        """
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS player_ship ("
+            "game_id TEXT NOT NULL, player TEXT NOT NULL, ship_id TEXT NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (game_id, player, ship_id)"
+            ") WITHOUT ROWID"
+        )
+        self._connection.commit()
+
+    def load(self, game_id: str, player: str = None) -> typing.Dict[str, local_player_ship.PlayerShip]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT ship_id, data FROM player_ship WHERE game_id = ? AND player = ?", (game_id, player or "")
+            ).fetchall()
+
+        return {ship_id: local_player_ship.PlayerShip.from_dict(json.loads(data)) for ship_id, data in rows}
+
+    def save(
+            self, game_id: str, data: typing.Dict[str, local_player_ship.PlayerShip], changed: typing.Iterable[str],
+            player: str = None
+    ):
+        rows = [
+            (game_id, player or "", ship_id, json.dumps(data[ship_id].to_dict())) for ship_id in changed if ship_id in data
+        ]
+
+        with self._lock:
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO player_ship (game_id, player, ship_id, data) VALUES (?, ?, ?, ?)", rows
+                )
+
+    def delete(self, game_id: str, player: str = None):
+        with self._lock:
+            with self._connection:
+                self._connection.execute(
+                    "DELETE FROM player_ship WHERE game_id = ? AND player = ?", (game_id, player or "")
+                )
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __repr__(self):
+        return "<SQLiteLocalDataStore path={}>".format(self.path)
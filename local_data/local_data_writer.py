@@ -0,0 +1,129 @@
+"""
+This module contains the write-behind persistence of the local player ship data
+Changes are marked dirty as they happen and written together at the end of the turn, or after a delay
+"""
+import threading
+import typing
+
+import BattleshAPy.local_data.player_ship as local_player_ship
+import BattleshAPy.local_data.local_data_store as local_data_store
+
+
+class LocalDataWriter:
+    """
+    This object owns the local player ship data of a game and persists it through a LocalDataStore
+    Marking a record dirty is cheap. Dirty records are only saved by 'flush', which the game calls at the end of each turn,
+    or by a timer 'flush_interval' seconds after the first unsaved change
+    As the timer flushes on a thread of its own, records are only added or changed through this object, under its lock
+    """
+    def __init__(
+            self, game_id: str, store: local_data_store.LocalDataStore = None, flush_interval: float = None,
+            player: str = None
+    ):
+        """
+        :param game_id: the game the records belong to
+        :param store: the backend to load and save the records with. Default is a JSONLocalDataStore in the working directory
+        :param flush_interval: the number of seconds after the first unsaved change at which a flush happens on its own.
+        None only flushes when 'flush' is called
+        :param player: identifies the bot within the game, so bots playing the same game keep their records apart
+        """
+        self.game_id = game_id
+        self.player = player
+        self.store = store if store is not None else local_data_store.JSONLocalDataStore()
+        self.flush_interval = flush_interval
+
+        self.data = {}              # type: typing.Dict[str, local_player_ship.PlayerShip]
+
+        self._dirty = set()         # type: typing.Set[str]
+        self._lock = threading.RLock()
+        self._timer = None          # type: threading.Timer
+
+    def load(self) -> typing.Dict[str, local_player_ship.PlayerShip]:
+        """
+        Loads the records of the game from the store
+        :return: the local player ship data by ship ID. The same dictionary is kept in the 'data' attribute
+        """
+        with self._lock:
+            self.data.clear()
+            self.data.update(self.store.load(self.game_id, self.player))
+            self._dirty.clear()
+
+            return self.data
+
+    def add(self, ship_id: str) -> local_player_ship.PlayerShip:
+        """
+        Returns the record of a ship, creating an empty one if it does not have one yet
+        :param ship_id:
+        """
+        with self._lock:
+            record = self.data.get(ship_id)
+            if record is None:
+                record = self.data[ship_id] = local_player_ship.PlayerShip(ship_id)
+
+            return record
+
+    def set_target(self, record: local_player_ship.PlayerShip, x: typing.Optional[int], y: typing.Optional[int]):
+        """
+        Changes the autopilot target of a record, and marks it dirty
+        :param record:
+        :param x:
+        :param y:
+        """
+        with self._lock:
+            record.target_x = x
+            record.target_y = y
+            self.mark_dirty(record.id)
+
+    def set_attribute(self, record: local_player_ship.PlayerShip, attribute: str, value):
+        """
+        Changes a custom attribute of a record, and marks it dirty
+        :param record:
+        :param attribute:
+        :param value: must be serializable as JSON
+        """
+        with self._lock:
+            record.set_attribute(attribute, value)
+            self.mark_dirty(record.id)
+
+    def mark_dirty(self, ship_id: str):
+        """
+        Marks the record of a ship as changed, so it is saved by the next flush
+        :param ship_id:
+        """
+        with self._lock:
+            self._dirty.add(ship_id)
+
+            if self.flush_interval is not None and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def is_dirty(self) -> bool:
+        """
+        Returns if there are changes which have not been saved yet
+        """
+        return len(self._dirty) > 0
+
+    def flush(self):
+        """
+        Saves the dirty records, if there are any
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+            if not self.is_dirty():
+                return
+
+            self.store.save(self.game_id, self.data, self._dirty, self.player)
+            self._dirty.clear()
+
+    def close(self):
+        """
+        Saves any pending changes and stops the timer
+        """
+        self.flush()
+
+    def __repr__(self):
+        return "<LocalDataWriter game_id={} records={} dirty={}>".format(self.game_id, len(self.data), len(self._dirty))
@@ -6,6 +6,8 @@ class NotSet:
 
 
 class PlayerShip:
+    __slots__ = ("id", "target_x", "target_y", "metadata")
+
     def __init__(self, id: str):
         self.id = id
         self.target_x = None
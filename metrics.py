@@ -0,0 +1,346 @@
+"""
+This module contains the instrumentation of a game: request latencies and statuses, phase timers, exception counts,
+and a record of each turn, exportable as JSON or in the Prometheus text format
+"""
+import collections
+import contextlib
+import functools
+import inspect
+import json
+import threading
+import time
+import typing
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    This object counts observations into buckets by their upper bound
+    """
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS):
+        """
+        :param buckets: the upper bounds of the buckets, in increasing order. A bucket for everything above is added
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        i = 0
+        while i < len(self.buckets) and value > self.buckets[i]:
+            i += 1
+
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self) -> dict:
+        return dict(
+            buckets=dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)), count=self.count, sum=self.sum
+        )
+
+    def __repr__(self):
+        return "<Histogram count={} sum={:.3f}>".format(self.count, self.sum)
+
+
+class TurnRecord:
+    """
+    This object represents the metrics of a single turn
+    """
+    def __init__(self, turn: int, started_at: float):
+        """
+        :param turn: the number of the turn, counting from 1
+        :param started_at:
+        """
+        self.turn = turn
+        self.started_at = started_at
+        self.duration = None            # type: float
+        self.phases = {}                # type: typing.Dict[str, float]
+        self.requests = 0
+        self.request_time = 0.0
+        self.retries = 0
+        self.exceptions = collections.Counter()     # type: typing.Dict[int, int]
+        self.deadline_remaining = None  # type: float
+
+    def to_dict(self) -> dict:
+        return dict(
+            turn=self.turn, started_at=self.started_at, duration=self.duration, phases=dict(self.phases),
+            requests=self.requests, request_time=self.request_time, retries=self.retries,
+            exceptions={str(k): v for k, v in self.exceptions.items()}, deadline_remaining=self.deadline_remaining
+        )
+
+    def __repr__(self):
+        return "<TurnRecord turn={} duration={} requests={}>".format(self.turn, self.duration, self.requests)
+
+
+class Metrics:
+    """
+    This object collects the metrics of a game
+    Each game has one in its 'metrics' attribute. It is safe to record into from many threads at once
+    """
+    def __init__(self, history: int = 100, buckets: typing.Sequence[float] = DEFAULT_BUCKETS):
+        """
+        :param history: the number of turn records to keep
+        :param buckets: the upper bounds of the latency histogram buckets in seconds
+        """
+        self.buckets = tuple(buckets)
+
+        self.request_latency = {}       # type: typing.Dict[typing.Tuple[str, str], Histogram]
+        self.request_statuses = collections.Counter()   # type: typing.Dict[typing.Tuple[str, str, str], int]
+        self.request_retries = collections.Counter()    # type: typing.Dict[typing.Tuple[str, str], int]
+        self.phase_time = {}            # type: typing.Dict[str, Histogram]
+        self.exceptions = collections.Counter()         # type: typing.Dict[int, int]
+        self.turns = collections.deque(maxlen=history)  # type: typing.Deque[TurnRecord]
+
+        self.current_turn = None        # type: TurnRecord
+        self._turn_count = 0
+        self._completed_turns = 0
+        self._lock = threading.Lock()
+
+    def record_request(self, method: str, endpoint: str, status: typing.Union[int, str], seconds: float, retries: int = 0):
+        """
+        Records a request sent to the API
+        :param method:
+        :param endpoint:
+        :param status: the status code of the response, or "error" if no response was received
+        :param seconds: the time the request took, including retries
+        :param retries: the number of times the request was retried
+        """
+        with self._lock:
+            if (method, endpoint) not in self.request_latency:
+                self.request_latency[(method, endpoint)] = Histogram(self.buckets)
+
+            self.request_latency[(method, endpoint)].observe(seconds)
+            self.request_statuses[(method, endpoint, str(status))] += 1
+            self.request_retries[(method, endpoint)] += retries
+
+            if self.current_turn is not None:
+                self.current_turn.requests += 1
+                self.current_turn.request_time += seconds
+                self.current_turn.retries += retries
+
+    def record_phase(self, phase: str, seconds: float):
+        """
+        Records the time taken by a phase of a turn
+        :param phase:
+        :param seconds:
+        """
+        with self._lock:
+            if phase not in self.phase_time:
+                self.phase_time[phase] = Histogram(self.buckets)
+
+            self.phase_time[phase].observe(seconds)
+
+            if self.current_turn is not None:
+                self.current_turn.phases[phase] = self.current_turn.phases.get(phase, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def time(self, phase: str):
+        """
+        A context manager which records the time taken by the block it wraps as a phase of the turn
+        :param phase:
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(phase, time.perf_counter() - started_at)
+
+    def record_exception(self, code: int):
+        """
+        Records an error returned by the API
+        :param code: the error code, as used by exceptions.CODE_EXCEPTION_LOOKUP
+        """
+        with self._lock:
+            self.exceptions[code] += 1
+            if self.current_turn is not None:
+                self.current_turn.exceptions[code] += 1
+
+    def start_turn(self) -> TurnRecord:
+        """
+        Starts the record of a new turn. Everything recorded until 'end_turn' is added to it
+        """
+        with self._lock:
+            self._turn_count += 1
+            self.current_turn = TurnRecord(self._turn_count, time.time())
+            return self.current_turn
+
+    def end_turn(self, deadline_remaining: float = None) -> typing.Optional[TurnRecord]:
+        """
+        Completes the record of the current turn and adds it to the history
+        :param deadline_remaining: the number of seconds which were left before the turn deadline
+        :return: the completed record
+        """
+        with self._lock:
+            record = self.current_turn
+            if record is None:
+                return None
+
+            record.duration = time.time() - record.started_at
+            record.deadline_remaining = deadline_remaining
+            self.turns.append(record)
+            self.current_turn = None
+            self._completed_turns += 1
+            return record
+
+    @property
+    def completed_turns(self) -> int:
+        """
+        Returns the number of turns which have been played to the end
+        """
+        return self._completed_turns
+
+    def to_dict(self) -> dict:
+        """
+        Returns all the metrics as a JSON serializable dictionary
+        """
+        with self._lock:
+            return dict(
+                requests=[
+                    dict(
+                        method=method, endpoint=endpoint, latency=h.to_dict(),
+                        retries=self.request_retries[(method, endpoint)],
+                        statuses={s: c for (m, e, s), c in self.request_statuses.items() if (m, e) == (method, endpoint)}
+                    )
+                    for (method, endpoint), h in self.request_latency.items()
+                ],
+                phases={phase: h.to_dict() for phase, h in self.phase_time.items()},
+                exceptions={str(k): v for k, v in self.exceptions.items()},
+                turns=[t.to_dict() for t in self.turns]
+            )
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict())
+
+    def to_prometheus(self, prefix: str = "battleshapy", labels: typing.Mapping[str, str] = None) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format
+        :param prefix: the prefix of every metric name
+        :param labels: labels added to every sample, such as the game ID
+        """
+        def format_labels(**extra) -> str:
+            items = list((labels or {}).items()) + list(extra.items())
+            if len(items) == 0:
+                return ""
+
+            return "{" + ",".join('{}="{}"'.format(k, str(v).replace('"', '\\"')) for k, v in items) + "}"
+
+        def histogram(name: str, h: Histogram, **extra) -> typing.List[str]:
+            lines = []
+            cumulative = 0
+            for bound, count in zip([str(b) for b in h.buckets] + ["+Inf"], h.counts):
+                cumulative += count
+                lines.append("{}_bucket{} {}".format(name, format_labels(le=bound, **extra), cumulative))
+
+            lines.append("{}_sum{} {}".format(name, format_labels(**extra), h.sum))
+            lines.append("{}_count{} {}".format(name, format_labels(**extra), h.count))
+            return lines
+
+        with self._lock:
+            lines = ["# TYPE {}_request_seconds histogram".format(prefix)]
+            for (method, endpoint), h in sorted(self.request_latency.items()):
+                lines += histogram(prefix + "_request_seconds", h, method=method, endpoint=endpoint)
+
+            lines.append("# TYPE {}_requests_total counter".format(prefix))
+            for (method, endpoint, status), count in sorted(self.request_statuses.items()):
+                lines.append("{}_requests_total{} {}".format(
+                    prefix, format_labels(method=method, endpoint=endpoint, status=status), count
+                ))
+
+            lines.append("# TYPE {}_request_retries_total counter".format(prefix))
+            for (method, endpoint), count in sorted(self.request_retries.items()):
+                lines.append("{}_request_retries_total{} {}".format(
+                    prefix, format_labels(method=method, endpoint=endpoint), count
+                ))
+
+            lines.append("# TYPE {}_phase_seconds histogram".format(prefix))
+            for phase, h in sorted(self.phase_time.items()):
+                lines += histogram(prefix + "_phase_seconds", h, phase=phase)
+
+            lines.append("# TYPE {}_exceptions_total counter".format(prefix))
+            for code, count in sorted(self.exceptions.items(), key=lambda i: str(i[0])):
+                lines.append("{}_exceptions_total{} {}".format(prefix, format_labels(code=code), count))
+
+            lines.append("# TYPE {}_turns_total counter".format(prefix))
+            lines.append("{}_turns_total{} {}".format(prefix, format_labels(), self._turn_count))
+
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self):
+        return "<Metrics turns={} requests={}>".format(self._turn_count, sum(self.request_statuses.values()))
+
+
+def _get_retries(response) -> int:
+    # requests exposes the urllib3 retry history on the raw response, the async and simulator responses a plain count
+    retries = getattr(response, "retries", None)
+    if isinstance(retries, int):
+        return retries
+
+    history = getattr(getattr(getattr(response, "raw", None), "retries", None), "history", None)
+    return len(history) if history else 0
+
+
+class InstrumentedTransport:
+    """
+    This object wraps the transport of a game, recording every request it sends into the game's metrics
+    It works with both the Transport and the AsyncTransport, so the shared transport itself stays untouched
+    WARNING: Do not instantiate this object directly. The library will handle this
+    """
+    def __init__(self, transport, metrics: Metrics):
+        """
+        :param transport: the transport to send the requests through
+        :param metrics:
+        """
+        self.transport = transport
+        self.metrics = metrics
+
+    def __getattr__(self, name: str):
+        # everything else, such as url_base and close, is the wrapped transport's
+        return getattr(self.transport, name)
+
+    def _send(self, method: str, endpoint: str, send: typing.Callable, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            result = send(endpoint, **kwargs)
+        except Exception:
+            self.metrics.record_request(method, endpoint, "error", time.perf_counter() - started_at)
+            raise
+
+        if inspect.isawaitable(result):
+            return self._request_async(method, endpoint, result, started_at)
+
+        self.metrics.record_request(
+            method, endpoint, result.status_code, time.perf_counter() - started_at, _get_retries(result)
+        )
+        return result
+
+    async def _request_async(self, method: str, endpoint: str, result: typing.Awaitable, started_at: float):
+        try:
+            response = await result
+        except Exception:
+            self.metrics.record_request(method, endpoint, "error", time.perf_counter() - started_at)
+            raise
+
+        self.metrics.record_request(
+            method, endpoint, response.status_code, time.perf_counter() - started_at, _get_retries(response)
+        )
+        return response
+
+    def request(self, method: str, endpoint: str, **kwargs):
+        return self._send(method, endpoint, functools.partial(self.transport.request, method), **kwargs)
+
+    # the verbs go through the wrapped transport's own verbs, as an asyncio transport may only make those coroutines
+    def get(self, endpoint: str, **kwargs):
+        return self._send("GET", endpoint, self.transport.get, **kwargs)
+
+    def post(self, endpoint: str, **kwargs):
+        return self._send("POST", endpoint, self.transport.post, **kwargs)
+
+    def put(self, endpoint: str, **kwargs):
+        return self._send("PUT", endpoint, self.transport.put, **kwargs)
+
+    def __repr__(self):
+        return "<InstrumentedTransport transport={}>".format(repr(self.transport))
@@ -0,0 +1,161 @@
+"""
+This module contains the occupancy index, which maps board positions to what is located at them
+"""
+import typing
+
+if typing.TYPE_CHECKING:
+    import BattleshAPy.game_object.ship_game_object as ship_game_object
+    import BattleshAPy.game_object.player_game_object as player_game_object
+    import BattleshAPy.game_object.island_game_object as island_game_object
+    import BattleshAPy.game_object_collection.player_collection as player_collection
+    import BattleshAPy.game_object_collection.island_collection as island_collection
+
+
+Position = typing.Tuple[int, int]
+
+
+class OccupancyIndex:
+    """
+    This object indexes the ships, bases, islands and autopilot targets on the board by their position,
+    so checking what is located at a position does not need to scan every ship of every player
+    The game rebuilds it each time the state is synced with the server, and updates it when a ship moves
+    'version' changes whenever a ship or base ends up at a different position, so results which depend on
+    which positions are occupied can be cached until it changes
+    WARNING: Do not instantiate this object directly. The library will handle this
+    """
+    def __init__(self):
+        self.ships = {}             # type: typing.Dict[Position, ship_game_object.Ship]
+        self.bases = {}             # type: typing.Dict[Position, player_game_object.Player]
+        self.islands = {}           # type: typing.Dict[Position, island_game_object.Island]
+        self.targets = {}           # type: typing.Dict[Position, typing.List[ship_game_object.Ship]]
+
+        self._ship_targets = {}     # type: typing.Dict[str, Position]
+
+        self.version = 0
+
+    def rebuild(self, players: 'player_collection.PlayerCollection'):
+        """
+        Rebuilds the ship, base and target indexes from the players
+        :param players:
+        """
+        previous = set(self.ships), set(self.bases)
+
+        self.ships.clear()
+        self.bases.clear()
+        self.targets.clear()
+        self._ship_targets.clear()
+
+        for player in players.objects:
+            self.bases.setdefault((player.x, player.y), player)
+
+            for ship in player.ships.objects:
+                self.ships.setdefault((ship.x, ship.y), ship)
+                self._add_target(ship)
+
+        if previous != (set(self.ships), set(self.bases)):
+            self.version += 1
+
+    def rebuild_islands(self, islands: 'island_collection.IslandCollection'):
+        """
+        Rebuilds the island index
+        :param islands:
+        """
+        self.islands.clear()
+        for island in islands.objects:
+            self.islands.setdefault((island.x, island.y), island)
+
+    @staticmethod
+    def get_target_position(ship: 'ship_game_object.Ship') -> typing.Optional[Position]:
+        """
+        Returns the position the autopilot of the ship is moving it to, if any
+        A ship with only a y target is considered to be targeting its current column
+        :param ship:
+        """
+        if ship.local_player_ship is None or ship.local_player_ship.target_y is None:
+            return None
+
+        target_x = ship.local_player_ship.target_x
+        return (ship.x if target_x is None else target_x), ship.local_player_ship.target_y
+
+    def _add_target(self, ship: 'ship_game_object.Ship'):
+        target = self.get_target_position(ship)
+        if target is not None:
+            self.targets.setdefault(target, []).append(ship)
+            self._ship_targets[ship.id] = target
+
+    def _remove_target(self, ship: 'ship_game_object.Ship'):
+        target = self._ship_targets.pop(ship.id, None)
+        if target is not None:
+            ships = self.targets[target]
+            ships.remove(ship)
+            if len(ships) == 0:
+                del self.targets[target]
+
+    def update_target(self, ship: 'ship_game_object.Ship'):
+        """
+        Updates the indexed target of the ship after its autopilot target or position changed
+        :param ship:
+        """
+        self._remove_target(ship)
+        self._add_target(ship)
+
+    def move_ship(self, ship: 'ship_game_object.Ship', previous: Position):
+        """
+        Moves the ship in the index after its position changed
+        :param ship:
+        :param previous: the position the ship was at before it moved
+        """
+        if self.ships.get(previous) is ship:
+            del self.ships[previous]
+
+        self.ships[(ship.x, ship.y)] = ship
+        self.update_target(ship)
+
+        if previous != (ship.x, ship.y):
+            self.version += 1
+
+    def get_ship(self, x: int, y: int) -> typing.Optional['ship_game_object.Ship']:
+        """
+        Returns the ship located at the specified position, or None if there is none
+        :param x:
+        :param y:
+        """
+        return self.ships.get((x, y))
+
+    def get_targeting_ship(self, x: int, y: int) -> typing.Optional['ship_game_object.Ship']:
+        """
+        Returns a ship whose autopilot is moving it to the specified position, or None if there is none
+        :param x:
+        :param y:
+        """
+        ships = self.targets.get((x, y))
+        return ships[0] if ships else None
+
+    def get_base(self, x: int, y: int) -> typing.Optional['player_game_object.Player']:
+        """
+        Returns the player whose base is located at the specified position, or None if there is none
+        :param x:
+        :param y:
+        """
+        return self.bases.get((x, y))
+
+    def get_island(self, x: int, y: int) -> typing.Optional['island_game_object.Island']:
+        """
+        Returns the island located at the specified position, or None if there is none
+        :param x:
+        :param y:
+        """
+        return self.islands.get((x, y))
+
+    def is_free(self, x: int, y: int) -> bool:
+        """
+        Returns if a ship could be moved to the specified position (there is neither a ship nor a base on it)
+        :param x:
+        :param y:
+        """
+        return (x, y) not in self.ships and (x, y) not in self.bases
+
+    def __repr__(self):
+        return "<OccupancyIndex ships={} bases={} islands={} targets={} version={}>".format(
+            len(self.ships), len(self.bases), len(self.islands), len(self.targets), self.version
+        )
@@ -0,0 +1,325 @@
+"""
+This module contains the order batch, which collects the moves and shots of many ships
+and dispatches them to the server concurrently
+"""
+import asyncio
+import collections
+import concurrent.futures
+import typing
+
+import BattleshAPy.game_object.ship_game_object as ship_game_object
+import BattleshAPy.exceptions as exceptions
+
+if typing.TYPE_CHECKING:
+    import BattleshAPy.game as game_object
+
+
+class Order:
+    """
+    This object represents a single move or shot queued in an order batch
+    WARNING: Do not instantiate this object directly. The order batch will handle this
+    """
+    def __init__(
+            self, ship_id: str, action: str, x: int, y: int, relative: bool, repeat: int = 1,
+            source: typing.Tuple[int, int] = None, destination: typing.Tuple[int, int] = None, priority: int = 0
+    ):
+        """
+        :param ship_id: the ID of the ship which executes the order
+        :param action: either "move" or "shoot"
+        :param x:
+        :param y:
+        :param relative: if the coordinates are relative to the position of the ship
+        :param repeat: the number of times to fire the gun
+        :param source: the tile the ship is expected to be on when the order runs, if known
+        :param destination: the tile the order moves to or shoots at, if known
+        :param priority: orders with a lower priority are dropped first when the turn is running out of time
+        """
+        self.ship_id = ship_id
+        self.action = action
+        self.x = x
+        self.y = y
+        self.relative = relative
+        self.repeat = repeat
+        self.source = source
+        self.destination = destination
+        self.priority = priority
+
+        self.result = None
+        self.error = None           # type: Exception
+
+    def tiles(self) -> typing.List[typing.Tuple[int, int]]:
+        """
+        Returns the tiles whose state this order depends on or changes
+        """
+        return [t for t in (self.source, self.destination) if t is not None]
+
+    def __repr__(self):
+        return "<Order ship={} action={} x={} y={} relative={}>".format(
+            self.ship_id, self.action, self.x, self.y, self.relative
+        )
+
+
+class OrderBatch:
+    """
+    This object collects the moves and shots of many ships and sends them concurrently when dispatched
+    Orders which touch the same ship or the same tile are placed in the same lane and run in the order they were queued,
+    so a ship moving onto a tile always waits for the ship leaving it. Independent lanes run at the same time.
+    When a move fails with a PositionOccupiedException, the later orders of that ship are held back with it,
+    and they are retried once, in the order they were queued, after every lane has finished
+    If the turn does not have enough time left for every order, the orders with the lowest priority are dropped
+    with a TurnDeadlineExceededException before any are sent
+    WARNING: Do not instantiate this object directly. Use the 'batch' method of the game
+    """
+    def __init__(self, game: 'game_object.Game', max_workers: int = 8):
+        """
+        :param game: the game the orders are sent through
+        :param max_workers: the maximum number of requests in flight at once
+        """
+        self.game = game
+        self.max_workers = max_workers
+
+        self.orders = []            # type: typing.List[Order]
+        self.completed = []         # type: typing.List[Order]
+        self.errors = collections.defaultdict(list)         # type: typing.Dict[str, typing.List[Exception]]
+
+        self._positions = {}        # type: typing.Dict[str, typing.Tuple[int, int]]
+
+    def _resolve(self, ship: typing.Union[str, ship_game_object.Ship]) -> typing.Tuple[str, typing.Tuple[int, int]]:
+        if not isinstance(ship, ship_game_object.Ship):
+            try:
+                ship = self.game.me.ships.get_by_id(ship)
+            except (ValueError, AttributeError):
+                return ship, self._positions.get(ship)
+
+        return ship.id, self._positions.get(ship.id, (ship.x, ship.y))
+
+    def move_ship(self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int, priority: int = 0) -> Order:
+        """
+        Queues a move of the provided ship to the specified coordinates
+        :param ship: either the id of the ship you wish to move, OR the ship object
+        :param x:
+        :param y:
+        :param priority: orders with a lower priority are dropped first when the turn is running out of time
+        """
+        ship_id, source = self._resolve(ship)
+        self._positions[ship_id] = (x, y)
+        return self._add(Order(ship_id, "move", x, y, False, source=source, destination=(x, y), priority=priority))
+
+    def move_ship_relative(
+            self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int, priority: int = 0
+    ) -> typing.Optional[Order]:
+        """
+        Queues a move of the provided ship relative to its position
+        Moves of 0, 0 are not queued
+        :param ship: either the id of the ship you wish to move, OR the ship object
+        :param x:
+        :param y:
+        :param priority: orders with a lower priority are dropped first when the turn is running out of time
+        """
+        if x == 0 and y == 0:
+            return None
+
+        ship_id, source = self._resolve(ship)
+        destination = None
+        if source is not None:
+            destination = (source[0] + x, source[1] + y)
+            self._positions[ship_id] = destination
+
+        return self._add(Order(ship_id, "move", x, y, True, source=source, destination=destination, priority=priority))
+
+    def shoot_ship(
+            self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int, repeat: int = 1, priority: int = 0
+    ) -> Order:
+        """
+        Queues a shot from the provided ship to the specified position
+        :param ship: either the id of the ship you wish to shoot with, OR the ship object
+        :param x:
+        :param y:
+        :param repeat: The number of times to fire the gun
+        :param priority: orders with a lower priority are dropped first when the turn is running out of time
+        """
+        ship_id, _ = self._resolve(ship)
+        return self._add(Order(ship_id, "shoot", x, y, False, repeat, destination=(x, y), priority=priority))
+
+    def shoot_ship_relative(
+            self, ship: typing.Union[str, ship_game_object.Ship], x: int, y: int, repeat: int = 1, priority: int = 0
+    ) -> Order:
+        """
+        Queues a shot from the provided ship relative to its position
+        :param ship: either the id of the ship you wish to shoot with, OR the ship object
+        :param x:
+        :param y:
+        :param repeat: The number of times to fire the gun
+        :param priority: orders with a lower priority are dropped first when the turn is running out of time
+        """
+        ship_id, source = self._resolve(ship)
+        destination = None if source is None else (source[0] + x, source[1] + y)
+        return self._add(Order(ship_id, "shoot", x, y, True, repeat, destination=destination, priority=priority))
+
+    def _add(self, order: Order) -> Order:
+        self.orders.append(order)
+        return order
+
+    def _trim(self) -> typing.List[Order]:
+        # drops the lowest priority orders which the time left in the turn can not fit, returning the orders to send
+        deadline = self.game.turn_deadline
+        rtt = self.game.rtt
+        if deadline is None or deadline.ends_at is None or not rtt:
+            # there is no deadline, or the turns are not timed
+            return list(self.orders)
+
+        rounds = max(0, int(deadline.remaining() / rtt))
+        capacity = rounds * max(1, self.max_workers)
+        if len(self.orders) <= capacity:
+            return list(self.orders)
+
+        ranked = sorted(range(len(self.orders)), key=lambda i: -self.orders[i].priority)
+        kept = set(ranked[:capacity])
+
+        orders = []
+        for i, order in enumerate(self.orders):
+            if i in kept:
+                orders.append(order)
+            else:
+                order.error = exceptions.TurnDeadlineExceededException(
+                    "The order was dropped as there was not enough time left in the turn"
+                )
+
+        return orders
+
+    def _get_lanes(self, orders: typing.List[Order]) -> typing.List[typing.List[Order]]:
+        # union-find over the orders, joining every pair of orders which share a ship or a tile
+        parent = list(range(len(orders)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        owners = {}
+        for i, order in enumerate(orders):
+            for key in [("ship", order.ship_id)] + [("tile", t) for t in order.tiles()]:
+                if key in owners:
+                    parent[find(i)] = find(owners[key])
+                else:
+                    owners[key] = i
+
+        lanes = collections.OrderedDict()
+        for i, order in enumerate(orders):
+            lanes.setdefault(find(i), []).append(order)
+
+        return list(lanes.values())
+
+    def _call(self, order: Order):
+        if order.action == "move":
+            method = self.game.move_ship_relative if order.relative else self.game.move_ship
+            return method(order.ship_id, order.x, order.y)
+
+        method = self.game.shoot_ship_relative if order.relative else self.game.shoot_ship
+        return method(order.ship_id, order.x, order.y, order.repeat)
+
+    @staticmethod
+    def _hold(order: Order, error: Exception, held: typing.Dict[str, typing.List[Order]], defer: bool):
+        # a move onto an occupied tile is held back with the later orders of its ship, to be retried from that point
+        if defer and order.action == "move" and isinstance(error, exceptions.PositionOccupiedException):
+            held[order.ship_id] = [order]
+        else:
+            order.error = error
+
+    def _run_lane(self, lane: typing.List[Order], defer: bool = True) -> typing.List[typing.List[Order]]:
+        held = collections.OrderedDict()        # type: typing.Dict[str, typing.List[Order]]
+        for order in lane:
+            if order.ship_id in held:
+                held[order.ship_id].append(order)
+                continue
+
+            try:
+                order.result = self._call(order)
+            except exceptions.GameEndedException:
+                raise
+            except exceptions.BattleshAPIException as e:
+                self._hold(order, e, held, defer)
+
+        return list(held.values())
+
+    async def _run_lane_async(self, lane: typing.List[Order], defer: bool = True) -> typing.List[typing.List[Order]]:
+        held = collections.OrderedDict()        # type: typing.Dict[str, typing.List[Order]]
+        for order in lane:
+            if order.ship_id in held:
+                held[order.ship_id].append(order)
+                continue
+
+            try:
+                order.result = await self._call(order)
+            except exceptions.GameEndedException:
+                raise
+            except exceptions.BattleshAPIException as e:
+                self._hold(order, e, held, defer)
+
+        return list(held.values())
+
+    def _get_retries(self, held: typing.List[typing.List[Order]]) -> typing.List[Order]:
+        # the ships held back are retried in the reverse order of their failed moves, so a ship which was in the way
+        # of another has moved on first. The orders of each ship still run in the order they were queued
+        index = {id(order): i for i, order in enumerate(self.orders)}
+        held = sorted(held, key=lambda orders: index[id(orders[0])], reverse=True)
+        return [order for orders in held for order in orders]
+
+    def _complete(self):
+        for order in self.orders:
+            if order.error is not None:
+                self.errors[order.ship_id].append(order.error)
+
+        self.completed.extend(self.orders)
+        self.orders = []
+
+    def dispatch(self) -> 'OrderBatch':
+        """
+        Sends all the queued orders, blocking until they have all completed
+        Errors raised by individual orders are collected in the 'errors' attribute by ship ID,
+        and the orders themselves are moved to the 'completed' attribute
+        :return: this object so chaining is possible
+        """
+        lanes = self._get_lanes(self._trim())
+        held = []
+        if len(lanes) > 0:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(lanes)))) as pool:
+                for future in [pool.submit(self._run_lane, lane) for lane in lanes]:
+                    held.extend(future.result())
+
+        self._run_lane(self._get_retries(held), defer=False)
+        self._complete()
+        return self
+
+    async def dispatch_async(self) -> 'OrderBatch':
+        """
+        Sends all the queued orders of an AsyncGame, returning once they have all completed
+        Errors raised by individual orders are collected in the 'errors' attribute by ship ID
+        :return: this object so chaining is possible
+        """
+        lanes = self._get_lanes(self._trim())
+        semaphore = asyncio.Semaphore(max(1, self.max_workers))
+
+        async def run(lane):
+            async with semaphore:
+                return await self._run_lane_async(lane)
+
+        held = [orders for lane_held in await asyncio.gather(*[run(lane) for lane in lanes]) for orders in lane_held]
+        await self._run_lane_async(self._get_retries(held), defer=False)
+        self._complete()
+        return self
+
+    def __enter__(self) -> 'OrderBatch':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.dispatch()
+
+    async def __aenter__(self) -> 'OrderBatch':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            await self.dispatch_async()
@@ -0,0 +1,190 @@
+"""
+This module contains the pathfinder used by the autopilot to move ships around ships, bases and the edges of the board
+"""
+import heapq
+import typing
+
+if typing.TYPE_CHECKING:
+    import BattleshAPy.game as game_object
+    import BattleshAPy.game_object.ship_game_object as ship_game_object
+
+
+Position = typing.Tuple[int, int]
+
+
+def find_path(
+        start: Position, goal: Position, is_blocked: typing.Callable[[int, int], bool], size: Position,
+        max_nodes: int = 20000
+) -> typing.Optional[typing.List[Position]]:
+    """
+    Finds one of the shortest paths between two positions with A*, moving one unit up, down, left or right at a time
+    The goal itself may be blocked, in which case the path leads up to it
+    :param start:
+    :param goal:
+    :param is_blocked: returns if a ship can not pass through the specified position
+    :param size: the largest x and y on the board
+    :param max_nodes: the number of positions to explore before giving up
+    :return: the positions from start to goal, both included, or None if there is no path
+    """
+    if start == goal:
+        return [start]
+
+    gx, gy = goal
+    open_set = [(abs(start[0] - gx) + abs(start[1] - gy), 0, start)]
+    came_from = {start: None}           # type: typing.Dict[Position, typing.Optional[Position]]
+    cost = {start: 0}
+
+    while len(open_set) > 0 and len(came_from) <= max_nodes:
+        _, g, current = heapq.heappop(open_set)
+        if current == goal:
+            path = []
+            while current is not None:
+                path.append(current)
+                current = came_from[current]
+
+            path.reverse()
+            return path
+
+        if g > cost[current]:
+            continue
+
+        x, y = current
+        for n in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if not (0 <= n[0] <= size[0] and 0 <= n[1] <= size[1]):
+                continue
+
+            if n != goal and is_blocked(*n):
+                continue
+
+            if n not in cost or g + 1 < cost[n]:
+                cost[n] = g + 1
+                came_from[n] = current
+                # ties are broken towards the smaller heuristic, so the search runs straight at the goal
+                h = abs(n[0] - gx) + abs(n[1] - gy)
+                heapq.heappush(open_set, (g + 1 + h, g + 1, n))
+
+    return None
+
+
+class CachedPath:
+    """
+    This object represents the path a ship's autopilot is following
+    WARNING: Do not instantiate this object directly. The library will handle this
+    """
+    def __init__(self, goal: Position, positions: typing.List[Position]):
+        """
+        :param goal:
+        :param positions: the positions from where the path was planned to the goal
+        """
+        self.goal = goal
+        self.positions = positions
+        self.steps = {p: i for i, p in enumerate(positions)}
+
+    def __repr__(self):
+        return "<CachedPath goal={} length={}>".format(self.goal, len(self.positions) - 1)
+
+
+class Pathfinder:
+    """
+    This object plans and caches the paths of the ships on autopilot
+    A cached path is reused on later turns for as long as the ship is on it and every position left on it is still free,
+    so paths are only planned again when the occupancy along them changes
+    A goal found to be unreachable is not searched for again until the occupancy version of the board changes
+    WARNING: Do not instantiate this object directly. The library will handle this
+    """
+    def __init__(self, game: 'game_object.Game', max_nodes: int = 20000):
+        """
+        :param game:
+        :param max_nodes: see find_path
+        """
+        self.game = game
+        self.max_nodes = max_nodes
+
+        self.paths = {}             # type: typing.Dict[str, CachedPath]
+        # the goal each ship failed to find a path to, and the occupancy version it failed at
+        self.failures = {}          # type: typing.Dict[str, typing.Tuple[Position, int]]
+
+    def is_blocked(self, x: int, y: int, ship: 'ship_game_object.Ship' = None) -> bool:
+        """
+        Returns if a ship can not pass through the specified position
+        :param x:
+        :param y:
+        :param ship: the ship which is moving, which never blocks itself
+        """
+        occupant = self.game.occupancy.get_ship(x, y)
+        if occupant is not None and occupant is not ship:
+            return True
+
+        return self.game.occupancy.get_base(x, y) is not None
+
+    def get_path(self, ship: 'ship_game_object.Ship', goal: Position) -> typing.Optional[typing.List[Position]]:
+        """
+        Returns the path from the position of the ship to the goal, planning a new one if the cached one is no longer valid
+        :param ship:
+        :param goal:
+        :return: the positions from the ship to the goal, both included, or None if there is no path
+        """
+        start = (ship.x, ship.y)
+        cached = self.paths.get(ship.id)
+
+        if cached is not None and cached.goal == goal and start in cached.steps:
+            remaining = cached.positions[cached.steps[start]:]
+            if not any(self.is_blocked(x, y, ship) for x, y in remaining[1:-1]):
+                return remaining
+
+        if self.game.game_size is None:
+            return None
+
+        version = self.game.occupancy.version
+        if self.failures.get(ship.id) == (goal, version):
+            return None
+
+        positions = find_path(
+            start, goal, lambda x, y: self.is_blocked(x, y, ship), tuple(self.game.game_size), self.max_nodes
+        )
+
+        if positions is None:
+            self.paths.pop(ship.id, None)
+            self.failures[ship.id] = goal, version
+        else:
+            self.paths[ship.id] = CachedPath(goal, positions)
+            self.failures.pop(ship.id, None)
+
+        return positions
+
+    def get_next_position(
+            self, ship: 'ship_game_object.Ship', goal: Position, units: int, reserved: typing.Set[Position] = None
+    ) -> typing.Optional[Position]:
+        """
+        Returns the furthest free position along the path of the ship which it can reach with the specified units
+        :param ship:
+        :param goal:
+        :param units: the number of units the ship can still move this turn
+        :param reserved: the positions other ships will be at after their moves this turn.
+        If not specified, the positions ships are at now are used
+        :return: the position to move to, or None if there is no path
+        """
+        path = self.get_path(ship, goal)
+        if path is None:
+            return None
+
+        for position in reversed(path[1:units + 1]):
+            if reserved is None:
+                if not self.is_blocked(*position, ship):
+                    return position
+
+            elif position not in reserved and self.game.occupancy.get_base(*position) is None:
+                return position
+
+        return path[0]
+
+    def forget(self, ship_id: str):
+        """
+        Drops the cached path and failure of a ship
+        :param ship_id:
+        """
+        self.paths.pop(ship_id, None)
+        self.failures.pop(ship_id, None)
+
+    def __repr__(self):
+        return "<Pathfinder paths={} failures={}>".format(len(self.paths), len(self.failures))
@@ -0,0 +1,243 @@
+"""
+This module contains the response cache, which keeps the responses of the endpoints whose data rarely changes
+A cached response is reused until its time to live runs out, and is then revalidated with the ETag or Last-Modified
+validator the server sent with it, so data which has not changed costs a 304 response instead of a full payload
+"""
+import collections
+import inspect
+import threading
+import time
+import typing
+
+
+# the number of seconds a response is reused for without asking the server. 0 revalidates it on every request
+# The store is revalidated every time, as the game already keeps the inventory for its store_cache_ttl
+DEFAULT_TTLS = {
+    "/island": 60.0,
+    "/store": 0.0,
+    "/game": 0.0
+}
+
+
+class CachedResponse:
+    """
+    This object represents a response which was answered from the cache, either without a request or with a 304 response
+    It exposes the same interface as the response it wraps
+    """
+    def __init__(self, response, revalidated: bool = False):
+        """
+        :param response: the cached response
+        :param revalidated: whether the server was asked and confirmed the response has not changed
+        """
+        self.response = response
+        self.revalidated = revalidated
+        self.from_cache = True
+
+    def __getattr__(self, name: str):
+        return getattr(self.response, name)
+
+    def __repr__(self):
+        return "<CachedResponse [{}] revalidated={}>".format(self.response.status_code, self.revalidated)
+
+
+class CacheEntry:
+    """
+    This object represents a single cached response
+    """
+    def __init__(self, response, stored_at: float):
+        """
+        :param response:
+        :param stored_at: the time the response was received or last revalidated
+        """
+        self.response = response
+        self.stored_at = stored_at
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+
+    def get_validators(self) -> dict:
+        """
+        Returns the headers which ask the server to answer with a 304 response if the data has not changed
+        """
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+
+        return headers
+
+    def __repr__(self):
+        return "<CacheEntry etag={} stored_at={}>".format(self.etag, self.stored_at)
+
+
+class ResponseCache:
+    """
+    This object keeps the responses of GET requests to the cached endpoints, by token, endpoint and query parameters
+    Each game has one in its 'response_cache' attribute. A single cache may also be shared by many games
+    """
+    def __init__(self, ttls: typing.Mapping[str, typing.Optional[float]] = None, clock: typing.Callable[[], float] = time.time):
+        """
+        :param ttls: the time to live of each cached endpoint in seconds. None reuses a response until it is invalidated.
+        Endpoints which are not listed are never cached. Default is DEFAULT_TTLS
+        :param clock: returns the current time
+        """
+        self.ttls = dict(ttls if ttls is not None else DEFAULT_TTLS)
+        self.clock = clock
+
+        self.entries = {}           # type: typing.Dict[tuple, CacheEntry]
+        # the requests answered without asking the server, confirmed by a 304 response, and sent in full, by endpoint
+        self.hits = collections.Counter()           # type: typing.Dict[str, int]
+        self.revalidations = collections.Counter()  # type: typing.Dict[str, int]
+        self.misses = collections.Counter()         # type: typing.Dict[str, int]
+
+        self._lock = threading.Lock()
+
+    def is_cached(self, endpoint: str) -> bool:
+        return endpoint in self.ttls
+
+    @staticmethod
+    def get_key(endpoint: str, headers: typing.Mapping[str, str] = None, params: typing.Mapping[str, typing.Any] = None) -> tuple:
+        token = headers.get("token") if headers is not None else None
+        return token, endpoint, tuple(sorted((params or {}).items()))
+
+    def get(self, key: tuple) -> typing.Optional[CacheEntry]:
+        with self._lock:
+            return self.entries.get(key)
+
+    def is_fresh(self, key: tuple, entry: CacheEntry) -> bool:
+        """
+        Returns if a cached response can be used without asking the server
+        :param key:
+        :param entry:
+        """
+        ttl = self.ttls.get(key[1], 0.0)
+        return ttl is None or self.clock() - entry.stored_at < ttl
+
+    def store(self, key: tuple, response) -> CacheEntry:
+        entry = CacheEntry(response, self.clock())
+        with self._lock:
+            self.entries[key] = entry
+            self.misses[key[1]] += 1
+
+        return entry
+
+    def record_hit(self, key: tuple):
+        with self._lock:
+            self.hits[key[1]] += 1
+
+    def record_revalidation(self, key: tuple, entry: CacheEntry):
+        with self._lock:
+            entry.stored_at = self.clock()
+            self.revalidations[key[1]] += 1
+
+    def record_miss(self, key: tuple):
+        with self._lock:
+            self.misses[key[1]] += 1
+
+    def invalidate(self, endpoint: str = None, token: str = None):
+        """
+        Drops cached responses, so they are fetched again by the next request
+        :param endpoint: only drop the responses of this endpoint
+        :param token: only drop the responses of this game
+        """
+        with self._lock:
+            for key in list(self.entries):
+                if (endpoint is None or key[1] == endpoint) and (token is None or key[0] == token):
+                    del self.entries[key]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return dict(hits=dict(self.hits), revalidations=dict(self.revalidations), misses=dict(self.misses))
+
+    def __repr__(self):
+        return "<ResponseCache entries={} hits={} revalidations={} misses={}>".format(
+            len(self.entries), sum(self.hits.values()), sum(self.revalidations.values()), sum(self.misses.values())
+        )
+
+
+class CachingTransport:
+    """
+    This object wraps the transport of a game, answering GET requests to the cached endpoints from its response cache
+    Any other request to a cached endpoint drops the responses of that endpoint for the same game
+    It works with both the Transport and the AsyncTransport
+    WARNING: Do not instantiate this object directly. The library will handle this
+    """
+    def __init__(self, transport, cache: ResponseCache):
+        """
+        :param transport: the transport to send the requests which are not answered from the cache through
+        :param cache:
+        """
+        self.transport = transport
+        self.cache = cache
+        # whether the wrapped transport is asynchronous, so a response from the cache must be awaitable too
+        self._is_async = False
+
+    def __getattr__(self, name: str):
+        # everything else, such as url_base and close, is the wrapped transport's
+        return getattr(self.transport, name)
+
+    def get(self, endpoint: str, **kwargs):
+        if not self.cache.is_cached(endpoint):
+            return self.transport.get(endpoint, **kwargs)
+
+        key = self.cache.get_key(endpoint, kwargs.get("headers"), kwargs.get("params"))
+        entry = self.cache.get(key)
+
+        if entry is not None:
+            if self.cache.is_fresh(key, entry):
+                self.cache.record_hit(key)
+                if self._is_async:
+                    return self._resolve(CachedResponse(entry.response))
+
+                return CachedResponse(entry.response)
+
+            kwargs["headers"] = dict(kwargs.get("headers") or {}, **entry.get_validators())
+
+        result = self.transport.get(endpoint, **kwargs)
+        if inspect.isawaitable(result):
+            self._is_async = True
+            return self._complete_async(key, entry, result)
+
+        return self._complete(key, entry, result)
+
+    @staticmethod
+    async def _resolve(response: CachedResponse) -> CachedResponse:
+        return response
+
+    async def _complete_async(self, key: tuple, entry: typing.Optional[CacheEntry], result: typing.Awaitable):
+        return self._complete(key, entry, await result)
+
+    def _complete(self, key: tuple, entry: typing.Optional[CacheEntry], response):
+        if response.status_code == 304 and entry is not None:
+            self.cache.record_revalidation(key, entry)
+            return CachedResponse(entry.response, revalidated=True)
+
+        if response.status_code == 200:
+            self.cache.store(key, response)
+        else:
+            self.cache.record_miss(key)
+
+        return response
+
+    def _invalidate(self, endpoint: str, kwargs: dict):
+        if self.cache.is_cached(endpoint):
+            self.cache.invalidate(endpoint, self.cache.get_key(endpoint, kwargs.get("headers"))[0])
+
+    def post(self, endpoint: str, **kwargs):
+        self._invalidate(endpoint, kwargs)
+        return self.transport.post(endpoint, **kwargs)
+
+    def put(self, endpoint: str, **kwargs):
+        self._invalidate(endpoint, kwargs)
+        return self.transport.put(endpoint, **kwargs)
+
+    def request(self, method: str, endpoint: str, **kwargs):
+        if method == "GET":
+            return self.get(endpoint, **kwargs)
+
+        self._invalidate(endpoint, kwargs)
+        return self.transport.request(method, endpoint, **kwargs)
+
+    def __repr__(self):
+        return "<CachingTransport transport={}>".format(repr(self.transport))
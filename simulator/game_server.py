@@ -0,0 +1,566 @@
+"""
+This module contains an in-process implementation of the BattleshAPI server
+It implements the /game, /turn, /ship, /island and /store endpoints with the same JSON and error codes as the hosted server,
+so games can be played offline for development, strategy tuning and load testing
+It also implements /state, which answers with the turn, game status, ships and islands at once
+"""
+import datetime
+import hashlib
+import random
+import threading
+import time
+import typing
+
+import BattleshAPy.exceptions as exceptions
+import BattleshAPy.ship_ids as ship_ids
+
+
+EXCEPTION_CODE_LOOKUP = {v: k for k, v in exceptions.CODE_EXCEPTION_LOOKUP.items()}
+
+DEFAULT_STORE = [
+    dict(custom=False, id=ship_ids.BATTLESHIP_ID, name="Battleship", price=1000, max_hp=500, shot_damage=100,
+         shot_range=6, shots_per_turn=2, units_per_turn=2),
+    dict(custom=False, id=ship_ids.HEAVY_CRUISER_ID, name="Heavy Cruiser", price=700, max_hp=350, shot_damage=70,
+         shot_range=5, shots_per_turn=2, units_per_turn=3),
+    dict(custom=False, id=ship_ids.DESTROYER_ID, name="Destroyer", price=500, max_hp=250, shot_damage=50,
+         shot_range=4, shots_per_turn=3, units_per_turn=4),
+    dict(custom=False, id=ship_ids.PATROL_BOAT_ID, name="Patrol Boat", price=100, max_hp=50, shot_damage=10,
+         shot_range=2, shots_per_turn=1, units_per_turn=6),
+    dict(custom=False, id=ship_ids.SUBMARINE_ID, name="Submarine", price=400, max_hp=150, shot_damage=120,
+         shot_range=3, shots_per_turn=1, units_per_turn=3),
+]
+
+
+def get_etag(content: bytes) -> str:
+    """
+    Returns the entity tag of a response body, which the client sends back to only receive the body if it changed
+    :param content:
+    """
+    return '"{}"'.format(hashlib.sha1(content).hexdigest()[:16])
+
+
+class HTTPError(Exception):
+    """
+    Raised by the server to answer a request with a status other than 200
+    """
+    def __init__(self, status: int, body: typing.Any):
+        super().__init__(status, body)
+        self.status = status
+        self.body = body
+
+
+def _conflict(exception_type: typing.Type[exceptions.BattleshAPIException], message: str, **extra) -> HTTPError:
+    body = dict(code=EXCEPTION_CODE_LOOKUP.get(exception_type, 0), message=message)
+    body.update(extra)
+    return HTTPError(409, body)
+
+
+class SimulatedShip:
+    """
+    This object represents a ship on the board of a simulated game
+    """
+    def __init__(self, id: str, item: dict, owner: 'SimulatedPlayer', x: int, y: int):
+        """
+        :param id:
+        :param item: the store item the ship was bought as
+        :param owner:
+        :param x:
+        :param y:
+        """
+        self.id = id
+        self.item = item
+        self.owner = owner
+        self.x = x
+        self.y = y
+        self.hp = item["max_hp"]
+        self.shots_left = item["shots_per_turn"]
+        self.units_left = item["units_per_turn"]
+
+    def to_json(self) -> dict:
+        return dict(
+            custom=self.item["custom"], hp=self.hp, id=self.id, max_hp=self.item["max_hp"], name=self.item["name"],
+            position=[self.x, self.y], price=self.item["price"], shot_damage=self.item["shot_damage"],
+            shot_range=self.item["shot_range"], shots_left=self.shots_left,
+            shots_per_turn=self.item["shots_per_turn"], units_left=self.units_left,
+            units_per_turn=self.item["units_per_turn"]
+        )
+
+
+class SimulatedPlayer:
+    """
+    This object represents a bot which has joined a simulated game
+    """
+    def __init__(self, id: str, name: str, token: str, hp: int, money: int):
+        """
+        :param id:
+        :param name:
+        :param token:
+        :param hp:
+        :param money:
+        """
+        self.id = id
+        self.name = name
+        self.token = token
+        self.hp = hp
+        self.money = money
+        self.base = None            # type: typing.Tuple[int, int]
+        self.ships = {}             # type: typing.Dict[str, SimulatedShip]
+
+    @property
+    def alive(self) -> bool:
+        return self.hp > 0
+
+    def summary(self) -> dict:
+        return dict(id=self.id, name=self.name, hp=self.hp, base=dict(x=self.base[0], y=self.base[1]))
+
+
+class SimulatedGame:
+    """
+    This object represents the state and rules of a single simulated game
+    """
+    def __init__(
+            self, game_id: str, rng: random.Random, length: int, width: int, money_per_turn: int, initial_hp: int,
+            turn_length: int, initial_money: int, store: typing.List[dict]
+    ):
+        """
+        :param game_id:
+        :param rng: the random number generator used for ids, bases and islands
+        :param length:
+        :param width:
+        :param money_per_turn:
+        :param initial_hp:
+        :param turn_length: the number of seconds after which a turn is ended automatically. 0 disables this
+        :param initial_money:
+        :param store: the items for sale
+        """
+        self.game_id = game_id
+        self.rng = rng
+        self.width = width
+        self.length = length
+        self.money_per_turn = money_per_turn
+        self.initial_hp = initial_hp
+        self.turn_length = turn_length
+        self.initial_money = initial_money
+        self.store = store
+
+        self.status = "waiting"
+        self.players = []           # type: typing.List[SimulatedPlayer]
+        self.islands = []           # type: typing.List[dict]
+        self.turn_index = 0
+        self.turn_number = 0
+        self.turn_started_at = None     # type: float
+
+    def _new_id(self) -> str:
+        return "{:08x}".format(self.rng.getrandbits(32))
+
+    @property
+    def current_player(self) -> typing.Optional[SimulatedPlayer]:
+        if self.status != "running":
+            return None
+
+        return self.players[self.turn_index]
+
+    @property
+    def winner(self) -> typing.Optional[SimulatedPlayer]:
+        alive = [p for p in self.players if p.alive]
+        if self.status == "ended" and len(alive) == 1:
+            return alive[0]
+
+        return None
+
+    def get_ship_at(self, x: int, y: int) -> typing.Optional[SimulatedShip]:
+        for player in self.players:
+            for ship in player.ships.values():
+                if ship.x == x and ship.y == y:
+                    return ship
+
+        return None
+
+    def get_base_at(self, x: int, y: int) -> typing.Optional[SimulatedPlayer]:
+        for player in self.players:
+            if player.base == (x, y):
+                return player
+
+        return None
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x <= self.width and 0 <= y <= self.length
+
+    def add_player(self, name: str) -> SimulatedPlayer:
+        if self.status != "waiting":
+            raise _conflict(exceptions.ConflictException, "The game has already started")
+
+        for player in self.players:
+            if player.name == name:
+                raise _conflict(exceptions.AlreadyRegisteredException, "You have already joined this game")
+
+        player = SimulatedPlayer(self._new_id(), name, self._new_id() + self._new_id(), self.initial_hp, self.initial_money)
+        self.players.append(player)
+        return player
+
+    def start(self, now: float):
+        if self.status != "waiting":
+            raise _conflict(exceptions.ConflictException, "The game has already started")
+
+        corners = [(0, 0), (self.width, self.length), (0, self.length), (self.width, 0)]
+        taken = set()
+        for i, player in enumerate(self.players):
+            position = corners[i] if i < len(corners) else None
+            while position is None or position in taken:
+                position = (self.rng.randint(0, self.width), self.rng.randint(0, self.length))
+
+            player.base = position
+            taken.add(position)
+
+        for i in range(max(1, (self.width * self.length) // 100)):
+            position = (self.rng.randint(0, self.width), self.rng.randint(0, self.length))
+            if position in taken:
+                continue
+
+            taken.add(position)
+            self.islands.append(dict(
+                id=self._new_id(), x=position[0], y=position[1], money_per_turn=self.rng.randint(1, 5) * 10,
+                name="Island {}".format(i + 1)
+            ))
+
+        self.status = "running"
+        self._begin_turn(0, now)
+
+    def _begin_turn(self, index: int, now: float):
+        self.turn_index = index
+        self.turn_number += 1
+        self.turn_started_at = now
+
+        player = self.players[index]
+        player.money += self.money_per_turn
+        for island in self.islands:
+            ship = self.get_ship_at(island["x"], island["y"])
+            if ship is not None and ship.owner is player:
+                player.money += island["money_per_turn"]
+
+        for ship in player.ships.values():
+            ship.shots_left = ship.item["shots_per_turn"]
+            ship.units_left = ship.item["units_per_turn"]
+
+    def end_turn(self, now: float):
+        alive = [p for p in self.players if p.alive]
+        if len(alive) <= 1:
+            self.status = "ended"
+            return
+
+        index = self.turn_index
+        while True:
+            index = (index + 1) % len(self.players)
+            if self.players[index].alive:
+                break
+
+        self._begin_turn(index, now)
+
+    def expire_turn(self, now: float):
+        """
+        Ends the current turn if it has been running for longer than the turn length
+        """
+        while (
+                self.status == "running" and self.turn_length > 0
+                and now - self.turn_started_at > self.turn_length
+        ):
+            started_at = self.turn_started_at
+            self.end_turn(started_at + self.turn_length)
+
+    def _check_turn(self, player: SimulatedPlayer):
+        if self.current_player is not player:
+            raise _conflict(exceptions.NotYourTurnException, "It is not your turn")
+
+    def _get_own_ship(self, player: SimulatedPlayer, ship_id: str) -> SimulatedShip:
+        if ship_id not in player.ships:
+            raise _conflict(exceptions.CanNotAccessShipException, "You can not access ship {}".format(ship_id))
+
+        return player.ships[ship_id]
+
+    @staticmethod
+    def _get_target(ship: SimulatedShip, body: dict) -> typing.Tuple[int, int]:
+        if "relative" in body:
+            return ship.x + int(body["relative"][0]), ship.y + int(body["relative"][1])
+
+        return int(body["position"][0]), int(body["position"][1])
+
+    def move(self, player: SimulatedPlayer, body: dict) -> dict:
+        self._check_turn(player)
+        ship = self._get_own_ship(player, body["ship"])
+        x, y = self._get_target(ship, body)
+
+        if not self.in_bounds(x, y):
+            raise _conflict(exceptions.TargetOutOfBoundsException, "Position {} is out of bounds".format((x, y)))
+
+        distance = abs(ship.x - x) + abs(ship.y - y)
+        if distance > ship.units_left:
+            raise _conflict(exceptions.TargetOutOfRangeException, "The ship can only move {} more units".format(ship.units_left))
+
+        other = self.get_ship_at(x, y)
+        if (other is not None and other is not ship) or self.get_base_at(x, y) is not None:
+            raise _conflict(exceptions.PositionOccupiedException, "Position {} is occupied".format((x, y)))
+
+        ship.x, ship.y = x, y
+        ship.units_left -= distance
+        return dict(position=[x, y])
+
+    def shoot(self, player: SimulatedPlayer, body: dict) -> dict:
+        self._check_turn(player)
+        ship = self._get_own_ship(player, body["ship"])
+        x, y = self._get_target(ship, body)
+        repeat = int(body.get("repeat", 1))
+
+        if not self.in_bounds(x, y):
+            raise _conflict(exceptions.TargetOutOfBoundsException, "Position {} is out of bounds".format((x, y)))
+
+        if abs(ship.x - x) + abs(ship.y - y) > ship.item["shot_range"]:
+            raise _conflict(exceptions.TargetOutOfRangeException, "Position {} is out of range".format((x, y)))
+
+        if repeat > ship.shots_left:
+            raise _conflict(exceptions.OutOfShotsException, "The ship only has {} shots left".format(ship.shots_left))
+
+        if player.base == (x, y):
+            raise _conflict(exceptions.CannotAttackHomeBaseException, "You can not attack your own base")
+
+        ship.shots_left -= repeat
+        damage = ship.item["shot_damage"] * repeat
+        hit = False
+
+        target = self.get_ship_at(x, y)
+        if target is not None:
+            hit = True
+            target.hp -= damage
+            if target.hp <= 0:
+                del target.owner.ships[target.id]
+
+        base = self.get_base_at(x, y)
+        if base is not None and base.alive:
+            hit = True
+            base.hp -= damage
+            if not base.alive:
+                base.ships.clear()
+
+        if len([p for p in self.players if p.alive]) <= 1:
+            self.status = "ended"
+
+        return dict(position=[x, y], hit=hit)
+
+    def buy(self, player: SimulatedPlayer, body: dict) -> dict:
+        self._check_turn(player)
+
+        item = None
+        for i in self.store:
+            if i["id"] == body["ship"]:
+                item = i
+
+        if item is None:
+            raise _conflict(exceptions.ConflictException, "There is no ship {} in the store".format(body["ship"]))
+
+        if player.money < item["price"]:
+            raise _conflict(exceptions.InsufficientFundsException, "You can not afford a {}".format(item["name"]))
+
+        blocking = self.get_ship_at(*player.base)
+        if blocking is not None:
+            raise _conflict(exceptions.ShipInTheWayException, "A ship is in the way", ship=blocking.id)
+
+        player.money -= item["price"]
+        ship = SimulatedShip(self._new_id(), item, player, player.base[0], player.base[1])
+        player.ships[ship.id] = ship
+        return dict(id=ship.id)
+
+    def get_status(self, player: SimulatedPlayer) -> dict:
+        status = dict(
+            game_id=self.game_id, status=self.status, board_size=[self.width, self.length],
+            turn_length=str(datetime.timedelta(seconds=self.turn_length)).zfill(8),
+            money_per_turn=self.money_per_turn
+        )
+
+        if self.status == "waiting":
+            status["players"] = [dict(id=p.id, name=p.name) for p in self.players]
+        else:
+            status["me"] = player.summary()
+            status["opponents"] = [p.summary() for p in self.players if p is not player and p.alive]
+
+        return status
+
+    def get_ships(self, player: SimulatedPlayer) -> list:
+        result = []
+        for p in self.players:
+            if not p.alive:
+                continue
+
+            data = dict(id=p.id, hp=p.hp, me=p is player, name=p.name, ships=[s.to_json() for s in p.ships.values()])
+            if p is player:
+                data["money"] = p.money
+
+            result.append(data)
+
+        return result
+
+
+class GameServer:
+    """
+    This object is an in-process BattleshAPI server which can host any number of games
+    Requests are answered through the 'handle' method, either by a SimulatorTransport in the same process,
+    or over HTTP with the 'serve' function of the http_server module
+    """
+    def __init__(
+            self, seed: int = None, initial_money: int = 1000, store: typing.List[dict] = None,
+            clock: typing.Callable[[], float] = time.time
+    ):
+        """
+        :param seed: the seed of the random number generator, so games can be reproduced
+        :param initial_money: the money each player starts with
+        :param store: the items for sale. Default is the five default ships
+        :param clock: the function returning the current time, used to end turns which run longer than the turn length
+        """
+        self.rng = random.Random(seed)
+        self.initial_money = initial_money
+        self.store = store if store is not None else DEFAULT_STORE
+        self.clock = clock
+
+        self.games = {}             # type: typing.Dict[str, SimulatedGame]
+        self.credentials = {}       # type: typing.Dict[str, str]
+
+        self._tokens = {}           # type: typing.Dict[str, typing.Tuple[SimulatedGame, SimulatedPlayer]]
+        self._condition = threading.Condition()
+
+    def handle(
+            self, method: str, endpoint: str, headers: typing.Mapping[str, str] = None, body: typing.Any = None,
+            auth: typing.Tuple[str, str] = None, params: typing.Mapping[str, typing.Any] = None
+    ) -> typing.Tuple[int, typing.Any]:
+        """
+        Answers a single request
+        :param method: the HTTP method
+        :param endpoint: the endpoint (ex. "/ship")
+        :param headers: the request headers. Every endpoint except POST /game requires the 'token' header
+        :param body: the decoded JSON body
+        :param auth: the (client_id, client_secret) used for basic authentication
+        :param params: the query parameters
+        :return: the status code and the JSON body of the response
+        """
+        headers = headers or {}
+        params = params or {}
+
+        with self._condition:
+            try:
+                if endpoint == "/game" and method == "POST":
+                    return 200, self._create_or_join(body or {}, auth)
+
+                game, player = self._authenticate(headers)
+                game.expire_turn(self.clock())
+
+                if game.status == "ended":
+                    raise HTTPError(404, dict(message="The game has ended"))
+
+                turn_number = game.turn_number
+                result = self._dispatch(game, player, method, endpoint, body or {}, params)
+
+                if game.turn_number != turn_number or game.status == "ended":
+                    self._condition.notify_all()
+
+                return 200, result
+
+            except HTTPError as e:
+                return e.status, e.body
+
+    def _create_or_join(self, body: dict, auth: typing.Tuple[str, str]) -> dict:
+        if auth is None:
+            raise HTTPError(401, dict(message="Authentication required"))
+
+        client_id, client_secret = auth
+        if self.credentials.setdefault(client_id, client_secret) != client_secret:
+            raise HTTPError(401, dict(message="Invalid credentials"))
+
+        if "game_id" in body:
+            if body["game_id"] not in self.games:
+                raise HTTPError(404, dict(message="The game does not exist"))
+
+            game = self.games[body["game_id"]]
+
+        else:
+            game = SimulatedGame(
+                "{:08x}".format(self.rng.getrandbits(32)), random.Random(self.rng.getrandbits(64)),
+                int(body.get("length", 50)), int(body.get("width", 50)), int(body.get("money_per_turn", 100)),
+                int(body.get("initial_hp", 1000)), int(body.get("turn_length", 5)), self.initial_money, self.store
+            )
+            self.games[game.game_id] = game
+
+        player = game.add_player(client_id)
+        self._tokens[player.token] = game, player
+        return dict(game_id=game.game_id, token=player.token)
+
+    def _authenticate(self, headers: typing.Mapping[str, str]) -> typing.Tuple[SimulatedGame, SimulatedPlayer]:
+        token = headers.get("token")
+        if token not in self._tokens:
+            raise HTTPError(404, dict(message="The game does not exist"))
+
+        return self._tokens[token]
+
+    def _dispatch(
+            self, game: SimulatedGame, player: SimulatedPlayer, method: str, endpoint: str, body: dict,
+            params: typing.Mapping[str, typing.Any]
+    ) -> typing.Any:
+        if endpoint == "/game" and method == "GET":
+            return game.get_status(player)
+
+        if endpoint == "/game" and method == "PUT":
+            game.start(self.clock())
+            return dict(status=game.status)
+
+        if game.status != "running":
+            raise _conflict(exceptions.ConflictException, "The game has not started yet")
+
+        if endpoint == "/turn" and method == "GET":
+            self._wait_for_turn(game, player, float(params.get("wait", 0)))
+            return dict(is_me=game.current_player is player, turn=game.current_player.id)
+
+        if endpoint == "/turn" and method == "POST":
+            game._check_turn(player)
+            game.end_turn(self.clock())
+            return dict(status=game.status)
+
+        if endpoint == "/island" and method == "GET":
+            return [dict(i) for i in game.islands]
+
+        if endpoint == "/ship" and method == "GET":
+            return game.get_ships(player)
+
+        if endpoint == "/ship" and method == "POST":
+            if body.get("action") == "move":
+                return game.move(player, body)
+
+            return game.shoot(player, body)
+
+        if endpoint == "/store" and method == "GET":
+            return [dict(i) for i in game.store]
+
+        if endpoint == "/store" and method == "POST":
+            return game.buy(player, body)
+
+        if endpoint == "/state" and method == "GET":
+            return dict(
+                turn=dict(is_me=game.current_player is player, turn=game.current_player.id),
+                game=game.get_status(player), ships=game.get_ships(player), islands=[dict(i) for i in game.islands]
+            )
+
+        raise HTTPError(405, dict(message="{} {} is not supported".format(method, endpoint)))
+
+    def _wait_for_turn(self, game: SimulatedGame, player: SimulatedPlayer, wait: float):
+        # long polling: hold the request until the turn changes, it is this player's turn, or 'wait' seconds pass
+        deadline = self.clock() + wait
+        turn_number = game.turn_number
+
+        while (
+                game.status == "running" and game.turn_number == turn_number and game.current_player is not player
+                and self.clock() < deadline
+        ):
+            timeout = deadline - self.clock()
+            if game.turn_length > 0:
+                timeout = min(timeout, game.turn_started_at + game.turn_length - self.clock() + 0.01)
+
+            self._condition.wait(max(0.01, timeout))
+            game.expire_turn(self.clock())
+
+    def __repr__(self):
+        return "<GameServer games={}>".format(len(self.games))
@@ -0,0 +1,129 @@
+"""
+This module serves an in-process GameServer over HTTP
+Point the URL_BASE environment variable at it to play the unmodified client against the simulator,
+ex. 'python -m BattleshAPy.simulator.http_server --port 8000' and URL_BASE=http://127.0.0.1:8000
+"""
+import argparse
+import base64
+import http.server
+import json
+import typing
+import urllib.parse
+
+import BattleshAPy.simulator.game_server as game_server
+
+
+ENDPOINTS = ("/game", "/turn", "/ship", "/island", "/store", "/state")
+
+
+class SimulatorRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    This object answers a single HTTP request by handing it to the GameServer of the HTTP server
+    """
+    protocol_version = "HTTP/1.1"
+
+    def _get_credentials(self) -> typing.Optional[typing.Tuple[str, str]]:
+        authorization = self.headers.get("Authorization", "")
+        if not authorization.startswith("Basic "):
+            return None
+
+        client_id, _, client_secret = base64.b64decode(authorization[6:]).decode("utf-8").partition(":")
+        return client_id, client_secret
+
+    def _handle(self):
+        url = urllib.parse.urlsplit(self.path)
+
+        # any path prefix is accepted, so URL_BASE can keep the path of the hosted API
+        endpoint = None
+        for e in ENDPOINTS:
+            if url.path.rstrip("/").endswith(e):
+                endpoint = e
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length).decode("utf-8")) if length > 0 else None
+
+        if endpoint is None:
+            status, response = 404, dict(message="Unknown endpoint {}".format(url.path))
+        else:
+            params = {k: v[-1] for k, v in urllib.parse.parse_qs(url.query).items()}
+            status, response = self.server.game_server.handle(
+                self.command, endpoint, self.headers, body, self._get_credentials(), params
+            )
+
+        content = json.dumps(response).encode("utf-8")
+        etag = None
+        if self.command == "GET" and status == 200:
+            etag = game_server.get_etag(content)
+            if self.headers.get("If-None-Match") == etag:
+                status, content = 304, b""
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = _handle
+    do_POST = _handle
+    do_PUT = _handle
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class SimulatorHTTPServer(http.server.ThreadingHTTPServer):
+    """
+    This object is a threaded HTTP server in front of a GameServer
+    """
+    daemon_threads = True
+
+    def __init__(
+            self, server: game_server.GameServer = None, host: str = "127.0.0.1", port: int = 8000, verbose: bool = False
+    ):
+        """
+        :param server: the server to answer requests with. If not specified, a new one is created
+        :param host:
+        :param port: the port to listen on. 0 picks a free port
+        :param verbose: whether to log every request
+        """
+        super().__init__((host, port), SimulatorRequestHandler)
+        self.game_server = server if server is not None else game_server.GameServer()
+        self.verbose = verbose
+
+    @property
+    def url_base(self) -> str:
+        """
+        The value to set the URL_BASE environment variable to
+        """
+        return "http://{}:{}".format(*self.server_address[:2])
+
+
+def serve(server: game_server.GameServer = None, host: str = "127.0.0.1", port: int = 8000, verbose: bool = False):
+    """
+    Serves a GameServer over HTTP until interrupted
+    :param server: the server to answer requests with. If not specified, a new one is created
+    :param host:
+    :param port:
+    :param verbose: whether to log every request
+    """
+    with SimulatorHTTPServer(server, host, port, verbose) as httpd:
+        print("Serving the BattleshAPI simulator at {}".format(httpd.url_base))
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves the BattleshAPI simulator over HTTP")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    serve(game_server.GameServer(seed=args.seed), args.host, args.port, args.verbose)
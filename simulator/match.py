@@ -0,0 +1,90 @@
+"""
+This module plays whole games between bots against an in-process GameServer
+Turns are handed straight to the bot whose turn it is instead of being polled for, so thousands of games can be played per minute
+"""
+import typing
+
+import BattleshAPy.battleshapy as battleshapy
+import BattleshAPy.game as game
+import BattleshAPy.turn_notifier as turn_notifier
+import BattleshAPy.exceptions as exceptions
+import BattleshAPy.local_data.local_data_store as local_data_storage
+import BattleshAPy.simulator.game_server as game_server
+import BattleshAPy.simulator.simulator_transport as simulator_transport
+
+
+class MatchResult:
+    """
+    This object represents the outcome of a single simulated game
+    """
+    def __init__(self, simulated_game: game_server.SimulatedGame, games: typing.List[game.Game], turns: int):
+        """
+        :param simulated_game: the server side state of the game
+        :param games: the client side game of each bot, in the order the bots joined
+        :param turns: the number of turns played
+        """
+        self.simulated_game = simulated_game
+        self.games = games
+        self.turns = turns
+
+    @property
+    def winner(self) -> typing.Optional[game.Game]:
+        """
+        The game of the bot which won, or None if the game did not end before the turn limit
+        """
+        winner = self.simulated_game.winner
+        if winner is None:
+            return None
+
+        for g in self.games:
+            if g.token == winner.token:
+                return g
+
+    def __repr__(self):
+        return "<MatchResult game_id={} turns={} winner={}>".format(
+            self.simulated_game.game_id, self.turns, self.simulated_game.winner.name if self.winner else None
+        )
+
+
+def run_match(
+        game_class_refs: typing.List[game.Game.__class__], server: game_server.GameServer = None, max_turns: int = 1000,
+        length: int = 50, width: int = 50, money_per_turn: int = 100, initial_hp: int = 1000, turn_length: int = 0
+) -> MatchResult:
+    """
+    Plays a whole game between one bot per game class, returning once it has ended or max_turns turns have been played
+    :param game_class_refs: the class each bot plays with. The first bot creates the game and the others join it
+    :param server: the server to play on. If not specified, a new one is created
+    :param max_turns: the number of turns after which the game is abandoned
+    :param length:
+    :param width:
+    :param money_per_turn:
+    :param initial_hp:
+    :param turn_length: the number of seconds after which a turn is ended automatically. 0 disables this
+    """
+    transport = simulator_transport.SimulatorTransport(server)
+    bots = [
+        battleshapy.BattleshAPy("bot{}".format(i), "", transport, local_data_storage.MemoryLocalDataStore())
+        for i in range(len(game_class_refs))
+    ]
+
+    games = [bots[0].create_game(game_class_refs[0], length, width, money_per_turn, initial_hp, turn_length)]
+    for bot, game_class_ref in zip(bots[1:], game_class_refs[1:]):
+        games.append(bot.join_game(game_class_ref, games[0].game_id))
+
+    games[0].start_game()
+    notifiers = [g._prepare_play(0.3, turn_notifier.TurnNotifier()) for g in games]
+
+    simulated_game = transport.server.games[games[0].game_id]
+    tokens = {g.token: i for i, g in enumerate(games)}
+    turns = 0
+
+    while simulated_game.status == "running" and turns < max_turns:
+        i = tokens[simulated_game.current_player.token]
+        try:
+            games[i]._play_turn(notifiers[i])
+        except exceptions.GameEndedException:
+            pass
+
+        turns += 1
+
+    return MatchResult(simulated_game, games, turns)
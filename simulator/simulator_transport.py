@@ -0,0 +1,129 @@
+"""
+This module contains the transports which send requests straight to an in-process GameServer
+They expose the same interface as the Transport and AsyncTransport, so any game can be played offline without a network
+"""
+import json
+import typing
+
+import BattleshAPy.simulator.game_server as game_server
+
+
+class SimulatorResponse:
+    """
+    This object represents a response from the simulator
+    It exposes the subset of the requests.Response interface which the library uses
+    """
+    def __init__(self, status_code: int, body: typing.Any, headers: typing.Mapping[str, str] = None):
+        """
+        :param status_code:
+        :param body: the JSON body of the response. A 304 response has no body
+        :param headers: additional headers of the response
+        """
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+        self.headers.update(headers or {})
+        self.content = json.dumps(body).encode("utf-8") if status_code != 304 else b""
+
+    def json(self):
+        return json.loads(self.content.decode("utf-8"))
+
+    def __repr__(self):
+        return "<SimulatorResponse [{}]>".format(self.status_code)
+
+
+def _get_credentials(auth: typing.Any) -> typing.Optional[typing.Tuple[str, str]]:
+    # accepts the basic authentication objects of both requests and aiohttp, or a plain tuple
+    if auth is None:
+        return None
+
+    if hasattr(auth, "username"):
+        return auth.username, auth.password
+
+    if hasattr(auth, "login"):
+        return auth.login, auth.password
+
+    return auth[0], auth[1]
+
+
+class SimulatorTransport:
+    """
+    This object sends requests to an in-process GameServer instead of over HTTP
+    Pass it to the BattleshAPy object to play games offline
+    """
+    def __init__(self, server: game_server.GameServer = None):
+        """
+        :param server: the server to send requests to. If not specified, a new one is created
+        """
+        self.server = server if server is not None else game_server.GameServer()
+        self.url_base = "simulator://"
+        # games fetch the state at the start of each turn with a single request to this endpoint
+        self.snapshot_endpoint = "/state"
+
+    def request(self, method: str, endpoint: str, **kwargs) -> SimulatorResponse:
+        """
+        Sends a request to the specified endpoint of the simulator
+        :param method: the HTTP method
+        :param endpoint: the endpoint (ex. "/ship")
+        :param kwargs: the arguments accepted by requests. Only headers, json, auth and params are used
+        """
+        # round trip the body through JSON so the server never shares objects with the client
+        body = kwargs.get("json")
+        if body is not None:
+            body = json.loads(json.dumps(body))
+
+        headers = kwargs.get("headers") or {}
+        status, response = self.server.handle(
+            method, endpoint, headers, body, _get_credentials(kwargs.get("auth")), kwargs.get("params")
+        )
+
+        result = SimulatorResponse(status, response)
+        if method == "GET" and status == 200:
+            etag = game_server.get_etag(result.content)
+            if headers.get("If-None-Match") == etag:
+                return SimulatorResponse(304, None, {"ETag": etag})
+
+            result.headers["ETag"] = etag
+
+        return result
+
+    def get(self, endpoint: str, **kwargs) -> SimulatorResponse:
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs) -> SimulatorResponse:
+        return self.request("POST", endpoint, **kwargs)
+
+    def put(self, endpoint: str, **kwargs) -> SimulatorResponse:
+        return self.request("PUT", endpoint, **kwargs)
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> 'SimulatorTransport':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncSimulatorTransport(SimulatorTransport):
+    """
+    This object is the asyncio counterpart of the SimulatorTransport
+    Pass it to the AsyncBattleshAPy object to play games offline
+    """
+    async def get(self, endpoint: str, **kwargs) -> SimulatorResponse:
+        return self.request("GET", endpoint, **kwargs)
+
+    async def post(self, endpoint: str, **kwargs) -> SimulatorResponse:
+        return self.request("POST", endpoint, **kwargs)
+
+    async def put(self, endpoint: str, **kwargs) -> SimulatorResponse:
+        return self.request("PUT", endpoint, **kwargs)
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self) -> 'AsyncSimulatorTransport':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
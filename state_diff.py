@@ -0,0 +1,50 @@
+"""
+This module contains the state diff, which records what changed on the board between two syncs with the server
+"""
+import typing
+
+import BattleshAPy.game_object.ship_game_object as ship_game_object
+
+
+class StateDiff:
+    """
+    This object records the ships which were spawned, moved, damaged or destroyed during a turn
+    It is available as the 'turn_diff' attribute of the game, and is reset at the start of each of my turns
+    WARNING: Do not instantiate this object directly. The library will handle this
+    """
+    def __init__(self):
+        self.spawned = []           # type: typing.List[ship_game_object.Ship]
+        self.moved = []             # type: typing.List[typing.Tuple[ship_game_object.Ship, typing.Tuple[int, int]]]
+        self.damaged = []           # type: typing.List[typing.Tuple[ship_game_object.Ship, int]]
+        self.destroyed = []         # type: typing.List[ship_game_object.Ship]
+
+    def record(
+            self, added: typing.List[ship_game_object.Ship],
+            changed: typing.List[typing.Tuple[ship_game_object.Ship, dict]], removed: typing.List[ship_game_object.Ship]
+    ):
+        """
+        Records the result of reconciling a ship collection
+        :param added: the new ships
+        :param changed: the updated ships with the previous values of their changed attributes
+        :param removed: the ships which no longer exist
+        """
+        self.spawned.extend(added)
+        self.destroyed.extend(removed)
+
+        for ship, previous in changed:
+            if "x" in previous or "y" in previous:
+                self.moved.append((ship, (previous.get("x", ship.x), previous.get("y", ship.y))))
+
+            if "hp" in previous and ship.hp < previous["hp"]:
+                self.damaged.append((ship, previous["hp"]))
+
+    def is_empty(self) -> bool:
+        """
+        Returns if nothing changed
+        """
+        return len(self.spawned) == 0 and len(self.moved) == 0 and len(self.damaged) == 0 and len(self.destroyed) == 0
+
+    def __repr__(self):
+        return "<StateDiff spawned={} moved={} damaged={} destroyed={}>".format(
+            len(self.spawned), len(self.moved), len(self.damaged), len(self.destroyed)
+        )
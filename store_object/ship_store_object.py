@@ -3,6 +3,8 @@ This module represents an item for sale in the store
 """
 import typing
 
+import BattleshAPy.game_object.base_game_object as base_game_object
+
 if typing.TYPE_CHECKING:
     import BattleshAPy.game as game_object
 
@@ -12,6 +14,15 @@ class ShipStore:
     This object represents an item for sale in the store
     WARNING: Do not directly instantiate this class! Let the library handle that
     """
+    __slots__ = (
+        "custom", "id", "max_hp", "name", "price", "shot_damage", "shot_range", "shots_per_turn", "units_per_turn", "game"
+    )
+
+    # the keys of the API payload, which are stored as attributes of the same name
+    json_fields = (
+        "custom", "id", "max_hp", "name", "price", "shot_damage", "shot_range", "shots_per_turn", "units_per_turn"
+    )
+
     def __init__(
             self, custom: bool, id: str, max_hp: int, name: str, price: int, shot_damage: int, shot_range: int,
             shots_per_turn: int, units_per_turn: int, game: 'game_object.Game'
@@ -39,6 +50,15 @@ class ShipStore:
         self.units_per_turn = units_per_turn
         self.game = game
 
+    @classmethod
+    def from_json(cls, data: dict, game: 'game_object.Game' = None) -> 'ShipStore':
+        """
+        Creates an item straight from its API payload
+        :param data: the payload, which is not changed
+        :param game:
+        """
+        return base_game_object.build_from_json(cls, data, game=game)
+
     def purchase(self):
         """
         Executes the purchase of this ship from the store
@@ -0,0 +1,98 @@
+"""
+This module contains the store catalog, a cached copy of the store inventory
+"""
+import time
+import typing
+
+import BattleshAPy.store_object.ship_store_object as ship_store_object
+
+
+class StoreCatalog:
+    """
+    This object represents the store inventory at the time it was fetched
+    The items are sorted by an attribute the first time that attribute is queried,
+    so every later min, max or top n query on it is answered without sorting or a request to the server
+    WARNING: Do not directly instantiate this class! Let the library handle that
+    """
+    def __init__(self, items: typing.List[ship_store_object.ShipStore], fetched_at: float = None):
+        """
+        :param items: the items for sale
+        :param fetched_at: the time the items were fetched from the server. Default is now
+        """
+        self.items = items
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+        self._ascending = {}        # type: typing.Dict[str, typing.List[ship_store_object.ShipStore]]
+        self._descending = {}       # type: typing.Dict[str, typing.List[ship_store_object.ShipStore]]
+
+    def is_expired(self, ttl: float) -> bool:
+        """
+        Returns if the catalog is older than the specified time to live
+        :param ttl: the time to live in seconds. None means the catalog never expires
+        """
+        return ttl is not None and time.time() - self.fetched_at > ttl
+
+    def get_sorted(self, attribute: str, reverse: bool = False) -> typing.List[ship_store_object.ShipStore]:
+        """
+        Returns the items sorted by the specified attribute
+        Items with equal values keep the order of the store
+        :param attribute:
+        :param reverse: if the items should be sorted from largest to smallest
+        """
+        index = self._descending if reverse else self._ascending
+        if attribute not in index:
+            index[attribute] = sorted(self.items, key=lambda item: getattr(item, attribute), reverse=reverse)
+
+        return index[attribute]
+
+    def get_min(self, attribute: str) -> typing.Optional[ship_store_object.ShipStore]:
+        """
+        Returns the item with the smallest value of the specified attribute, or None if the store is empty
+        :param attribute:
+        """
+        items = self.get_sorted(attribute)
+        return items[0] if len(items) > 0 else None
+
+    def get_max(self, attribute: str) -> typing.Optional[ship_store_object.ShipStore]:
+        """
+        Returns the item with the largest value of the specified attribute, or None if the store is empty
+        :param attribute:
+        """
+        items = self.get_sorted(attribute, reverse=True)
+        return items[0] if len(items) > 0 else None
+
+    def get_n_min(self, attribute: str, n: int) -> typing.List[ship_store_object.ShipStore]:
+        """
+        Returns the n items with the smallest values of the specified attribute, from smallest to largest
+        :param attribute:
+        :param n:
+        """
+        return self.get_sorted(attribute)[:n]
+
+    def get_n_max(self, attribute: str, n: int) -> typing.List[ship_store_object.ShipStore]:
+        """
+        Returns the n items with the largest values of the specified attribute, from largest to smallest
+        :param attribute:
+        :param n:
+        """
+        return self.get_sorted(attribute, reverse=True)[:n]
+
+    def get_by_id(self, id: str) -> ship_store_object.ShipStore:
+        """
+        Returns the item with the specified ID
+        :param id:
+        """
+        for item in self.items:
+            if item.id == id:
+                return item
+
+        raise ValueError("Could not find store item with id {}".format(id))
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __repr__(self):
+        return "<StoreCatalog items={}>".format(len(self.items))
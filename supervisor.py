@@ -0,0 +1,169 @@
+"""
+This module contains the game supervisor, which plays many games in one process over a shared pool of worker threads
+"""
+import concurrent.futures
+import heapq
+import itertools
+import threading
+import time
+import traceback
+import typing
+
+import BattleshAPy.game as game_object
+import BattleshAPy.turn_notifier as turn_notifier
+import BattleshAPy.exceptions as exceptions
+
+
+class SupervisedGame:
+    """
+    This object represents the state of a single game run by the supervisor
+    WARNING: Do not instantiate this object directly. Use the 'add_game' method of the supervisor
+    """
+    def __init__(self, game: game_object.Game, notifier: turn_notifier.TurnNotifier = None):
+        """
+        :param game:
+        :param notifier: the strategy used to wait for the game's turn. See Game.play
+        """
+        self.game = game
+        self.notifier = notifier
+
+        self.prepared = False
+        self.finished = False
+        self.restarts = 0
+        self.error = None           # type: Exception
+
+    def __repr__(self):
+        return "<SupervisedGame game_id={} finished={} restarts={} error={}>".format(
+            self.game.game_id, self.finished, self.restarts, repr(self.error)
+        )
+
+
+class GameSupervisor:
+    """
+    This object plays many games at once over a shared pool of worker threads
+    Instead of each game blocking a thread in its own main loop, a single scheduler decides when each game polls for its turn
+    and hands the poll, and the turn if it is the game's, to the pool
+    A game which raises an exception outside of on_turn_start is restarted up to max_restarts times in a row,
+    without affecting the other games. Each turn played to the end resets the count
+    """
+    def __init__(self, max_workers: int = 32, poll_every: float = 0.5, max_restarts: int = 3, restart_delay: float = 1.0):
+        """
+        :param max_workers: the number of worker threads shared by all the games
+        :param poll_every: see Game.play
+        :param max_restarts: the number of times in a row a failing game is restarted before it is given up on
+        :param restart_delay: the number of seconds to wait before restarting a failed game
+        """
+        self.max_workers = max_workers
+        self.poll_every = poll_every
+        self.max_restarts = max_restarts
+        self.restart_delay = restart_delay
+
+        self.games = []             # type: typing.List[SupervisedGame]
+
+        self._queue = []            # type: typing.List[typing.Tuple[float, int, SupervisedGame]]
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._running = 0
+        self._stopped = False
+
+    def add_game(self, game: game_object.Game, notifier: turn_notifier.TurnNotifier = None) -> SupervisedGame:
+        """
+        Adds a game to the supervisor. Games can be added before or while the supervisor is running
+        The game must have already started
+        :param game:
+        :param notifier: the strategy used to wait for the game's turn. See Game.play
+        """
+        supervised = SupervisedGame(game, notifier)
+        with self._condition:
+            self.games.append(supervised)
+            self._schedule(supervised, time.time())
+
+        return supervised
+
+    def _schedule(self, supervised: SupervisedGame, at: float):
+        heapq.heappush(self._queue, (at, next(self._counter), supervised))
+        self._condition.notify()
+
+    def _step(self, supervised: SupervisedGame) -> typing.Optional[float]:
+        # runs one poll (and turn, if it is ours) of a game, returning when it should be polled next, or None if it is over
+        g = supervised.game
+        try:
+            if not supervised.prepared:
+                supervised.notifier = g._prepare_play(self.poll_every, supervised.notifier)
+                supervised.prepared = True
+
+            if g.running and g._poll_turn(supervised.notifier):
+                g._play_turn(supervised.notifier)
+                # only failures without a turn played in between count towards giving up on the game
+                supervised.restarts = 0
+
+            if not g.running:
+                return None
+
+            return time.time() + supervised.notifier.get_delay()
+
+        except exceptions.GameEndedException:
+            g.flush_local_player_ship_data()
+            return None
+
+        except Exception as e:
+            traceback.print_exc()
+            supervised.error = e
+
+            if supervised.restarts >= self.max_restarts:
+                return None
+
+            supervised.restarts += 1
+            supervised.prepared = False
+            return time.time() + self.restart_delay
+
+    def _on_step_done(self, supervised: SupervisedGame, future: concurrent.futures.Future):
+        with self._condition:
+            self._running -= 1
+            next_time = future.result()
+
+            if next_time is None or self._stopped:
+                supervised.finished = True
+            else:
+                self._schedule(supervised, next_time)
+
+            self._condition.notify()
+
+    def run(self) -> typing.List[SupervisedGame]:
+        """
+        Plays all the games, blocking until every one of them has ended, been given up on, or 'stop' is called
+        :return: the supervised games, whose 'error' attribute holds the last exception raised by the game, if any
+        """
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            with self._condition:
+                while not self._stopped and (len(self._queue) > 0 or self._running > 0):
+                    if len(self._queue) == 0:
+                        self._condition.wait()
+                        continue
+
+                    at, _, supervised = self._queue[0]
+                    delay = at - time.time()
+                    if delay > 0:
+                        self._condition.wait(delay)
+                        continue
+
+                    heapq.heappop(self._queue)
+                    self._running += 1
+                    future = pool.submit(self._step, supervised)
+                    future.add_done_callback(lambda f, s=supervised: self._on_step_done(s, f))
+
+                while self._running > 0:
+                    self._condition.wait()
+
+        return self.games
+
+    def stop(self):
+        """
+        Stops the supervisor once the polls and turns in progress have finished
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def __repr__(self):
+        return "<GameSupervisor games={} workers={}>".format(len(self.games), self.max_workers)
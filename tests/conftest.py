@@ -0,0 +1,61 @@
+"""
+Shared setup of the tests, which play against the in-process simulated server
+"""
+import importlib.util
+import os
+import sys
+
+import pytest
+
+try:
+    import BattleshAPy
+except ImportError:
+    # the checkout is not on the path under the name of the package, so it is loaded as the package directly
+    _root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    _spec = importlib.util.spec_from_file_location(
+        "BattleshAPy", os.path.join(_root, "__init__.py"), submodule_search_locations=[_root]
+    )
+    BattleshAPy = importlib.util.module_from_spec(_spec)
+    sys.modules["BattleshAPy"] = BattleshAPy
+    _spec.loader.exec_module(BattleshAPy)
+
+import BattleshAPy.benchmarks.fixtures as fixtures
+import BattleshAPy.simulator.game_server as game_server
+
+
+@pytest.fixture
+def ship_data():
+    """
+    Returns a function which builds the API payload of a battleship
+    """
+    def build(ship_id: str, x: int, y: int, hp: int = 500) -> dict:
+        return dict(
+            custom=False, hp=hp, id=ship_id, max_hp=500, name="Battleship", position=[x, y], price=1000,
+            shot_damage=100, shot_range=6, shots_left=2, shots_per_turn=2, units_left=2, units_per_turn=2
+        )
+
+    return build
+
+
+@pytest.fixture
+def game_pair():
+    """
+    Returns the games of two bots on an empty 20 by 20 board, the first one being the one whose turn it is,
+    and the server side game
+    """
+    return fixtures.create_game(ships=0, size=20, players=2)
+
+
+@pytest.fixture
+def place_ship():
+    """
+    Returns a function which places a ship of a player at a position on the server
+    The games must sync their ships afterwards
+    """
+    def place(simulated_game: game_server.SimulatedGame, player: int, x: int, y: int, item: int = 0) -> str:
+        owner = simulated_game.players[player]
+        ship = game_server.SimulatedShip(simulated_game._new_id(), simulated_game.store[item], owner, x, y)
+        owner.ships[ship.id] = ship
+        return ship.id
+
+    return place
@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+import BattleshAPy.game_object_collection.base_object_collection as base_object_collection
+import BattleshAPy.game_object_collection.ship_collection as ship_collection
+import BattleshAPy.local_data.player_ship as local_player_ship
+
+
+def brute_force(ships, x, y, r=None):
+    result = sorted(((s, s.distance(x, y)) for s in ships.objects), key=lambda o: o[1])
+    return [(s.id, d) for s, d in result if r is None or d <= r]
+
+
+def test_object_index_keeps_collection_order_after_updates():
+    class Item:
+        def __init__(self, id, kind):
+            self.id = id
+            self.kind = kind
+
+    items = [Item(i, "a" if i % 2 == 0 else "b") for i in range(6)]
+    order = {id(o): i for i, o in enumerate(items)}
+    index = base_object_collection.ObjectIndex(lambda o: o.kind, ("kind",))
+    index.build(items)
+
+    items[5].kind = "a"
+    index.update(items[5], order)
+    items[0].kind = "b"
+    index.update(items[0], order)
+
+    assert [o.id for o in index.get("a")] == [2, 4, 5]
+    assert [o.id for o in index.get("b")] == [0, 1, 3]
+
+
+def test_position_index_follows_moved_ships(ship_data):
+    ships = ship_collection.ShipCollection([])
+    ships.sync_json([ship_data(str(x), x, 2) for x in range(1, 10)])
+    ship = ships.get_at_position(1, 2)
+
+    ship.x, ship.y = 1, 8
+
+    assert ships.get_at_position(1, 8) is ship
+    with pytest.raises(ValueError):
+        ships.get_at_position(1, 2)
+
+
+def test_attribute_index_follows_synced_changes(ship_data):
+    ships = ship_collection.ShipCollection([]).add_index("hp")
+    ships.sync_json([ship_data(str(i), i, 0) for i in range(5)])
+    assert [s.id for s in ships.get_all_by_attribute("hp", 500)] == ["0", "1", "2", "3", "4"]
+
+    ships.sync_json([ship_data(str(i), i, 0, hp=400 if i in (1, 3) else 500) for i in range(5)])
+
+    assert [s.id for s in ships.get_all_by_attribute("hp", 400)] == ["1", "3"]
+    assert [s.id for s in ships.get_all_by_attribute("hp", 500)] == ["0", "2", "4"]
+    assert ships.get_by_attribute("hp", 400).id == "1"
+
+
+def test_indexes_are_rebuilt_after_ships_are_added_or_removed(ship_data):
+    ships = ship_collection.ShipCollection([])
+    ships.sync_json([ship_data("a", 1, 1), ship_data("b", 2, 2)])
+    assert ships.get_by_id("b").id == "b"
+
+    ships.sync_json([ship_data("a", 1, 1), ship_data("c", 3, 3)])
+
+    assert ships.get_by_id("c").id == "c"
+    assert ships.get_at_position(3, 3).id == "c"
+    with pytest.raises(ValueError):
+        ships.get_by_id("b")
+
+
+def test_iter_by_distance_matches_a_full_sort(ship_data):
+    rng = random.Random(1)
+    positions = rng.sample([(x, y) for x in range(40) for y in range(40)], 150)
+    ships = ship_collection.ShipCollection([])
+    ships.sync_json([ship_data(str(i), x, y) for i, (x, y) in enumerate(positions)])
+
+    for x, y, r in [(0, 0, None), (20, 20, None), (3, 37, 6), (39, 1, 0), (100, 100, None)]:
+        assert [(s.id, d) for s, d in ships.iter_by_distance(x, y, r)] == brute_force(ships, x, y, r)
+
+
+def test_iter_by_distance_follows_moved_ships(ship_data):
+    ships = ship_collection.ShipCollection([])
+    ships.sync_json([ship_data(str(x), x, 2) for x in range(40)])
+    # builds the grid index before the ships move, so the moves must update it in place
+    list(ships.iter_by_distance(0, 0))
+
+    for ship in ships.objects[:10]:
+        ship.y += 20
+
+    for x, y in [(0, 0), (3, 22), (38, 2)]:
+        assert [(s.id, d) for s, d in ships.iter_by_distance(x, y)] == brute_force(ships, x, y)
+
+    assert ships.get_nearest(1, 22)[0].id == "1"
+    assert [s.id for s, _ in ships.get_n_nearest(0, 21, 3)] == ["0", "1", "2"]
+
+
+def test_metadata_named_like_a_spatial_index_is_found(ship_data):
+    records = {"a": local_player_ship.PlayerShip("a"), "b": local_player_ship.PlayerShip("b")}
+    ships = ship_collection.ShipCollection([])
+    ships.sync_json([ship_data("a", 1, 1), ship_data("b", 2, 2)], local_player_ships=records)
+    # builds the spatial indexes first
+    assert ships.get_at_position(1, 1).id == "a"
+
+    records["b"].set_attribute("position", "north")
+    records["b"].set_attribute("cell", 3)
+
+    assert ships.get_by_attribute("position", "north").id == "b"
+    assert [s.id for s in ships.get_all_by_attribute("cell", 3)] == ["b"]
+
+    # indexing the metadata leaves the position and distance queries alone
+    ships.add_index("position").add_index("cell")
+    assert ships.get_by_attribute("position", "north").id == "b"
+    assert [s.id for s in ships.get_all_by_attribute("cell", 3)] == ["b"]
+    assert ships.get_at_position(2, 2).id == "b"
+    assert [s.id for s, _ in ships.iter_by_distance(0, 0)] == ["a", "b"]
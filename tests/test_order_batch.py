@@ -0,0 +1,125 @@
+import time
+
+import BattleshAPy.exceptions as exceptions
+import BattleshAPy.turn_deadline as turn_deadline
+
+
+def test_lanes_join_orders_sharing_a_ship_or_tile(game_pair, place_ship):
+    games, simulated_game = game_pair
+    g = games[0]
+    a = place_ship(simulated_game, 0, 5, 5)
+    b = place_ship(simulated_game, 0, 6, 5)
+    c = place_ship(simulated_game, 0, 10, 10)
+    g._update_ships()
+
+    batch = g.batch()
+    batch.move_ship_relative(a, 0, 1)
+    # moves onto the tile a is leaving, so it must wait for a
+    batch.move_ship(b, 5, 5)
+    batch.move_ship_relative(c, 1, 0)
+    batch.shoot_ship(c, 12, 10)
+
+    lanes = batch._get_lanes(batch.orders)
+    assert [[o.ship_id for o in lane] for lane in lanes] == [[a, b], [c, c]]
+
+
+def test_dispatch_moves_ships_in_lane_order(game_pair, place_ship):
+    games, simulated_game = game_pair
+    g = games[0]
+    ship_ids = [place_ship(simulated_game, 0, x, 5) for x in range(5, 10)]
+    g._update_ships()
+
+    # each ship moves onto the tile the one before it leaves
+    with g.batch() as batch:
+        for ship_id in reversed(ship_ids):
+            batch.move_ship_relative(ship_id, 1, 0)
+
+    assert dict(batch.errors) == {}
+    assert [(s.x, s.y) for s in simulated_game.players[0].ships.values()] == [(x, 5) for x in range(6, 11)]
+    assert [(g.me.ships.get_by_id(i).x, g.me.ships.get_by_id(i).y) for i in ship_ids] == [(x, 5) for x in range(6, 11)]
+
+
+def test_occupied_moves_are_retried_after_the_other_lanes(game_pair, place_ship):
+    games, simulated_game = game_pair
+    g = games[0]
+    a = place_ship(simulated_game, 0, 5, 5)
+    b = place_ship(simulated_game, 0, 6, 5)
+    g._update_ships()
+
+    # queued in the wrong order, so a runs into b first and only gets through on the retry
+    with g.batch() as batch:
+        batch.move_ship(a, 6, 5)
+        batch.move_ship(b, 7, 5)
+
+    assert dict(batch.errors) == {}
+    assert [tuple(o.result) for o in batch.completed] == [(6, 5), (7, 5)]
+    assert g.occupancy.get_ship(6, 5).id == a
+
+
+def test_a_failed_move_holds_back_the_later_orders_of_its_ship(game_pair, place_ship):
+    games, simulated_game = game_pair
+    g = games[0]
+    # a patrol boat, so it has the units for both moves
+    a = place_ship(simulated_game, 0, 5, 5, item=3)
+    b = place_ship(simulated_game, 0, 6, 5)
+    g._update_ships()
+
+    with g.batch() as batch:
+        first = batch.move_ship_relative(a, 1, 0)
+        second = batch.move_ship_relative(a, 0, 1)
+        batch.move_ship_relative(b, 0, -1)
+
+    # the second move of a waits for the first one to get through, rather than running from the wrong tile
+    assert dict(batch.errors) == {}
+    assert (tuple(first.result), tuple(second.result)) == ((6, 5), (6, 6))
+
+
+def test_moves_which_still_fail_are_collected(game_pair, place_ship):
+    games, simulated_game = game_pair
+    g = games[0]
+    # a patrol boat, so it has the units left to retry the move onto the base
+    a = place_ship(simulated_game, 0, 1, 0, item=3)
+    g._update_ships()
+
+    with g.batch() as batch:
+        batch.move_ship(a, 0, 0)
+        last = batch.move_ship(a, 1, 1)
+
+    # the later move is only sent once the retry of the move onto the base has failed
+    assert [type(e) for e in batch.errors[a]] == [exceptions.PositionOccupiedException]
+    assert tuple(last.result) == (1, 1)
+    assert (g.me.ships.get_by_id(a).x, g.me.ships.get_by_id(a).y) == (1, 1)
+
+
+def test_trim_drops_the_lowest_priority_orders(game_pair, place_ship):
+    games, simulated_game = game_pair
+    g = games[0]
+    a = place_ship(simulated_game, 0, 5, 5)
+    g._update_ships()
+
+    # one worker with time for two round trips left
+    g.rtt = 1.0
+    g.turn_deadline = turn_deadline.TurnDeadline(time.time(), 2.5, margin=0.0)
+
+    batch = g.batch(max_workers=1)
+    low = batch.shoot_ship(a, 6, 5, priority=0)
+    high = batch.shoot_ship(a, 7, 5, priority=5)
+    mid = batch.shoot_ship(a, 8, 5, priority=1)
+
+    assert batch._trim() == [high, mid]
+    assert isinstance(low.error, exceptions.TurnDeadlineExceededException)
+
+
+def test_trim_keeps_every_order_without_a_deadline(game_pair, place_ship):
+    games, simulated_game = game_pair
+    g = games[0]
+    a = place_ship(simulated_game, 0, 5, 5)
+    g._update_ships()
+
+    g.rtt = 1.0
+    g.turn_deadline = None
+
+    batch = g.batch(max_workers=1)
+    orders = [batch.shoot_ship(a, 6, 5, priority=p) for p in range(3)]
+
+    assert batch._trim() == orders
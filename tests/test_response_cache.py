@@ -0,0 +1,122 @@
+import asyncio
+
+import BattleshAPy.battleshapy as battleshapy
+import BattleshAPy.benchmarks.fixtures as fixtures
+import BattleshAPy.response_cache as response_cache
+import BattleshAPy.simulator.game_server as game_server
+import BattleshAPy.simulator.simulator_transport as simulator_transport
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CountingTransport(simulator_transport.SimulatorTransport):
+    """
+    Counts the requests which reach the server and the status codes of their responses
+    """
+    def __init__(self, server: game_server.GameServer):
+        super().__init__(server)
+        self.statuses = []
+
+    def request(self, method: str, endpoint: str, **kwargs) -> simulator_transport.SimulatorResponse:
+        r = super().request(method, endpoint, **kwargs)
+        self.statuses.append((method, endpoint, r.status_code))
+        return r
+
+
+def create_game(transport: simulator_transport.SimulatorTransport, start: bool = True):
+    g = battleshapy.BattleshAPy("first", "", transport).create_game(fixtures.BenchmarkGame, 20, 20, 0, 1000, 0)
+    battleshapy.BattleshAPy("second", "", transport).join_game(fixtures.BenchmarkGame, g.game_id)
+    if start:
+        g.start_game()
+
+    return g
+
+
+def test_stale_responses_are_revalidated_with_a_304():
+    transport = CountingTransport(game_server.GameServer(seed=0))
+    g = create_game(transport)
+    clock = Clock()
+    caching = response_cache.CachingTransport(transport, response_cache.ResponseCache({"/island": 10.0}, clock))
+    transport.statuses.clear()
+
+    first = caching.get("/island", headers=g._headers())
+    assert first.status_code == 200
+
+    # fresh, so the server is not asked
+    hit = caching.get("/island", headers=g._headers())
+    assert hit.from_cache and not hit.revalidated
+
+    clock.now += 11
+    revalidated = caching.get("/island", headers=g._headers())
+    assert revalidated.from_cache and revalidated.revalidated
+    assert revalidated.json() == first.json()
+
+    assert transport.statuses == [("GET", "/island", 200), ("GET", "/island", 304)]
+    assert caching.cache.to_dict() == dict(hits={"/island": 1}, revalidations={"/island": 1}, misses={"/island": 1})
+
+
+def test_changed_responses_replace_the_cached_one():
+    transport = CountingTransport(game_server.GameServer(seed=0))
+    g = create_game(transport, start=False)
+    caching = response_cache.CachingTransport(transport, response_cache.ResponseCache({"/game": 0.0}))
+
+    waiting = caching.get("/game", headers=g._headers()).json()
+    transport.put("/game", headers=g._headers())
+    started = caching.get("/game", headers=g._headers())
+
+    assert not getattr(started, "from_cache", False)
+    assert started.json() != waiting
+    assert [s for _, _, s in transport.statuses[-3:]] == [200, 200, 200]
+    assert caching.cache.misses["/game"] == 2 and caching.cache.revalidations["/game"] == 0
+
+
+def test_other_requests_invalidate_the_endpoint_of_the_same_game():
+    transport = CountingTransport(game_server.GameServer(seed=0))
+    g = create_game(transport)
+    other = create_game(transport)
+    caching = response_cache.CachingTransport(transport, response_cache.ResponseCache({"/game": None}))
+
+    for game in (g, other):
+        caching.get("/game", headers=game._headers())
+
+    caching.put("/game", headers=g._headers())
+
+    assert not getattr(caching.get("/game", headers=g._headers()), "from_cache", False)
+    assert caching.get("/game", headers=other._headers()).from_cache
+
+
+def test_games_revalidate_through_their_own_cache(game_pair):
+    games, _ = game_pair
+    g = games[0]
+    g.response_cache.invalidate()
+    misses = g.response_cache.misses["/game"]
+    revalidations = g.response_cache.revalidations["/game"]
+
+    for _ in range(3):
+        g._poll_game_status()
+
+    assert g.response_cache.misses["/game"] - misses == 1
+    assert g.response_cache.revalidations["/game"] - revalidations == 2
+
+
+def test_async_cache_hits_are_awaitable():
+    server = game_server.GameServer(seed=0)
+    g = create_game(simulator_transport.SimulatorTransport(server))
+    caching = response_cache.CachingTransport(
+        simulator_transport.AsyncSimulatorTransport(server), response_cache.ResponseCache({"/island": 10.0})
+    )
+
+    async def run():
+        first = await caching.get("/island", headers=g._headers())
+        hit = await caching.get("/island", headers=g._headers())
+        return first, hit
+
+    first, hit = asyncio.run(run())
+    assert first.status_code == 200
+    assert hit.from_cache and hit.json() == first.json()
@@ -0,0 +1,40 @@
+import BattleshAPy.game_object_collection.ship_collection as ship_collection
+
+
+def test_sync_json_reconciles_ships_by_id(ship_data):
+    ships = ship_collection.ShipCollection([])
+    ships.sync_json([ship_data("kept", 5, 5), ship_data("changed", 6, 5), ship_data("removed", 7, 5)])
+    kept, changed, removed = ships.objects
+
+    added_ships, changed_ships, removed_ships = ships.sync_json([
+        ship_data("kept", 5, 5), ship_data("changed", 6, 9, hp=400), ship_data("added", 8, 5)
+    ])
+
+    assert [s.id for s in added_ships] == ["added"]
+    assert changed_ships == [(changed, dict(hp=500, y=5))]
+    assert removed_ships == [removed] and removed.removed
+
+    # the existing objects are updated in place
+    assert ships.objects[:2] == [kept, changed]
+    assert (changed.x, changed.y, changed.hp) == (6, 9, 400)
+    assert [s.id for s in ships.objects] == ["kept", "changed", "added"]
+
+
+def test_sync_json_without_changes_reports_nothing(ship_data):
+    data = [ship_data("a", 5, 5), ship_data("b", 6, 5)]
+    ships = ship_collection.ShipCollection([])
+    ships.sync_json(data)
+    objects = list(ships.objects)
+
+    assert ships.sync_json(data) == ([], [], [])
+    assert ships.objects == objects
+
+
+def test_sync_json_follows_the_order_of_the_data(ship_data):
+    ships = ship_collection.ShipCollection([])
+    ships.sync_json([ship_data("a", 1, 1), ship_data("b", 2, 2)])
+    a, b = ships.objects
+
+    ships.sync_json([ship_data("b", 2, 2), ship_data("a", 1, 1)])
+
+    assert ships.objects == [b, a]
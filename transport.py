@@ -0,0 +1,86 @@
+"""
+This module contains the transport which all HTTP traffic to the API goes through
+A single transport owns a pool of keep-alive connections, so it should be shared between every game a bot plays
+"""
+import typing
+
+import requests
+import requests.adapters as adapters
+import urllib3.util.retry as retry
+
+import BattleshAPy.utils as utils
+
+
+class Transport:
+    """
+    This object owns a pooled, keep-alive HTTP session to the API
+    The BattleshAPy object creates one of these and hands it to every game it creates,
+    so all the games controlled by one bot reuse the same warm connections
+    """
+    def __init__(
+            self, url_base: str = None, pool_connections: int = 10, pool_maxsize: int = 10,
+            timeout: typing.Union[float, typing.Tuple[float, float]] = (3.05, 10), max_retries: int = 3,
+            backoff_factor: float = 0.1, status_forcelist: typing.Iterable[int] = (502, 503, 504)
+    ):
+        """
+        :param url_base: the base URL of the API. Defaults to the value of utils.get_url_base()
+        :param pool_connections: the number of hosts to keep a connection pool for
+        :param pool_maxsize: the maximum number of connections kept alive per host
+        :param timeout: the request timeout in seconds, either a single number or a (connect, read) tuple
+        :param max_retries: the number of times an idempotent request is retried on connection errors
+        or on one of the statuses in status_forcelist
+        :param backoff_factor: the backoff factor between retries (see urllib3's Retry object)
+        :param status_forcelist: the statuses which cause an idempotent request to be retried
+        """
+        self.url_base = url_base if url_base is not None else utils.get_url_base()
+        self.timeout = timeout
+
+        # POST is deliberately not retried as moving, shooting and buying are not idempotent
+        self.retries = retry.Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=tuple(status_forcelist),
+            allowed_methods=frozenset(["GET", "PUT"]),
+            raise_on_status=False
+        )
+
+        self.session = requests.Session()
+        adapter = adapters.HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=self.retries
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """
+        Sends a request to the specified endpoint of the API
+        :param method: the HTTP method
+        :param endpoint: the endpoint relative to the base URL (ex. "/ship")
+        :param kwargs: any additional arguments accepted by requests
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, self.url_base + endpoint, **kwargs)
+
+    def get(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("POST", endpoint, **kwargs)
+
+    def put(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("PUT", endpoint, **kwargs)
+
+    def close(self):
+        """
+        Closes all the pooled connections
+        """
+        self.session.close()
+
+    def __enter__(self) -> 'Transport':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
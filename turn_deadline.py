@@ -0,0 +1,70 @@
+"""
+This module contains the turn deadline, which tracks how much of the current turn is left
+"""
+import time
+import typing
+
+import BattleshAPy.exceptions as exceptions
+
+
+class TurnDeadline:
+    """
+    This object represents the time by which my current turn must be ended
+    It is the latest time the turn can have started, plus the turn length,
+    minus the round trip time of the request which ends the turn and a safety margin
+    A new one is available from the 'turn_deadline' attribute of the game at the start of each turn
+    """
+    def __init__(self, started_at: float, turn_length: typing.Optional[float], rtt: float = 0.0, margin: float = 0.1):
+        """
+        :param started_at: the earliest time the turn can have started
+        :param turn_length: the length of a turn in seconds. None or 0 means turns are never ended by the server
+        :param rtt: the measured round trip time of a request in seconds
+        :param margin: the number of seconds to keep in reserve
+        """
+        self.started_at = started_at
+        self.turn_length = turn_length
+        self.rtt = rtt
+        self.margin = margin
+
+        if turn_length:
+            self.ends_at = started_at + turn_length - rtt - margin
+        else:
+            self.ends_at = None         # type: float
+
+    def remaining(self, now: float = None) -> float:
+        """
+        Returns the number of seconds left before the turn must be ended. This is infinite if turns have no length
+        :param now: the current time. Default is time.time()
+        """
+        if self.ends_at is None:
+            return float("inf")
+
+        return self.ends_at - (time.time() if now is None else now)
+
+    def is_expired(self, now: float = None) -> bool:
+        """
+        Returns if the turn must be ended now
+        :param now: the current time. Default is time.time()
+        """
+        return self.remaining(now) <= 0
+
+    def has_time(self, seconds: float, now: float = None) -> bool:
+        """
+        Returns if the specified number of seconds can be spent before the turn must be ended
+        :param seconds:
+        :param now: the current time. Default is time.time()
+        """
+        return self.remaining(now) >= seconds
+
+    def check(self, seconds: float = None):
+        """
+        Raises a TurnDeadlineExceededException if there is not enough time left for something taking the specified number of seconds
+        :param seconds: the time needed. Default is the round trip time of a request
+        """
+        if not self.has_time(self.rtt if seconds is None else seconds):
+            raise exceptions.TurnDeadlineExceededException(
+                "There is not enough time left to send this request before the turn must be ended"
+            )
+
+    def __repr__(self):
+        return "<TurnDeadline remaining={:.3f}>".format(self.remaining())
@@ -0,0 +1,188 @@
+"""
+This module contains the turn notifiers, which decide how the main loop of the game waits for its turn
+A notifier does not send any requests itself. The main loop asks it what to send and how long to sleep,
+and tells it what the server answered, so the same notifier works for both Game and AsyncGame
+"""
+import time
+import typing
+
+
+class TurnNotifier:
+    """
+    This object is the base of all turn notifiers
+    The default implementation polls the server at a fixed interval
+    """
+    def __init__(self, poll_every: float = 0.5):
+        """
+        :param poll_every: the interval to poll the server at. Minimum is 0.3s
+        """
+        self.poll_every = max(0.3, poll_every)
+        self.turn_length = None             # type: float
+
+        self._last_sent_at = None           # type: float
+        self._previous_received_at = None   # type: float
+        self._was_my_turn = False
+        self._my_turn_started_at = None     # type: float
+        self._my_turn_status_took = None    # type: float
+
+    def set_turn_length(self, turn_length: float):
+        """
+        Called by the game once the length of a turn is known
+        :param turn_length: the length of a turn in seconds
+        """
+        self.turn_length = turn_length
+
+    def get_request_kwargs(self) -> dict:
+        """
+        Returns the additional arguments to send the next turn request with
+        """
+        return {}
+
+    def on_turn_status(self, turn: dict, sent_at: float, received_at: float):
+        """
+        Called by the game with the response of each turn request
+        :param turn: the response of the server
+        :param sent_at: the time the request was sent
+        :param received_at: the time the response was received
+        """
+        is_me = turn.get("is_me", False)
+        if is_me and not self._was_my_turn:
+            # the turn was not mine when the previous response was received, so it can not have started before then
+            self._my_turn_started_at = self._previous_received_at if self._previous_received_at is not None else sent_at
+            self._my_turn_status_took = received_at - sent_at
+
+        self._was_my_turn = is_me
+        self._previous_received_at = received_at
+        self._last_sent_at = sent_at
+
+    def get_my_turn_started_at(self, rtt: float = 0.0) -> typing.Optional[float]:
+        """
+        Returns the earliest time my current turn can have started, or None if it is not my turn
+        :param rtt: the measured round trip time of a request.
+        A response which took much longer than this was held by a long polling server until the turn started,
+        so the turn started no earlier than one round trip before it was received
+        """
+        if not self._was_my_turn:
+            return None
+
+        started_at = self._my_turn_started_at
+        if self._my_turn_status_took is not None and self._my_turn_status_took > 2 * rtt + 0.1:
+            started_at = max(started_at, self._previous_received_at - rtt)
+
+        return started_at
+
+    def on_turn_end(self, ended_at: float):
+        """
+        Called by the game after it has ended its turn
+        :param ended_at: the time the turn was ended
+        """
+        self._was_my_turn = False
+        self._previous_received_at = ended_at
+
+    def get_delay(self, now: float = None) -> float:
+        """
+        Returns the number of seconds to wait before sending the next turn request
+        :param now: the current time. Default is time.time()
+        """
+        now = time.time() if now is None else now
+        if self._last_sent_at is None:
+            return self.poll_every
+
+        return max(0.0, self.poll_every - (now - self._last_sent_at))
+
+    def __repr__(self):
+        return "<{}>".format(self.__class__.__name__)
+
+
+class AdaptivePollingNotifier(TurnNotifier):
+    """
+    This notifier estimates when the current turn will be forced to end from the turn length,
+    and only polls quickly when that moment is near
+    The start of a turn is known either when the game ends its own turn, or when the server reports a new current player
+    """
+    def __init__(self, min_interval: float = 0.1, max_interval: float = 0.5, window: float = 0.5):
+        """
+        :param min_interval: the interval to poll at when a turn is about to end
+        :param max_interval: the interval to poll at when the end of the turn is far away or unknown
+        :param window: the number of seconds around the estimated end of a turn in which min_interval is used
+        """
+        super().__init__(max_interval)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.window = window
+
+        self._turn_player = None            # type: str
+        self._turn_started_at = None        # type: float
+        self._last_received_at = None       # type: float
+
+    def on_turn_status(self, turn: dict, sent_at: float, received_at: float):
+        if turn.get("turn") != self._turn_player:
+            # the turn changed at some point since the previous response. Assume the earliest, so we never wake up late
+            self._turn_player = turn.get("turn")
+            self._turn_started_at = self._last_received_at if self._last_received_at is not None else sent_at
+
+        self._last_received_at = received_at
+        super().on_turn_status(turn, sent_at, received_at)
+
+    def on_turn_end(self, ended_at: float):
+        super().on_turn_end(ended_at)
+        self._turn_player = None
+        self._turn_started_at = ended_at
+        self._last_received_at = ended_at
+
+    def get_estimated_turn_end(self) -> typing.Optional[float]:
+        """
+        Returns the latest time the current turn can end at, or None if it is unknown
+        """
+        if self.turn_length is None or self._turn_started_at is None:
+            return None
+
+        return self._turn_started_at + self.turn_length
+
+    def get_delay(self, now: float = None) -> float:
+        now = time.time() if now is None else now
+        turn_end = self.get_estimated_turn_end()
+
+        if turn_end is None or now > turn_end + self.window:
+            return self.max_interval
+
+        remaining = turn_end - now
+        if remaining > self.window:
+            # sleep until the window opens, but never longer than max_interval as players may end their turns early
+            return min(self.max_interval, remaining - self.window)
+
+        return self.min_interval
+
+
+class LongPollNotifier(AdaptivePollingNotifier):
+    """
+    This notifier asks the server to hold each turn request until the turn changes or 'wait' seconds pass
+    Servers which do not support long polling answer immediately,
+    in which case this notifier behaves exactly like the AdaptivePollingNotifier
+    """
+    def __init__(self, wait: float = 10.0, min_interval: float = 0.1, max_interval: float = 0.5, window: float = 0.5):
+        """
+        :param wait: the number of seconds the server is asked to hold each request for
+        :param min_interval: see AdaptivePollingNotifier
+        :param max_interval: see AdaptivePollingNotifier
+        :param window: see AdaptivePollingNotifier
+        """
+        super().__init__(min_interval, max_interval, window)
+        self.wait = wait
+        self.supported = False
+
+    def get_request_kwargs(self) -> dict:
+        return dict(params=dict(wait=self.wait), timeout=self.wait + 10)
+
+    def on_turn_status(self, turn: dict, sent_at: float, received_at: float):
+        # a response which was held without the turn changing means the server supports long polling
+        if turn.get("turn") == self._turn_player and received_at - sent_at >= self.wait / 2:
+            self.supported = True
+
+        super().on_turn_status(turn, sent_at, received_at)
+
+    def get_delay(self, now: float = None) -> float:
+        if self.supported:
+            return 0.0
+
+        return super().get_delay(now)
@@ -0,0 +1,249 @@
+"""
+This module contains the turn snapshot, an immutable record of the state of a game at the start of one of my turns,
+and the turn history, which keeps the last snapshots
+Unlike the game objects, which are updated in place, a snapshot never changes once it has been taken,
+so each one shares the players, ships and islands which did not change with the snapshot before it
+"""
+import collections
+import time
+import types
+import typing
+
+if typing.TYPE_CHECKING:
+    import BattleshAPy.game as game
+    import BattleshAPy.game_object.ship_game_object as ship_game_object
+    import BattleshAPy.game_object.player_game_object as player_game_object
+    import BattleshAPy.game_object.island_game_object as island_game_object
+
+
+class ShipState(collections.namedtuple("ShipState", (
+        "id", "owner_id", "x", "y", "hp", "max_hp", "name", "custom", "price", "shot_damage", "shot_range",
+        "shots_left", "shots_per_turn", "units_left", "units_per_turn"
+))):
+    """
+    This object represents a ship as it was when a snapshot was taken
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_ship(cls, ship: 'ship_game_object.Ship', owner_id: str) -> 'ShipState':
+        return cls(
+            ship.id, owner_id, ship.x, ship.y, ship.hp, ship.max_hp, ship.name, ship.custom, ship.price,
+            ship.shot_damage, ship.shot_range, ship.shots_left, ship.shots_per_turn, ship.units_left,
+            ship.units_per_turn
+        )
+
+
+class PlayerState(collections.namedtuple("PlayerState", ("id", "name", "hp", "money", "is_me", "base", "ships"))):
+    """
+    This object represents a player and their ships as they were when a snapshot was taken
+    The money of other players is not sent by the server, so it is None
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_player(
+            cls, player: 'player_game_object.Player', base: typing.Optional[typing.Tuple[int, int]],
+            previous: 'PlayerState' = None, previous_ships: typing.Mapping[str, ShipState] = None
+    ) -> 'PlayerState':
+        """
+        :param player:
+        :param base:
+        :param previous: the state of the player in the previous snapshot, which is returned if nothing changed
+        :param previous_ships: the ships of the previous snapshot by ID. Ships which did not change are reused
+        """
+        ships = []
+        unchanged = previous is not None and len(previous.ships) == len(player.ships.objects)
+        for s in player.ships.objects:
+            state = ShipState.from_ship(s, player.id)
+            old = previous_ships.get(s.id) if previous_ships is not None else None
+            if old is not None and old == state:
+                state = old
+
+            ships.append(state)
+            unchanged = unchanged and previous.ships[len(ships) - 1] is state
+
+        if unchanged and (previous.name, previous.hp, previous.money, previous.is_me, previous.base) == (
+                player.name, player.hp, player.money, player.is_me, base
+        ):
+            return previous
+
+        return cls(player.id, player.name, player.hp, player.money, player.is_me, base, tuple(ships))
+
+    def to_dict(self) -> dict:
+        data = self._asdict()
+        data["ships"] = [s._asdict() for s in self.ships]
+        return data
+
+
+class IslandState(collections.namedtuple("IslandState", ("id", "x", "y", "money_per_turn", "name"))):
+    """
+    This object represents an island as it was when a snapshot was taken
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_island(cls, island: 'island_game_object.Island') -> 'IslandState':
+        return cls(island.id, island.x, island.y, island.money_per_turn, island.name)
+
+
+class TurnSnapshot(collections.namedtuple("TurnSnapshot", (
+        "turn", "is_me", "status", "board_size", "players", "islands", "ships", "taken_at"
+))):
+    """
+    This object represents the state of a game at the start of a turn: whose turn it is, the game status,
+    every player with their hp, money and ships, and the islands
+    'players' and 'islands' are tuples, and 'ships' is a read-only mapping of every ship by ID
+    WARNING: Do not instantiate this object directly. The library will handle this
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_game(
+            cls, g: 'game.Game', turn: dict, status: dict, taken_at: float = None, previous: 'TurnSnapshot' = None
+    ) -> 'TurnSnapshot':
+        """
+        Takes a snapshot of the game objects of a game, which must have just been updated from the server
+        :param g:
+        :param turn: the response of GET /turn
+        :param status: the response of GET /game
+        :param taken_at: the time the state was fetched. Default is now
+        :param previous: the snapshot before this one. The players, ships and islands which did not change are shared with it
+        """
+        previous_players = {p.id: p for p in previous.players} if previous is not None else {}
+        previous_ships = previous.ships if previous is not None else None
+
+        players = tuple(
+            PlayerState.from_player(p, g.base_locations.get(p.id), previous_players.get(p.id), previous_ships)
+            for p in g.players.objects
+        )
+        if previous is not None and len(players) == len(previous.players) and all(
+                a is b for a, b in zip(players, previous.players)
+        ):
+            players, ships = previous.players, previous.ships
+        else:
+            ships = types.MappingProxyType({s.id: s for p in players for s in p.ships})
+
+        islands = tuple(IslandState.from_island(i) for i in g.islands.objects)
+        if previous is not None and islands == previous.islands:
+            islands = previous.islands
+
+        return cls(
+            turn["turn"], turn["is_me"], status.get("status"), tuple(status.get("board_size", g.game_size or ())),
+            players, islands, ships, taken_at if taken_at is not None else time.time()
+        )
+
+    @property
+    def me(self) -> typing.Optional[PlayerState]:
+        for p in self.players:
+            if p.is_me:
+                return p
+
+        return None
+
+    def get_player(self, player_id: str) -> typing.Optional[PlayerState]:
+        for p in self.players:
+            if p.id == player_id:
+                return p
+
+        return None
+
+    def get_ship(self, ship_id: str) -> typing.Optional[ShipState]:
+        return self.ships.get(ship_id)
+
+    def to_dict(self) -> dict:
+        """
+        Returns this snapshot as plain dictionaries and lists, ex. to save it as JSON for a replay
+        """
+        return dict(
+            turn=self.turn, is_me=self.is_me, status=self.status, board_size=list(self.board_size),
+            players=[p.to_dict() for p in self.players], islands=[i._asdict() for i in self.islands],
+            taken_at=self.taken_at
+        )
+
+    def __repr__(self):
+        return "<TurnSnapshot turn={} players={} ships={} islands={}>".format(
+            self.turn, len(self.players), len(self.ships), len(self.islands)
+        )
+
+
+class TurnHistory:
+    """
+    This object keeps the last snapshots of a game, from the oldest to the newest
+    Once it is full, each new snapshot replaces the oldest one
+    It is available as the 'history' attribute of the game
+    """
+    def __init__(self, maxlen: int = 100):
+        """
+        :param maxlen: the number of snapshots kept
+        """
+        self.snapshots = collections.deque(maxlen=maxlen)      # type: typing.Deque[TurnSnapshot]
+
+    @property
+    def maxlen(self) -> int:
+        return self.snapshots.maxlen
+
+    @property
+    def latest(self) -> typing.Optional[TurnSnapshot]:
+        return self.snapshots[-1] if len(self.snapshots) > 0 else None
+
+    def append(self, snapshot: TurnSnapshot):
+        self.snapshots.append(snapshot)
+
+    def clear(self):
+        self.snapshots.clear()
+
+    def get_ship_states(self, ship_id: str) -> typing.List[typing.Tuple[float, ShipState]]:
+        """
+        Returns the states of a ship in every snapshot it is in, from the oldest to the newest
+        :param ship_id:
+        :return: a list of (time the snapshot was taken, state) tuples
+        """
+        return [(s.taken_at, s.ships[ship_id]) for s in self.snapshots if ship_id in s.ships]
+
+    def get_player_states(self, player_id: str) -> typing.List[typing.Tuple[float, PlayerState]]:
+        """
+        Returns the states of a player in every snapshot they are in, from the oldest to the newest
+        :param player_id:
+        :return: a list of (time the snapshot was taken, state) tuples
+        """
+        result = []
+        for s in self.snapshots:
+            player = s.get_player(player_id)
+            if player is not None:
+                result.append((s.taken_at, player))
+
+        return result
+
+    def get_velocity(self, ship_id: str, turns: int = 1) -> typing.Optional[typing.Tuple[float, float]]:
+        """
+        Returns the average distance a ship moved per snapshot over the last snapshots it is in
+        :param ship_id:
+        :param turns: the number of snapshots to average over
+        :return: the (x, y) velocity, or None if the ship is not in enough snapshots
+        """
+        states = self.get_ship_states(ship_id)
+        if len(states) < 2:
+            return None
+
+        turns = min(turns, len(states) - 1)
+        first, last = states[-1 - turns][1], states[-1][1]
+        return (last.x - first.x) / turns, (last.y - first.y) / turns
+
+    def to_list(self) -> typing.List[dict]:
+        """
+        Returns every snapshot as plain dictionaries, from the oldest to the newest
+        """
+        return [s.to_dict() for s in self.snapshots]
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def __iter__(self) -> typing.Iterator[TurnSnapshot]:
+        return iter(self.snapshots)
+
+    def __getitem__(self, index: int) -> TurnSnapshot:
+        return self.snapshots[index]
+
+    def __repr__(self):
+        return "<TurnHistory snapshots={} maxlen={}>".format(len(self.snapshots), self.maxlen)